@@ -0,0 +1,37 @@
+"""Interaction rollups and occurred_at index for archiving"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "202610190001"
+down_revision = "202411270001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_interactions_occurred_at", "interactions", ["occurred_at"])
+
+    op.create_table(
+        "interaction_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "product_id",
+            sa.Integer(),
+            sa.ForeignKey("products.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("interaction_type", sa.String(length=50), nullable=False),
+        sa.Column("interaction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint(
+            "day", "product_id", "interaction_type", name="uq_interaction_rollup_key"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("interaction_rollups")
+    op.drop_index("ix_interactions_occurred_at", table_name="interactions")
@@ -0,0 +1,22 @@
+"""Composite indexes backing keyset pagination of the product listing"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "202610190002"
+down_revision = "202610190001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_name_id", "products", ["name", "id"])
+    op.create_index("ix_products_price_id", "products", ["price", "id"])
+    op.create_index("ix_products_category", "products", ["category"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_category", table_name="products")
+    op.drop_index("ix_products_price_id", table_name="products")
+    op.drop_index("ix_products_name_id", table_name="products")
@@ -0,0 +1,22 @@
+"""Unique product names as the natural key for bulk catalog upserts
+
+Fails if the table already holds duplicate names; resolve them first, for
+example with ``SELECT name FROM products GROUP BY name HAVING count(*) > 1``.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "202610190004"
+down_revision = "202610190003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("uq_products_name", "products", ["name"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_products_name", table_name="products")
@@ -0,0 +1,35 @@
+"""Denormalized item_count and subtotal on carts"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "202610190005"
+down_revision = "202610190004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.add_column(
+            sa.Column("item_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("subtotal", sa.Numeric(12, 2), nullable=False, server_default="0")
+        )
+
+    op.execute(
+        "UPDATE carts SET "
+        "item_count = COALESCE((SELECT SUM(quantity) FROM cart_items "
+        "WHERE cart_items.cart_id = carts.id), 0), "
+        "subtotal = COALESCE((SELECT SUM(quantity * unit_price) FROM cart_items "
+        "WHERE cart_items.cart_id = carts.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.drop_column("subtotal")
+        batch_op.drop_column("item_count")
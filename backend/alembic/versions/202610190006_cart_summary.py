@@ -0,0 +1,32 @@
+"""Cart currency column and (user_id, status) index for cart summaries"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "202610190006"
+down_revision = "202610190005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.add_column(
+            sa.Column("currency", sa.String(length=3), nullable=False, server_default="USD")
+        )
+    op.create_index("ix_carts_user_status", "carts", ["user_id", "status"])
+
+    op.execute(
+        "UPDATE carts SET currency = COALESCE(("
+        "SELECT products.currency FROM cart_items "
+        "JOIN products ON products.id = cart_items.product_id "
+        "WHERE cart_items.cart_id = carts.id ORDER BY cart_items.id LIMIT 1), 'USD')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_carts_user_status", table_name="carts")
+    with op.batch_alter_table("carts") as batch_op:
+        batch_op.drop_column("currency")
@@ -0,0 +1,24 @@
+"""Catalog revision counter bumped by every product write"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "202610190007"
+down_revision = "202610190006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "catalog_revision",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("revision", sa.BigInteger(), nullable=False),
+    )
+    op.bulk_insert(table, [{"id": 1, "revision": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_revision")
@@ -0,0 +1,29 @@
+"""External product key (sku) for bulk catalog upserts instead of unique names
+
+Existing products keep a NULL sku; an import inserts new rows for them unless
+their skus are assigned first (``UPDATE products SET sku = ... WHERE id = ...``).
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "202610190009"
+down_revision = "202610190008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.add_column(sa.Column("sku", sa.String(length=64), nullable=True))
+    op.create_index("uq_products_sku", "products", ["sku"], unique=True)
+    op.drop_index("uq_products_name", table_name="products")
+
+
+def downgrade() -> None:
+    op.create_index("uq_products_name", "products", ["name"], unique=True)
+    op.drop_index("uq_products_sku", table_name="products")
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.drop_column("sku")
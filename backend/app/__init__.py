@@ -5,16 +5,27 @@ from __future__ import annotations
 from flask import Flask
 from flask_cors import CORS
 
+from .compression import init_compression
 from .config import AppConfig, load_config
 from .db import init_db
+from .json_provider import init_json_provider
+from .metrics import init_metrics
+from .query_inspector import init_query_inspector
 from .routes import (
     auth_bp,
     cart_bp,
     health_bp,
     interactions_bp,
+    metrics_bp,
     products_bp,
     recommendations_bp,
 )
+from .services.auth_cache import init_auth_cache
+from .services.catalog import init_catalog_state
+from .services.password_hashing import init_password_hasher
+from .services.product_fragments import init_product_fragments
+from .services.snapshot import init_product_snapshot
+from .services.suggest import init_suggest_index
 
 
 def create_app(config_override: AppConfig | None = None) -> Flask:
@@ -29,10 +40,21 @@ def create_app(config_override: AppConfig | None = None) -> Flask:
         DATABASE_URL=config.database_url,
     )
     app.config["APP_CONFIG"] = config
+    init_json_provider(app)
     init_db(app, config)
+    init_metrics(app, config)
+    init_query_inspector(app, config)
+    init_auth_cache(app, config)
+    init_password_hasher(app, config)
+    catalog = init_catalog_state(app, config)
+    init_product_fragments(app, catalog)
+    init_product_snapshot(app, catalog)
+    init_suggest_index(app, catalog)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
+    init_compression(app, config)
 
     app.register_blueprint(health_bp, url_prefix="/api")
+    app.register_blueprint(metrics_bp, url_prefix="/api")
     app.register_blueprint(products_bp, url_prefix="/api")
     app.register_blueprint(auth_bp, url_prefix="/api")
     app.register_blueprint(cart_bp, url_prefix="/api")
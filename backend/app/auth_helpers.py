@@ -5,9 +5,10 @@ from __future__ import annotations
 from flask import current_app, g, request
 
 from .config import AppConfig
-from .db import get_session
+from .db import get_replica_router, get_session, use_read_replica
 from .models import User
 from .security import TokenError, decode_access_token, generate_access_token
+from .services.auth_cache import get_auth_cache
 
 
 def get_app_config() -> AppConfig:
@@ -31,6 +32,27 @@ def extract_bearer_token() -> str | None:
     return parts[1]
 
 
+def verify_token_user_id(token: str) -> int:
+    """Return the user id of a valid access token (cached per token).
+
+    Raises ``TokenError`` for invalid or expired tokens.
+    """
+
+    cache = get_auth_cache()
+    user_id = cache.token_user_id(token)
+    if user_id is not None:
+        return user_id
+
+    config = get_app_config()
+    token_data = decode_access_token(
+        token,
+        current_app.config["SECRET_KEY"],
+        config.access_token_exp_minutes * 60,
+    )
+    cache.remember_token(token, token_data.user_id, token_data.expires_at)
+    return token_data.user_id
+
+
 def resolve_authenticated_user() -> tuple[User | None, str | None, int]:
     """Attempt to resolve the current user from the bearer token."""
 
@@ -38,25 +60,36 @@ def resolve_authenticated_user() -> tuple[User | None, str | None, int]:
     if not token:
         return None, "Missing access token", 401
 
-    config = get_app_config()
     try:
-        token_data = decode_access_token(
-            token,
-            current_app.config["SECRET_KEY"],
-            config.access_token_exp_minutes * 60,
-        )
+        user_id = verify_token_user_id(token)
     except TokenError as exc:
         return None, str(exc), 401
 
-    session = get_session()
-    user = session.get(User, token_data.user_id)
+    user = get_auth_cache().get_user(get_session(), user_id)
     if user is None:
         return None, "User referenced by token no longer exists", 401
 
     g.current_user = user
+    g.current_user_id = user_id
     return user, None, 200
 
 
+def resolve_authenticated_user_id() -> tuple[int | None, str | None, int]:
+    """Verify the bearer token and return its user id without loading the user."""
+
+    token = extract_bearer_token()
+    if not token:
+        return None, "Missing access token", 401
+
+    try:
+        user_id = verify_token_user_id(token)
+    except TokenError as exc:
+        return None, str(exc), 401
+    # Lets a write made on this path pin the user to the primary (see app.db).
+    g.current_user_id = user_id
+    return user_id, None, 200
+
+
 def resolve_user_if_present() -> tuple[User | None, str | None]:
     """Resolve the current user only when a bearer token is provided."""
 
@@ -64,25 +97,44 @@ def resolve_user_if_present() -> tuple[User | None, str | None]:
     if not token:
         return None, None
 
-    config = get_app_config()
     try:
-        token_data = decode_access_token(
-            token,
-            current_app.config["SECRET_KEY"],
-            config.access_token_exp_minutes * 60,
-        )
+        user_id = verify_token_user_id(token)
     except TokenError as exc:
         return None, str(exc)
 
-    session = get_session()
-    user = session.get(User, token_data.user_id)
+    user = get_auth_cache().get_user(get_session(), user_id)
     if user is None:
         return None, "User referenced by token no longer exists"
 
     g.current_user = user
+    g.current_user_id = user_id
     return user, None
 
 
+def route_reads_to_replica() -> None:
+    """``before_request`` hook sending a read-only request's queries to a replica.
+
+    Users who committed writes moments ago keep reading from the primary until
+    the replicas have caught up (read-your-writes after e.g. cart mutations).
+    Pins live in the worker process that handled the write, so the guarantee
+    only covers follow-up requests served by that same worker.
+    """
+
+    if request.method not in ("GET", "HEAD"):
+        return
+    router = get_replica_router()
+    if not router.enabled:
+        return
+    token = extract_bearer_token()
+    if token:
+        try:
+            if router.is_pinned(verify_token_user_id(token)):
+                return
+        except TokenError:
+            pass
+    use_read_replica()
+
+
 def issue_access_token(user: User) -> tuple[str, int]:
     """Generate an access token and return it with expiry metadata."""
 
@@ -96,6 +148,9 @@ __all__ = [
     "get_app_config",
     "extract_bearer_token",
     "resolve_authenticated_user",
+    "resolve_authenticated_user_id",
     "resolve_user_if_present",
+    "route_reads_to_replica",
+    "verify_token_user_id",
     "issue_access_token",
 ]
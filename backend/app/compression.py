@@ -0,0 +1,144 @@
+"""Negotiated gzip/brotli compression for API responses.
+
+Text and JSON responses above ``COMPRESSION_MIN_BYTES`` are compressed with the
+best encoding the client accepts (brotli when the ``brotli``/``brotlicffi``
+package is installed, otherwise gzip). Compressed bodies of cacheable responses,
+i.e. those carrying an ``ETag``, are kept in a byte-bounded LRU keyed by the
+validator so a hot payload is compressed once rather than on every hit. The
+``ETag`` is downgraded to a weak validator on compressed responses, because the
+bytes now differ per encoding; ``If-None-Match`` matching stays weak, so ``304``
+handling is unaffected.
+"""
+
+from __future__ import annotations
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Flask, Response, request
+
+from .config import AppConfig
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
+
+_COMPRESSIBLE_MIMETYPES = frozenset(
+    {"application/json", "application/javascript", "image/svg+xml", "text/css", "text/html"}
+)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, in order of preference."""
+
+    if brotli is not None:
+        return (ENCODING_BROTLI, ENCODING_GZIP)
+    return (ENCODING_GZIP,)
+
+
+def compress(data: bytes, encoding: str, *, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == ENCODING_BROTLI:
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies, bounded by total size in bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, int], bytes] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: tuple[str, str, int]) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple[str, str, int], body: bytes) -> None:
+        if len(body) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def _is_compressible(response: Response) -> bool:
+    mimetype = response.mimetype or ""
+    return (
+        200 <= response.status_code < 300
+        and response.status_code not in (204, 206)
+        and not response.direct_passthrough
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and (mimetype.startswith("text/") or mimetype in _COMPRESSIBLE_MIMETYPES)
+    )
+
+
+def init_compression(app: Flask, config: AppConfig) -> None:
+    """Register the compression ``after_request`` hook on ``app``."""
+
+    if not config.compression_enabled:
+        return
+    cache = CompressedBodyCache(config.compression_cache_max_bytes)
+    app.config["COMPRESSION_CACHE"] = cache
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if not _is_compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < config.compression_min_bytes:
+            return response
+
+        etag, weak = response.get_etag()
+        cacheable = etag is not None and "no-store" not in response.cache_control
+        key = (etag or "", encoding, len(data))
+        body = cache.get(key) if cacheable else None
+        if body is None:
+            body = compress(
+                data,
+                encoding,
+                gzip_level=config.compression_gzip_level,
+                brotli_quality=config.compression_brotli_quality,
+            )
+            if cacheable:
+                cache.put(key, body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+__all__ = [
+    "ENCODING_BROTLI",
+    "ENCODING_GZIP",
+    "CompressedBodyCache",
+    "available_encodings",
+    "compress",
+    "init_compression",
+]
@@ -22,6 +22,21 @@ def _str_to_bool(value: str | None, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _str_to_optional_int(value: str | None, default: int | None) -> int | None:
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in {"", "none", "off"}:
+        return None
+    return int(value)
+
+
+def _str_to_tuple(value: str | None) -> tuple[str, ...]:
+    if not value:
+        return ()
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
 @dataclass(slots=True)
 class AppConfig:
     """Strongly typed configuration container."""
@@ -30,7 +45,46 @@ class AppConfig:
     debug: bool = _str_to_bool(os.getenv("FLASK_DEBUG"), False)
     secret_key: str = os.getenv("SECRET_KEY", "changeme")
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///instance/app.db")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    db_pool_pre_ping: bool = _str_to_bool(os.getenv("DB_POOL_PRE_PING"), True)
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_mmap_size_bytes: int = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    pg_prepare_threshold: int | None = _str_to_optional_int(os.getenv("PG_PREPARE_THRESHOLD"), 5)
+    pg_prepared_max: int = int(os.getenv("PG_PREPARED_MAX", "100"))
+    database_replica_urls: tuple[str, ...] = _str_to_tuple(os.getenv("DATABASE_REPLICA_URLS"))
+    replica_max_lag_seconds: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    replica_check_interval_seconds: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "2"))
     access_token_exp_minutes: int = int(os.getenv("ACCESS_TOKEN_EXP_MINUTES", "60"))
+    auth_cache_max_entries: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+    auth_user_cache_ttl_seconds: float = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+    password_hash_method: str = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    password_hash_queue_size: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "8"))
+    password_hash_retry_after_seconds: int = int(
+        os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "1")
+    )
+    interaction_retention_days: int = int(os.getenv("INTERACTION_RETENTION_DAYS", "180"))
+    interaction_archive_dir: str = os.getenv("INTERACTION_ARCHIVE_DIR", "instance/archive")
+    catalog_cache_ttl_seconds: float = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+    catalog_snapshot_max_products: int = int(os.getenv("CATALOG_SNAPSHOT_MAX_PRODUCTS", "20000"))
+    product_json_cache_size: int = int(os.getenv("PRODUCT_JSON_CACHE_SIZE", "50000"))
+    query_inspector_enabled: bool = _str_to_bool(os.getenv("QUERY_INSPECTOR"), False)
+    query_n_plus_one_threshold: int = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "3"))
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "100"))
+    metrics_enabled: bool = _str_to_bool(os.getenv("METRICS_ENABLED"), True)
+    compression_enabled: bool = _str_to_bool(os.getenv("COMPRESSION_ENABLED"), True)
+    compression_min_bytes: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+    compression_cache_max_bytes: int = int(
+        os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+    )
 
 
 def load_config() -> AppConfig:
@@ -1,27 +1,385 @@
-"""Database helpers for SQLAlchemy setup."""
+"""Database helpers for SQLAlchemy setup.
+
+Writes always go to the primary engine. When ``DATABASE_REPLICA_URLS`` is set,
+sessions marked with :func:`use_read_replica` send plain ``SELECT`` statements
+to one replica whose measured lag is within ``REPLICA_MAX_LAG_SECONDS``; once a
+session has flushed, it reads from the primary for the rest of its lifetime so
+it always sees its own writes.
+
+Every engine gets the pool limits from :class:`AppConfig`, SQLite connections get
+the configured pragmas (WAL, ``synchronous``, ``mmap_size``, ``cache_size``,
+``busy_timeout``) and psycopg connections the prepared-statement settings.
+:func:`pool_stats` reports checkout waits and utilization per engine.
+"""
 
 from __future__ import annotations
 
-from flask import Flask, current_app
-from sqlalchemy import create_engine
+import random
+import threading
+import time
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from flask import Flask, current_app, g, has_request_context
+from sqlalchemy import create_engine, event, make_url, text
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import DeclarativeBase, scoped_session, sessionmaker
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import DeclarativeBase, Session, scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import AppConfig
 
+_USE_REPLICA_KEY = "use_read_replica"
+
+_SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+# Seconds the replica has not yet replayed, or 0 when it is fully caught up
+# (an idle primary would otherwise make the replay timestamp look stale).
+_POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
 
 class Base(DeclarativeBase):
     """Base declarative class for all ORM models."""
 
 
+@dataclass(slots=True)
+class ReplicaStatus:
+    """Result of the most recent lag probe for one replica."""
+
+    engine: Engine
+    lag_seconds: float | None = None
+    checked_at: float = 0.0
+    error: str | None = None
+
+    @property
+    def url(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class PoolMetrics:
+    """Checkout counters for one connection pool, shared across pool re-creation."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_in_use = 0
+
+    def record(self, waited: float, in_use: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+
+class MeteredQueuePool(QueuePool):
+    """``QueuePool`` that times how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record(time.perf_counter() - started, self.checkedout())
+        return record
+
+    def recreate(self) -> MeteredQueuePool:
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def pool_stats(engine: Engine) -> dict[str, object]:
+    """Describe ``engine``'s pool: connections in use, utilization and checkout waits."""
+
+    pool = engine.pool
+    if not isinstance(pool, MeteredQueuePool):
+        return {"class": type(pool).__name__}
+    metrics = pool.metrics
+    in_use = pool.checkedout()
+    # A negative max_overflow means the pool may grow without limit.
+    capacity = pool.size() + pool._max_overflow if pool._max_overflow >= 0 else None
+    with metrics._lock:
+        return {
+            "class": type(pool).__name__,
+            "size": pool.size(),
+            "capacity": capacity,
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            "peak_in_use": metrics.peak_in_use,
+            "utilization": in_use / capacity if capacity else None,
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_seconds_total": metrics.wait_seconds_total,
+            "wait_seconds_max": metrics.wait_seconds_max,
+            "wait_seconds_avg": (
+                metrics.wait_seconds_total / metrics.checkouts if metrics.checkouts else 0.0
+            ),
+        }
+
+
+def _sqlite_pragmas(config: AppConfig) -> list[str]:
+    pragmas = []
+    journal_mode = config.sqlite_journal_mode.strip().upper()
+    if journal_mode:
+        if journal_mode not in _SQLITE_JOURNAL_MODES:
+            raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {config.sqlite_journal_mode}")
+        pragmas.append(f"PRAGMA journal_mode={journal_mode}")
+    synchronous = config.sqlite_synchronous.strip().upper()
+    if synchronous:
+        if synchronous not in _SQLITE_SYNCHRONOUS:
+            raise ValueError(f"Unsupported SQLITE_SYNCHRONOUS: {config.sqlite_synchronous}")
+        pragmas.append(f"PRAGMA synchronous={synchronous}")
+    pragmas.append(f"PRAGMA mmap_size={int(config.sqlite_mmap_size_bytes)}")
+    # A negative cache_size is a size in KiB rather than a page count.
+    pragmas.append(f"PRAGMA cache_size={-abs(int(config.sqlite_cache_size_kib))}")
+    pragmas.append(f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}")
+    return pragmas
+
+
+def _register_connect_settings(engine: Engine, config: AppConfig) -> None:
+    if engine.dialect.name == "sqlite":
+        pragmas = _sqlite_pragmas(config)
+
+        @event.listens_for(engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    elif engine.dialect.driver == "psycopg":
+
+        @event.listens_for(engine, "connect")
+        def _apply_prepared_max(dbapi_connection, _connection_record) -> None:
+            dbapi_connection.prepared_max = config.pg_prepared_max
+
+
+def create_app_engine(url: str, config: AppConfig) -> Engine:
+    """Create an engine with the pool, pragma and driver settings from ``config``."""
+
+    options: dict[str, object] = {"future": True, "echo": False}
+    parsed = make_url(url)
+    # In-memory SQLite keeps its single-connection pool; everything else is pooled.
+    if parsed.get_dialect().get_pool_class(parsed) is QueuePool:
+        options.update(
+            poolclass=MeteredQueuePool,
+            pool_size=config.db_pool_size,
+            max_overflow=config.db_max_overflow,
+            pool_timeout=config.db_pool_timeout_seconds,
+            pool_recycle=config.db_pool_recycle_seconds,
+            pool_pre_ping=config.db_pool_pre_ping,
+        )
+    if parsed.get_driver_name() == "psycopg":
+        # None disables server-side prepares (needed behind PgBouncer transaction pooling).
+        options["connect_args"] = {"prepare_threshold": config.pg_prepare_threshold}
+    engine = create_engine(url, **options)
+    _register_connect_settings(engine, config)
+    return engine
+
+
+class ReplicaRouter:
+    """Pick lag-checked replicas for reads and track recent writers.
+
+    Replica lag is probed at most once per ``check_interval`` seconds. Keys
+    passed to :meth:`pin_primary` (user ids) read from the primary until every
+    replica in use is guaranteed to have caught up with their writes. Pins are
+    held in this process only: with several gunicorn workers, a read served by
+    a different worker than the write can still hit a lagging replica.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: list[Engine],
+        *,
+        max_lag_seconds: float,
+        check_interval: float,
+    ) -> None:
+        self.primary = primary
+        self._replicas = [ReplicaStatus(engine) for engine in replicas]
+        self._max_lag_seconds = max_lag_seconds
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._pins: dict[Hashable, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._replicas)
+
+    @property
+    def engines(self) -> list[Engine]:
+        return [status.engine for status in self._replicas]
+
+    @property
+    def pin_seconds(self) -> float:
+        # A replica is only used while its last probe showed at most
+        # max_lag_seconds of lag, and probes are check_interval apart.
+        return self._max_lag_seconds + self._check_interval
+
+    def _probe(self, status: ReplicaStatus) -> None:
+        try:
+            with status.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    status.lag_seconds = float(connection.scalar(_POSTGRES_LAG_SQL) or 0)
+                else:
+                    connection.execute(text("SELECT 1"))
+                    status.lag_seconds = 0.0
+            status.error = None
+        except SQLAlchemyError as exc:
+            status.lag_seconds = None
+            status.error = type(exc).__name__
+
+    def refresh(self, *, force: bool = False) -> list[ReplicaStatus]:
+        """Re-probe replicas whose lag reading is older than the check interval."""
+
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                status
+                for status in self._replicas
+                if force or now - status.checked_at >= self._check_interval
+            ]
+            # Claim the probes so concurrent requests keep using the last reading.
+            for status in due:
+                status.checked_at = now
+        for status in due:
+            self._probe(status)
+        return list(self._replicas)
+
+    def choose_replica(self) -> Engine | None:
+        """Return a replica within the lag budget, or ``None`` to use the primary."""
+
+        if not self._replicas:
+            return None
+        healthy = [
+            status.engine
+            for status in self.refresh()
+            if status.lag_seconds is not None and status.lag_seconds <= self._max_lag_seconds
+        ]
+        return random.choice(healthy) if healthy else None
+
+    def pin_primary(self, key: Hashable) -> None:
+        """Route reads for ``key`` to the primary until replicas have caught up."""
+
+        if not self._replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pins[key] = now + self.pin_seconds
+            if len(self._pins) > 10_000:
+                self._pins = {k: until for k, until in self._pins.items() if until > now}
+
+    def is_pinned(self, key: Hashable | None) -> bool:
+        if key is None or not self._replicas:
+            return False
+        until = self._pins.get(key)
+        return until is not None and until > time.monotonic()
+
+    def status(self) -> list[dict[str, object]]:
+        """Describe each replica's last probe (for health reporting)."""
+
+        return [
+            {
+                "url": status.url,
+                "lag_seconds": status.lag_seconds,
+                "healthy": status.lag_seconds is not None
+                and status.lag_seconds <= self._max_lag_seconds,
+                "error": status.error,
+                "pool": pool_stats(status.engine),
+            }
+            for status in self.refresh()
+        ]
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica when marked with :func:`use_read_replica`."""
+
+    def __init__(self, *args, router: ReplicaRouter | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self._replica: Engine | None = None
+        self._wrote = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):  # type: ignore[override]
+        if self._flushing or (clause is not None and not getattr(clause, "is_select", False)):
+            self._wrote = True
+        elif (
+            self.router is not None
+            and not self._wrote
+            and self.info.get(_USE_REPLICA_KEY)
+            and clause is not None
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            if self._replica is None:
+                self._replica = self.router.choose_replica()
+                if self._replica is None:
+                    # No replica within the lag budget: stay on the primary.
+                    self.info.pop(_USE_REPLICA_KEY, None)
+            if self._replica is not None:
+                return self._replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def _replica_engines(config: AppConfig) -> list[Engine]:
+    return [create_app_engine(url, config) for url in config.database_replica_urls]
+
+
+def _register_write_pins(factory: sessionmaker, router: ReplicaRouter) -> None:
+    @event.listens_for(factory, "after_commit")
+    def _pin_writer(session: Session) -> None:
+        if not getattr(session, "_wrote", False) or not has_request_context():
+            return
+        # Set by every auth helper, including the id-only token path.
+        user_id = g.get("current_user_id")
+        if user_id is not None:
+            router.pin_primary(user_id)
+
+
 def init_db(app: Flask, config: AppConfig) -> Engine:
     """Initialize SQLAlchemy engine and session factory for the app."""
-    engine = create_engine(config.database_url, future=True, echo=False)
-    session_factory = scoped_session(
-        sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    engine = create_app_engine(config.database_url, config)
+    router = ReplicaRouter(
+        engine,
+        _replica_engines(config),
+        max_lag_seconds=config.replica_max_lag_seconds,
+        check_interval=config.replica_check_interval_seconds,
     )
+    factory = sessionmaker(
+        bind=engine,
+        class_=RoutingSession,
+        router=router,
+        autoflush=False,
+        autocommit=False,
+        future=True,
+    )
+    if router.enabled:
+        _register_write_pins(factory, router)
+    session_factory = scoped_session(factory)
 
     app.config["DB_ENGINE"] = engine
+    app.config["DB_REPLICA_ROUTER"] = router
     app.config["DB_SESSION"] = session_factory
 
     @app.teardown_appcontext
@@ -40,4 +398,49 @@ def get_session(flask_app: Flask | None = None):
     return session_factory()
 
 
-__all__ = ["Base", "init_db", "get_session"]
+def dispose_engines(flask_app: Flask | None = None, *, close: bool = True) -> None:
+    """Drop pooled connections of the primary and replica engines.
+
+    Call with ``close=False`` in a freshly forked worker so connections inherited
+    from the parent are abandoned without closing the parent's sockets.
+    """
+    app_context = flask_app or current_app
+    engine: Engine | None = app_context.config.get("DB_ENGINE")
+    if engine is not None:
+        engine.dispose(close=close)
+    router: ReplicaRouter | None = app_context.config.get("DB_REPLICA_ROUTER")
+    if router is not None:
+        for replica in router.engines:
+            replica.dispose(close=close)
+
+
+def get_replica_router(flask_app: Flask | None = None) -> ReplicaRouter:
+    """Return the replica router registered on the current app."""
+    app_context = flask_app or current_app
+    router: ReplicaRouter | None = app_context.config.get("DB_REPLICA_ROUTER")
+    if router is None:
+        raise RuntimeError("Replica router is not initialized")
+    return router
+
+
+def use_read_replica(session: Session | None = None) -> None:
+    """Let ``session`` (default: the request session) read from a replica."""
+    session = session or get_session()
+    if getattr(session, "router", None) is not None and session.router.enabled:
+        session.info[_USE_REPLICA_KEY] = True
+
+
+__all__ = [
+    "Base",
+    "MeteredQueuePool",
+    "PoolMetrics",
+    "ReplicaRouter",
+    "RoutingSession",
+    "create_app_engine",
+    "dispose_engines",
+    "get_replica_router",
+    "get_session",
+    "init_db",
+    "pool_stats",
+    "use_read_replica",
+]
@@ -0,0 +1,80 @@
+"""HTTP caching helpers: ETags, conditional GET and Cache-Control policies.
+
+Handlers derive an ETag from cheap version information (catalog version,
+``Product.revision``, recommender version) *before* loading or serializing
+anything, answer matching ``If-None-Match`` requests with ``304`` right away and
+stamp the same validator plus a per-endpoint ``Cache-Control`` policy on full
+responses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+
+from flask import Response, request
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    """A ``Cache-Control`` policy for shared (CDN) and browser caches."""
+
+    max_age: int
+    stale_while_revalidate: int = 0
+    public: bool = True
+
+    def header_value(self) -> str:
+        directives = ["public" if self.public else "private", f"max-age={self.max_age}"]
+        if self.stale_while_revalidate:
+            directives.append(f"stale-while-revalidate={self.stale_while_revalidate}")
+        return ", ".join(directives)
+
+
+CATALOG_LIST_POLICY = CachePolicy(max_age=60, stale_while_revalidate=300)
+CATALOG_METADATA_POLICY = CachePolicy(max_age=300, stale_while_revalidate=600)
+PRODUCT_DETAIL_POLICY = CachePolicy(max_age=300, stale_while_revalidate=600)
+RELATED_PRODUCTS_POLICY = CachePolicy(max_age=300, stale_while_revalidate=600)
+RECOMMENDATIONS_POLICY = CachePolicy(max_age=60, stale_while_revalidate=120)
+
+
+def build_etag(*parts: object) -> str:
+    """Hash version components into an opaque (unquoted) ETag value."""
+
+    raw = "\x1f".join(str(part) for part in parts).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:32]
+
+
+def request_args_fingerprint() -> str:
+    """Return the query string in a canonical, order-independent form."""
+
+    return "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+
+
+def apply_cache_headers(response: Response, etag: str, policy: CachePolicy) -> Response:
+    """Attach the validator and caching policy to a response."""
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = policy.header_value()
+    return response
+
+
+def not_modified(etag: str, policy: CachePolicy) -> Response | None:
+    """Return a ``304`` response when the client already holds ``etag``."""
+
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return apply_cache_headers(Response(status=304), etag, policy)
+
+
+__all__ = [
+    "CATALOG_LIST_POLICY",
+    "CATALOG_METADATA_POLICY",
+    "PRODUCT_DETAIL_POLICY",
+    "RECOMMENDATIONS_POLICY",
+    "RELATED_PRODUCTS_POLICY",
+    "CachePolicy",
+    "apply_cache_headers",
+    "build_etag",
+    "not_modified",
+    "request_args_fingerprint",
+]
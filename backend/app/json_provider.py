@@ -0,0 +1,97 @@
+"""JSON encoding for API responses.
+
+``orjson`` is used when it is installed (both as Flask's JSON provider and for
+pre-encoded product fragments); otherwise the stdlib encoder is used with the
+same options. Output mirrors Flask's default provider: sorted keys, dates as
+HTTP dates, ``Decimal``/``UUID`` as strings and dataclasses as objects.
+
+:func:`fragment_response` assembles a JSON object from ordinary values plus
+lists of already-encoded fragments, so list endpoints can splice cached product
+bytes instead of serializing every product again.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import decimal
+import json
+import uuid
+from collections.abc import Mapping, Sequence
+from datetime import date
+from typing import Any
+
+from flask import Flask, Response, current_app
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None
+    else 0
+)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, decimal.Decimal | uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """Encode ``value`` as compact UTF-8 JSON."""
+
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        value, default=_default, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by ``orjson``."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app: Flask) -> None:
+    """Switch the app to the ``orjson`` provider when the package is available."""
+
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def fragment_response(
+    payload: Mapping[str, Any], fragment_lists: Mapping[str, Sequence[bytes]]
+) -> Response:
+    """Return a JSON object response whose list values are pre-encoded fragments."""
+
+    parts = {key: dumps_bytes(value) for key, value in payload.items()}
+    parts.update(
+        (key, b"[" + b",".join(fragments) + b"]") for key, fragments in fragment_lists.items()
+    )
+    body = b",".join(dumps_bytes(key) + b":" + parts[key] for key in sorted(parts))
+    return current_app.response_class(b"{" + body + b"}\n", mimetype="application/json")
+
+
+__all__ = ["OrjsonProvider", "dumps_bytes", "fragment_response", "init_json_provider"]
@@ -0,0 +1,273 @@
+"""Request latency and SQL instrumentation exported in Prometheus text format.
+
+Every request is timed from the first ``before_request`` hook to the last
+``after_request`` hook (compression included) and counted by method, route
+template and status. Cursor events on the primary and replica engines add each
+statement's count and duration to the running request, which is observed once
+per request, so the per-query cost is two ``perf_counter`` calls.
+
+Under gunicorn, ``PROMETHEUS_MULTIPROC_DIR`` (set by ``gunicorn.conf.py``) makes
+``prometheus_client`` keep values in per-process files, and ``/api/metrics``
+aggregates all workers whichever one serves the scrape. Pool and password-hashing
+metrics are refreshed from each worker at most once per second; their running
+totals are counters, so ``rate()`` survives worker recycling.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from flask import Flask, Response, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import AppConfig
+from .db import pool_stats
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+_GAUGE_REFRESH_SECONDS = 1.0
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP responses by method, route and status code.",
+    ("method", "endpoint", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, including response compression.",
+    ("method", "endpoint"),
+    buckets=_LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "endpoint"),
+    buckets=_QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time per request spent executing SQL statements.",
+    ("method", "endpoint"),
+    buckets=_LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed while handling requests.",
+    ("endpoint",),
+)
+
+POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Pooled connections currently checked out.",
+    ("engine",),
+    multiprocess_mode="livesum",
+)
+POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Pool size plus allowed overflow.",
+    ("engine",),
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts",
+    "Pooled connection checkouts.",
+    ("engine",),
+)
+POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS.",
+    ("engine",),
+)
+POOL_WAIT_SECONDS = Counter(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("engine",),
+)
+POOL_WAIT_MAX_SECONDS = Gauge(
+    "db_pool_checkout_wait_max_seconds",
+    "Longest wait for a pooled connection in any live worker.",
+    ("engine",),
+    multiprocess_mode="livemax",
+)
+HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Password hashing jobs running or queued.",
+    multiprocess_mode="livesum",
+)
+HASH_REJECTED = Counter(
+    "password_hash_rejected",
+    "Hashing requests rejected with 503.",
+)
+HASH_QUEUE_WAIT_SECONDS = Counter(
+    "password_hash_queue_wait_seconds",
+    "Time hashing jobs waited for a worker thread.",
+)
+
+
+@dataclass(slots=True)
+class RequestQueries:
+    """SQL statements executed on behalf of the current request."""
+
+    count: int = 0
+    seconds: float = 0.0
+
+
+_current_queries: ContextVar[RequestQueries | None] = ContextVar("current_queries", default=None)
+
+
+def current_request_queries() -> RequestQueries | None:
+    """Query counters of the request being handled, if instrumentation is on."""
+
+    return _current_queries.get()
+
+
+def _instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current_queries.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        queries = _current_queries.get()
+        started = conn.info.get("query_started")
+        if queries is None or not started:
+            return
+        queries.count += 1
+        queries.seconds += time.perf_counter() - started.pop()
+
+
+class _ProcessGauges:
+    """Copies this worker's pool and hashing stats into metrics, rate-limited.
+
+    Running totals are added to counters as deltas since the last refresh, so
+    they keep increasing across worker restarts instead of dropping like a
+    summed gauge would when a recycled worker's values disappear.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self._app = app
+        self._next_refresh = 0.0
+        self._totals: dict[tuple[Counter, str], float] = {}
+
+    def _advance(self, counter: Counter, value: float, label: str = "") -> None:
+        previous = self._totals.get((counter, label), 0.0)
+        # A smaller total means the source was reset (e.g. a recreated pool).
+        delta = value - previous if value >= previous else value
+        self._totals[(counter, label)] = value
+        if delta > 0:
+            (counter.labels(label) if label else counter).inc(delta)
+
+    def refresh(self, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next_refresh:
+            return
+        self._next_refresh = now + _GAUGE_REFRESH_SECONDS
+
+        engines = [("primary", self._app.config["DB_ENGINE"])]
+        router = self._app.config.get("DB_REPLICA_ROUTER")
+        if router is not None:
+            engines.extend(
+                (f"replica{index}", engine) for index, engine in enumerate(router.engines)
+            )
+        for name, engine in engines:
+            stats = pool_stats(engine)
+            if "checkouts" not in stats:
+                continue
+            POOL_IN_USE.labels(name).set(stats["in_use"])
+            POOL_CAPACITY.labels(name).set(stats["capacity"] or 0)
+            self._advance(POOL_CHECKOUTS, stats["checkouts"], name)
+            self._advance(POOL_TIMEOUTS, stats["timeouts"], name)
+            self._advance(POOL_WAIT_SECONDS, stats["wait_seconds_total"], name)
+            POOL_WAIT_MAX_SECONDS.labels(name).set(stats["wait_seconds_max"])
+
+        hasher = self._app.config.get("PASSWORD_HASHER")
+        if hasher is not None:
+            stats = hasher.stats()
+            HASH_IN_FLIGHT.set(stats["in_flight"])
+            self._advance(HASH_REJECTED, stats["rejected"])
+            self._advance(HASH_QUEUE_WAIT_SECONDS, stats["queue_wait_seconds_total"])
+
+
+def metrics_response() -> Response:
+    """Render all metrics, aggregated across workers in multiprocess mode."""
+
+    gauges: _ProcessGauges | None = current_app.config.get("METRICS_GAUGES")
+    if gauges is not None:
+        gauges.refresh(force=True)
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        body = generate_latest(registry)
+    else:
+        body = generate_latest()
+    return Response(body, content_type=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app: Flask, config: AppConfig) -> None:
+    """Register the request timing hooks and SQL cursor listeners on ``app``.
+
+    Call before other ``after_request`` hooks are registered so their time is
+    included (Flask runs them in reverse order of registration).
+    """
+
+    if not config.metrics_enabled:
+        return
+    _instrument_engine(app.config["DB_ENGINE"])
+    router = app.config.get("DB_REPLICA_ROUTER")
+    if router is not None:
+        for engine in router.engines:
+            _instrument_engine(engine)
+    gauges = _ProcessGauges(app)
+    app.config["METRICS_GAUGES"] = gauges
+
+    @app.before_request
+    def _start_request_timer() -> None:
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries_token = _current_queries.set(RequestQueries())
+
+    @app.after_request
+    def _record_request(response: Response) -> Response:
+        started = g.pop("metrics_started", None)
+        queries = _current_queries.get()
+        if started is None or queries is None:
+            return response
+        elapsed = time.perf_counter() - started
+
+        method = request.method
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUESTS.labels(method, endpoint, str(response.status_code)).inc()
+        REQUEST_LATENCY.labels(method, endpoint).observe(elapsed)
+        REQUEST_QUERIES.labels(method, endpoint).observe(queries.count)
+        REQUEST_DB_SECONDS.labels(method, endpoint).observe(queries.seconds)
+        if queries.count:
+            DB_QUERIES.labels(endpoint).inc(queries.count)
+        gauges.refresh()
+        return response
+
+    @app.teardown_request
+    def _stop_query_counting(_: BaseException | None = None) -> None:
+        token = g.pop("metrics_queries_token", None)
+        if token is not None:
+            _current_queries.reset(token)
+
+
+__all__ = [
+    "RequestQueries",
+    "current_request_queries",
+    "init_metrics",
+    "metrics_response",
+]
@@ -2,19 +2,25 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    event,
     func,
+    insert,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -50,25 +56,67 @@ class User(Base, TimestampMixin):
 
 class Product(Base, TimestampMixin):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("uq_products_sku", "sku", unique=True),
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_category", "category"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # External catalog key used by bulk imports; products created in the app may
+    # have none (NULLs never conflict in the unique index).
+    sku: Mapped[str | None] = mapped_column(String(64))
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str | None] = mapped_column(Text)
     category: Mapped[str | None] = mapped_column(String(100))
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     currency: Mapped[str] = mapped_column(String(3), default="USD", nullable=False)
     image_url: Mapped[str | None] = mapped_column(String(500))
+    # Bumped by every UPDATE (writers bypassing the ORM, such as ON CONFLICT
+    # upserts, set it themselves); validators and payload caches key on it
+    # because ``updated_at`` only has one-second resolution on SQLite.
+    revision: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=text("revision + 1")
+    )
 
     cart_items: Mapped[list[CartItem]] = relationship(back_populates="product")
     interactions: Mapped[list[Interaction]] = relationship(back_populates="product")
 
 
+class CatalogRevision(Base):
+    """Single-row counter bumped by every transaction that writes ``products``.
+
+    ``updated_at`` has one-second resolution on SQLite, so the catalog version
+    (``app.services.catalog``) relies on this counter to notice every write.
+    """
+
+    __tablename__ = "catalog_revision"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    revision: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+@event.listens_for(CatalogRevision.__table__, "after_create")
+def _insert_catalog_revision_row(target, connection, **_kwargs) -> None:
+    connection.execute(insert(target).values(id=1, revision=0))
+
+
 class Cart(Base, TimestampMixin):
     __tablename__ = "carts"
+    __table_args__ = (Index("ix_carts_user_status", "user_id", "status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     status: Mapped[str] = mapped_column(String(32), default="open", nullable=False)
+    # Maintained incrementally by cart mutations (see app.services.cart).
+    item_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    subtotal: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), default=0, server_default="0", nullable=False
+    )
+    currency: Mapped[str] = mapped_column(
+        String(3), default="USD", server_default="USD", nullable=False
+    )
 
     user: Mapped[User | None] = relationship(back_populates="carts")
     items: Mapped[list[CartItem]] = relationship(
@@ -110,6 +158,7 @@ class Order(Base, TimestampMixin):
 
 class Interaction(Base):
     __tablename__ = "interactions"
+    __table_args__ = (Index("ix_interactions_occurred_at", "occurred_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
@@ -126,12 +175,31 @@ class Interaction(Base):
     product: Mapped[Product] = relationship(back_populates="interactions")
 
 
+class InteractionRollup(Base):
+    """Daily per-product counts for interactions moved to the archive."""
+
+    __tablename__ = "interaction_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "product_id", "interaction_type", name="uq_interaction_rollup_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), nullable=False
+    )
+    interaction_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    interaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 __all__ = [
     "User",
     "Product",
+    "CatalogRevision",
     "Cart",
     "CartItem",
     "Order",
     "Interaction",
+    "InteractionRollup",
     "Base",
 ]
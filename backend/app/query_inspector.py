@@ -0,0 +1,238 @@
+"""Development-time SQL inspection: N+1 and slow-query detection.
+
+With ``QUERY_INSPECTOR=1`` every statement a request executes is recorded with
+its duration and the innermost ``app`` frame that issued it. After the request,
+statement shapes (SQL with literals and ``IN`` lists collapsed) repeated at
+least ``QUERY_N_PLUS_ONE_THRESHOLD`` times, and statements slower than
+``SLOW_QUERY_MS``, are logged as warnings with their origin, and the response
+carries an ``X-Query-Count`` header. :func:`capture_queries` records the same
+information around arbitrary code; ``app.testing`` builds query budgets on it.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import sysconfig
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from weakref import WeakSet
+
+from flask import Flask, Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import AppConfig
+
+_APP_DIR = str(Path(__file__).resolve().parent)
+_SKIPPED_FILES = {str(Path(__file__).resolve()), str(Path(_APP_DIR, "db.py"))}
+_LIBRARY_DIRS = tuple(
+    {sysconfig.get_paths()[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_instrumented_engines: WeakSet[Engine] = WeakSet()
+_active_logs: ContextVar[tuple[QueryLog, ...]] = ContextVar("active_query_logs", default=())
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce ``statement`` to its shape so repeated lookups compare equal."""
+
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass(slots=True)
+class RecordedQuery:
+    """One executed statement with its duration and issuing code location."""
+
+    statement: str
+    seconds: float
+    origin: str
+
+    @property
+    def shape(self) -> str:
+        return normalize_statement(self.statement)
+
+
+@dataclass(slots=True)
+class RepeatedQuery:
+    """A statement shape executed several times within one log."""
+
+    shape: str
+    count: int
+    origins: list[str]
+
+
+@dataclass(slots=True)
+class QueryLog:
+    """Statements recorded while a request or :func:`capture_queries` block ran."""
+
+    queries: list[RecordedQuery] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+
+    def repeated(self, threshold: int) -> list[RepeatedQuery]:
+        """Shapes executed at least ``threshold`` times, most frequent first."""
+
+        counts: Counter[str] = Counter()
+        origins: dict[str, set[str]] = {}
+        for query in self.queries:
+            shape = query.shape
+            counts[shape] += 1
+            origins.setdefault(shape, set()).add(query.origin)
+        return [
+            RepeatedQuery(shape, count, sorted(origins[shape]))
+            for shape, count in counts.most_common()
+            if count >= threshold
+        ]
+
+    def slow(self, threshold_ms: float) -> list[RecordedQuery]:
+        return [query for query in self.queries if query.seconds * 1000 >= threshold_ms]
+
+    def describe(self) -> str:
+        """Numbered statements with durations and origins, for assertion messages."""
+
+        return "\n".join(
+            f"{index:>3}. {query.seconds * 1000:.2f} ms  {query.origin}\n     {query.statement}"
+            for index, query in enumerate(self.queries, start=1)
+        )
+
+
+def _origin() -> str:
+    """``file:line in function`` of the innermost app frame executing SQL.
+
+    Falls back to the innermost non-library frame (a script or test) when the
+    statement was not issued from ``app``.
+    """
+
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename not in _SKIPPED_FILES:
+            relative = Path(filename).relative_to(Path(_APP_DIR).parent)
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        if fallback is None and not filename.startswith((*_LIBRARY_DIRS, "<")):
+            fallback = f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "<unknown>"
+
+
+def _instrument(engine: Engine) -> None:
+    if engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _active_logs.get():
+            conn.info.setdefault("inspector_started", []).append((time.perf_counter(), _origin()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany) -> None:
+        logs = _active_logs.get()
+        started = conn.info.get("inspector_started")
+        if not logs or not started:
+            return
+        started_at, origin = started.pop()
+        query = RecordedQuery(statement, time.perf_counter() - started_at, origin)
+        for log in logs:
+            log.queries.append(query)
+
+
+def _app_engines(app: Flask) -> list[Engine]:
+    engines = [app.config["DB_ENGINE"]]
+    router = app.config.get("DB_REPLICA_ROUTER")
+    if router is not None:
+        engines.extend(router.engines)
+    return engines
+
+
+@contextmanager
+def capture_queries(app: Flask) -> Iterator[QueryLog]:
+    """Record statements run on ``app``'s engines by this thread inside the block."""
+
+    for engine in _app_engines(app):
+        _instrument(engine)
+    log = QueryLog()
+    token = _active_logs.set((*_active_logs.get(), log))
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+def init_query_inspector(app: Flask, config: AppConfig) -> None:
+    """Log N+1 patterns and slow statements per request when enabled."""
+
+    if not config.query_inspector_enabled:
+        return
+    for engine in _app_engines(app):
+        _instrument(engine)
+
+    @app.before_request
+    def _start_inspection() -> None:
+        log = QueryLog()
+        g.query_log = log
+        g.query_log_token = _active_logs.set((*_active_logs.get(), log))
+
+    @app.after_request
+    def _report_queries(response: Response) -> Response:
+        log: QueryLog | None = g.get("query_log")
+        if log is None:
+            return response
+        response.headers["X-Query-Count"] = str(log.count)
+        for repeated in log.repeated(config.query_n_plus_one_threshold):
+            app.logger.warning(
+                "Possible N+1 in %s %s: %d x %s (from %s)",
+                request.method,
+                request.path,
+                repeated.count,
+                repeated.shape,
+                ", ".join(repeated.origins),
+            )
+        for query in log.slow(config.slow_query_ms):
+            app.logger.warning(
+                "Slow query in %s %s: %.1f ms at %s: %s",
+                request.method,
+                request.path,
+                query.seconds * 1000,
+                query.origin,
+                query.statement,
+            )
+        return response
+
+    @app.teardown_request
+    def _stop_inspection(_: BaseException | None = None) -> None:
+        token = g.pop("query_log_token", None)
+        if token is not None:
+            _active_logs.reset(token)
+
+
+__all__ = [
+    "QueryLog",
+    "RecordedQuery",
+    "RepeatedQuery",
+    "capture_queries",
+    "init_query_inspector",
+    "normalize_statement",
+]
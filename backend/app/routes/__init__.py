@@ -4,6 +4,7 @@ from .auth import auth_bp
 from .cart import cart_bp
 from .health import health_bp
 from .interactions import interactions_bp
+from .metrics import metrics_bp
 from .products import products_bp
 from .recommendations import recommendations_bp
 
@@ -12,6 +13,7 @@ __all__ = [
 	"cart_bp",
 	"health_bp",
 	"interactions_bp",
+	"metrics_bp",
 	"products_bp",
 	"recommendations_bp",
 ]
@@ -12,7 +12,7 @@ from sqlalchemy.exc import IntegrityError
 from ..auth_helpers import issue_access_token, resolve_authenticated_user
 from ..db import get_session
 from ..models import User
-from ..security import hash_password, verify_password
+from ..services.password_hashing import PasswordHashingBusyError, get_password_hasher
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -29,6 +29,13 @@ def _serialize_user(user: User) -> dict[str, Any]:
     }
 
 
+def _busy_response(exc: PasswordHashingBusyError):
+    response = jsonify({"error": str(exc)})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(exc.retry_after_seconds)
+    return response
+
+
 def _normalize_email(value: str | None) -> str:
     if not value or not isinstance(value, str):
         return ""
@@ -62,9 +69,14 @@ def register_user():  # type: ignore[override]
     if existing is not None:
         return jsonify({"error": "Email is already registered."}), 409
 
+    try:
+        hashed_password = get_password_hasher().hash(password)
+    except PasswordHashingBusyError as exc:
+        return _busy_response(exc)
+
     user = User(
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=hashed_password,
         full_name=full_name.strip() if isinstance(full_name, str) and full_name.strip() else None,
     )
     session.add(user)
@@ -100,7 +112,13 @@ def login_user():  # type: ignore[override]
 
     session = get_session()
     user = session.scalar(select(User).where(func.lower(User.email) == email))
-    if user is None or not verify_password(password, user.hashed_password):
+    if user is None:
+        return jsonify({"error": "Invalid email or password."}), 401
+    try:
+        password_ok = get_password_hasher().verify(password, user.hashed_password)
+    except PasswordHashingBusyError as exc:
+        return _busy_response(exc)
+    if not password_ok:
         return jsonify({"error": "Invalid email or password."}), 401
 
     token, expires_in = issue_access_token(user)
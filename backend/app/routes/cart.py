@@ -5,90 +5,38 @@ from __future__ import annotations
 from decimal import Decimal
 
 from flask import Blueprint, current_app, jsonify, request
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
 
-from ..auth_helpers import resolve_authenticated_user
+from ..auth_helpers import resolve_authenticated_user, resolve_authenticated_user_id
 from ..db import get_session
-from ..models import Cart, CartItem, Order, Product, User
-from ..services import InteractionLoggingError, log_interaction
+from ..models import Cart, Product, User
+from ..services import (
+    InteractionEvent,
+    InteractionLoggingError,
+    log_interaction,
+    log_interactions_bulk,
+)
+from ..services.cart import (
+    CART_OPERATIONS,
+    MAX_QUANTITY,
+    OP_ADD,
+    OP_REMOVE,
+    CartOperation,
+    CartProductsNotFoundError,
+    CartQuantityError,
+    add_item,
+    apply_operations,
+    checkout,
+    fetch_cart_summary,
+    find_cart_item,
+    load_open_cart,
+    serialize_cart,
+    set_item_quantity,
+)
 
 cart_bp = Blueprint("cart", __name__)
 
-_MAX_QUANTITY = 99
-
-
-def _load_cart_with_items(cart_id: int) -> Cart | None:
-    session = get_session()
-    stmt = (
-        select(Cart)
-        .where(Cart.id == cart_id)
-        .options(joinedload(Cart.items).joinedload(CartItem.product))
-    )
-    return session.scalars(stmt).first()
-
-
-def _get_or_create_open_cart(user: User) -> Cart:
-    session = get_session()
-    stmt = (
-        select(Cart)
-        .where(Cart.user_id == user.id, Cart.status == "open")
-        .options(joinedload(Cart.items).joinedload(CartItem.product))
-        .order_by(Cart.id.desc())
-    )
-    cart = session.scalars(stmt).first()
-    if cart:
-        return cart
-
-    cart = Cart(user_id=user.id, status="open")
-    session.add(cart)
-    session.commit()
-    session.refresh(cart)
-    return _load_cart_with_items(cart.id) or cart
-
-
-def _serialize_product_summary(product: Product) -> dict[str, object]:
-    return {
-        "id": product.id,
-        "name": product.name,
-        "price": float(product.price),
-        "currency": product.currency,
-        "image_url": product.image_url,
-    }
-
-
-def _serialize_cart(cart: Cart) -> dict[str, object]:
-    subtotal = Decimal("0")
-    item_count = 0
-    currency = "USD"
-    items_payload: list[dict[str, object]] = []
-
-    for item in cart.items:
-        price = Decimal(item.unit_price or 0)
-        line_total = price * item.quantity
-        subtotal += line_total
-        item_count += item.quantity
-        currency = item.product.currency if item.product and item.product.currency else currency
-        items_payload.append(
-            {
-                "id": item.id,
-                "quantity": item.quantity,
-                "unit_price": float(price),
-                "line_total": float(line_total),
-                "product": _serialize_product_summary(item.product),
-            }
-        )
-
-    return {
-        "id": cart.id,
-        "status": cart.status,
-        "currency": currency,
-        "item_count": item_count,
-        "subtotal": float(subtotal),
-        "items": items_payload,
-        "created_at": cart.created_at.isoformat() if cart.created_at else None,
-        "updated_at": cart.updated_at.isoformat() if cart.updated_at else None,
-    }
+_MAX_BULK_OPERATIONS = 200
 
 
 def _validate_quantity(value: object, *, minimum: int = 1) -> int:
@@ -96,13 +44,43 @@ def _validate_quantity(value: object, *, minimum: int = 1) -> int:
         raise ValueError("Quantity must be an integer.")
     if value < minimum:
         raise ValueError("Quantity must be positive.")
-    if value > _MAX_QUANTITY:
-        raise ValueError(f"Quantity cannot exceed {_MAX_QUANTITY}.")
+    if value > MAX_QUANTITY:
+        raise ValueError(f"Quantity cannot exceed {MAX_QUANTITY}.")
     return value
 
 
-def _cart_response(cart: Cart):
-    return jsonify({"cart": _serialize_cart(cart)})
+def _parse_operations(value: object) -> list[CartOperation]:
+    if not isinstance(value, list) or not value:
+        raise ValueError("operations must be a non-empty list.")
+    if len(value) > _MAX_BULK_OPERATIONS:
+        raise ValueError(f"At most {_MAX_BULK_OPERATIONS} operations are allowed.")
+    operations: list[CartOperation] = []
+    for index, entry in enumerate(value):
+        if not isinstance(entry, dict):
+            raise ValueError(f"operations[{index}] must be an object.")
+        op = entry.get("op", OP_ADD)
+        if op not in CART_OPERATIONS:
+            raise ValueError(f"operations[{index}].op must be one of {', '.join(CART_OPERATIONS)}.")
+        product_id = entry.get("product_id")
+        if not isinstance(product_id, int) or isinstance(product_id, bool):
+            raise ValueError(f"operations[{index}].product_id must be an integer.")
+        quantity = 0
+        if op != OP_REMOVE:
+            try:
+                quantity = _validate_quantity(
+                    entry.get("quantity", 1), minimum=1 if op == OP_ADD else 0
+                )
+            except ValueError as exc:
+                raise ValueError(f"operations[{index}]: {exc}") from None
+        operations.append(CartOperation(op, product_id, quantity))
+    return operations
+
+
+def _commit_cart_response(session, cart: Cart):
+    # Serialize before committing: the commit expires every loaded object.
+    payload = {"cart": serialize_cart(cart)}
+    session.commit()
+    return jsonify(payload)
 
 
 def _record_interaction(
@@ -126,33 +104,24 @@ def _record_interaction(
         current_app.logger.debug("Interaction log skipped: %s", exc)
 
 
-def _find_cart_item_for_user(item_id: int, user: User) -> CartItem | None:
-    session = get_session()
-    stmt = (
-        select(CartItem)
-        .join(Cart, Cart.id == CartItem.cart_id)
-        .options(joinedload(CartItem.product), joinedload(CartItem.cart))
-        .where(CartItem.id == item_id, Cart.user_id == user.id, Cart.status == "open")
-    )
-    return session.scalars(stmt).first()
-
-
-def _compute_cart_total(cart: Cart) -> Decimal:
-    total = Decimal("0")
-    for item in cart.items:
-        price = Decimal(item.unit_price or 0)
-        total += price * item.quantity
-    return total
-
-
 @cart_bp.get("/cart")
 def get_cart():  # type: ignore[override]
     user, error_message, status_code = resolve_authenticated_user()
     if user is None:
         return jsonify({"error": error_message or "Authentication required."}), status_code
 
-    cart = _get_or_create_open_cart(user)
-    return _cart_response(cart)
+    session = get_session()
+    return _commit_cart_response(session, load_open_cart(session, user))
+
+
+@cart_bp.get("/cart/summary")
+def get_cart_summary():  # type: ignore[override]
+    # Verified token only: the summary needs the user id, not the User row.
+    user_id, error_message, status_code = resolve_authenticated_user_id()
+    if user_id is None:
+        return jsonify({"error": error_message or "Authentication required."}), status_code
+
+    return jsonify({"cart": fetch_cart_summary(get_session(), user_id)})
 
 
 @cart_bp.post("/cart/items")
@@ -174,29 +143,17 @@ def add_cart_item():  # type: ignore[override]
         return jsonify({"error": str(exc)}), 400
 
     session = get_session()
+    cart = load_open_cart(session, user)
+    # Products already in the cart come from the identity map without a query.
     product = session.get(Product, product_id)
     if product is None:
         return jsonify({"error": "Product not found."}), 404
 
-    cart = _get_or_create_open_cart(user)
-
-    stmt = select(CartItem).where(CartItem.cart_id == cart.id, CartItem.product_id == product.id)
-    item = session.scalars(stmt).first()
-
-    if item is None:
-        item = CartItem(
-            cart_id=cart.id,
-            product_id=product.id,
-            quantity=quantity_value,
-            unit_price=product.price,
-        )
-        session.add(item)
-    else:
-        new_quantity = item.quantity + quantity_value
-        if new_quantity > _MAX_QUANTITY:
-            return jsonify({"error": f"Quantity cannot exceed {_MAX_QUANTITY}."}), 400
-        item.quantity = new_quantity
-        item.unit_price = product.price
+    try:
+        item = add_item(session, cart, product, quantity_value)
+    except CartQuantityError as exc:
+        session.rollback()
+        return jsonify({"error": str(exc)}), 400
 
     _record_interaction(
         session=session,
@@ -209,10 +166,54 @@ def add_cart_item():  # type: ignore[override]
             "source": "api",
         },
     )
+    return _commit_cart_response(session, cart)
 
-    session.commit()
-    refreshed = _load_cart_with_items(cart.id)
-    return _cart_response(refreshed or cart)
+
+@cart_bp.post("/cart/items/bulk")
+def bulk_update_cart_items():  # type: ignore[override]
+    user, error_message, status_code = resolve_authenticated_user()
+    if user is None:
+        return jsonify({"error": error_message or "Authentication required."}), status_code
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        operations = _parse_operations(payload.get("operations"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    session = get_session()
+    cart = load_open_cart(session, user)
+    try:
+        quantities = apply_operations(session, cart, operations)
+    except CartProductsNotFoundError as exc:
+        session.rollback()
+        return jsonify({"error": str(exc), "missing_ids": exc.missing_ids}), 404
+    except CartQuantityError as exc:
+        session.rollback()
+        return jsonify({"error": str(exc)}), 400
+
+    log_interactions_bulk(
+        (
+            InteractionEvent(
+                operation.product_id,
+                "add_to_cart" if operation.op == OP_ADD else "update_cart",
+                (
+                    {
+                        "quantity": quantities[operation.product_id],
+                        "delta": operation.quantity,
+                        "source": "bulk",
+                    }
+                    if operation.op == OP_ADD
+                    else {"quantity": operation.quantity, "source": "bulk"}
+                ),
+            )
+            for operation in operations
+        ),
+        user=user,
+        session=session,
+        commit=False,
+    )
+    return _commit_cart_response(session, cart)
 
 
 @cart_bp.patch("/cart/items/<int:item_id>")
@@ -231,15 +232,13 @@ def update_cart_item(item_id: int):  # type: ignore[override]
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 400
 
-    item = _find_cart_item_for_user(item_id, user)
+    session = get_session()
+    cart = load_open_cart(session, user)
+    item = find_cart_item(cart, item_id)
     if item is None:
         return jsonify({"error": "Cart item not found."}), 404
 
-    session = get_session()
-    if quantity_value == 0:
-        session.delete(item)
-    else:
-        item.quantity = quantity_value
+    set_item_quantity(session, cart, item, quantity_value)
     _record_interaction(
         session=session,
         product_id=item.product_id,
@@ -247,10 +246,7 @@ def update_cart_item(item_id: int):  # type: ignore[override]
         user=user,
         metadata={"quantity": quantity_value},
     )
-    session.commit()
-
-    refreshed = _load_cart_with_items(item.cart_id)
-    return _cart_response(refreshed or _get_or_create_open_cart(user))
+    return _commit_cart_response(session, cart)
 
 
 @cart_bp.delete("/cart/items/<int:item_id>")
@@ -259,25 +255,21 @@ def delete_cart_item(item_id: int):  # type: ignore[override]
     if user is None:
         return jsonify({"error": error_message or "Authentication required."}), status_code
 
-    item = _find_cart_item_for_user(item_id, user)
+    session = get_session()
+    cart = load_open_cart(session, user)
+    item = find_cart_item(cart, item_id)
     if item is None:
         return jsonify({"error": "Cart item not found."}), 404
 
-    session = get_session()
-    cart_id = item.cart_id
-    product_id = item.product_id
-    session.delete(item)
+    set_item_quantity(session, cart, item, 0)
     _record_interaction(
         session=session,
-        product_id=product_id,
+        product_id=item.product_id,
         interaction_type="update_cart",
         user=user,
         metadata={"quantity": 0},
     )
-    session.commit()
-
-    refreshed = _load_cart_with_items(cart_id)
-    return _cart_response(refreshed or _get_or_create_open_cart(user))
+    return _commit_cart_response(session, cart)
 
 
 @cart_bp.post("/cart/checkout")
@@ -286,57 +278,47 @@ def checkout_cart():  # type: ignore[override]
     if user is None:
         return jsonify({"error": error_message or "Authentication required."}), status_code
 
-    cart = _get_or_create_open_cart(user)
+    session = get_session()
+    cart = load_open_cart(session, user)
     if not cart.items:
         return jsonify({"error": "Cart is empty. Add items before checking out."}), 400
 
-    total = _compute_cart_total(cart)
-    currency = "USD"
-    if cart.items:
-        first_currency = cart.items[0].product.currency if cart.items[0].product else None
-        if first_currency:
-            currency = first_currency
-
-    session = get_session()
-    cart.status = "submitted"
-    order = Order(
-        user_id=user.id,
-        cart_id=cart.id,
-        total_amount=total,
-        status="confirmed",
+    currency = cart.currency
+    try:
+        order, new_cart = checkout(session, cart)
+    except IntegrityError:
+        session.rollback()
+        return jsonify({"error": "Cart has already been checked out."}), 409
+
+    log_interactions_bulk(
+        (
+            InteractionEvent(
+                item.product_id,
+                "pseudo_purchase",
+                {
+                    "quantity": item.quantity,
+                    "line_total": float(Decimal(item.unit_price or 0) * item.quantity),
+                },
+            )
+            for item in cart.items
+        ),
+        user=user,
+        session=session,
+        commit=False,
     )
-    session.add(order)
-
-    session.flush()
-    session.refresh(order)
-
-    new_cart = Cart(user_id=user.id, status="open")
-    session.add(new_cart)
-    for item in cart.items:
-        line_total = Decimal(item.unit_price or 0) * item.quantity
-        _record_interaction(
-            session=session,
-            product_id=item.product_id,
-            interaction_type="pseudo_purchase",
-            user=user,
-            metadata={
-                "quantity": item.quantity,
-                "line_total": float(line_total),
-            },
-        )
-    session.commit()
 
     response_payload = {
         "order": {
             "id": order.id,
             "status": order.status,
-            "total_amount": float(total),
+            "total_amount": float(order.total_amount),
             "currency": currency,
             "reference": f"ORD-{order.id:05d}",
             "created_at": order.created_at.isoformat() if order.created_at else None,
         },
-        "cart": _serialize_cart(_load_cart_with_items(new_cart.id) or new_cart),
+        "cart": serialize_cart(new_cart),
     }
+    session.commit()
     return jsonify(response_payload)
 
 
@@ -7,7 +7,12 @@ from datetime import UTC, datetime
 
 from flask import Blueprint, current_app, jsonify
 
+from ..auth_helpers import route_reads_to_replica
+from ..db import get_replica_router, pool_stats
+from ..services.password_hashing import get_password_hasher
+
 health_bp = Blueprint("health", __name__)
+health_bp.before_request(route_reads_to_replica)
 
 
 @health_bp.get("/health")
@@ -23,5 +28,10 @@ def health() -> tuple[dict[str, object], int]:
             "environment": config_dict.get("environment"),
             "debug": config_dict.get("debug"),
         },
+        "database": {
+            "pool": pool_stats(current_app.config["DB_ENGINE"]),
+            "replicas": get_replica_router().status(),
+        },
+        "password_hashing": get_password_hasher().stats(),
     }
     return jsonify(payload), 200
@@ -0,0 +1,18 @@
+"""Prometheus scrape endpoint."""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, abort, current_app
+
+from ..metrics import metrics_response
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.get("/metrics")
+def metrics() -> Response:
+    """Return request, SQL, pool and hashing metrics in Prometheus text format."""
+    config = current_app.config.get("APP_CONFIG")
+    if config is not None and not config.metrics_enabled:
+        abort(404)
+    return metrics_response()
@@ -2,16 +2,42 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
 import math
+from decimal import Decimal
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import func, or_, select
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import false, func, literal, select, tuple_
 
+from ..auth_helpers import route_reads_to_replica
 from ..db import get_session
+from ..http_cache import (
+    CATALOG_LIST_POLICY,
+    CATALOG_METADATA_POLICY,
+    PRODUCT_DETAIL_POLICY,
+    RELATED_PRODUCTS_POLICY,
+    apply_cache_headers,
+    build_etag,
+    not_modified,
+    request_args_fingerprint,
+)
+from ..json_provider import fragment_response
 from ..models import Product
-from ..serializers import serialize_product
+from ..serializers import ProductFields, parse_product_fields, product_load_options
+from ..services.catalog import get_catalog_state
+from ..services.facets import get_catalog_facets
+from ..services.price_index import get_price_index
+from ..services.product_fragments import get_product_fragments
+from ..services.search import build_search_match
+from ..services.snapshot import get_product_snapshot
+from ..services.suggest import ensure_current, get_suggest_index
 
 products_bp = Blueprint("products", __name__)
+products_bp.before_request(route_reads_to_replica)
+
+_MAX_LOOKUP_IDS = 100
 
 
 def _parse_positive_int(value: str | None, *, default: int, minimum: int, maximum: int) -> int:
@@ -26,10 +52,108 @@ def _parse_positive_int(value: str | None, *, default: int, minimum: int, maximu
     return parsed
 
 
+def _encode_cursor(payload: dict[str, object]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _decode_cursor(value: str) -> dict[str, object]:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(payload, dict) or not isinstance(payload.get("id"), int):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def _filter_signature(category: str | None, query: str | None) -> str:
+    raw = f"{category or ''}\x1f{query or ''}".encode()
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def _parse_id_list(value: object) -> list[int]:
+    if isinstance(value, str):
+        parts = [part.strip() for part in value.split(",") if part.strip()]
+        try:
+            ids = [int(part) for part in parts]
+        except ValueError:
+            raise ValueError("ids must be a comma-separated list of integers") from None
+    elif isinstance(value, list) and all(
+        isinstance(item, int) and not isinstance(item, bool) for item in value
+    ):
+        ids = list(value)
+    else:
+        raise ValueError("ids must be a list of integers")
+
+    unique_ids = list(dict.fromkeys(ids))
+    if not unique_ids:
+        raise ValueError("ids must contain at least one product id")
+    if len(unique_ids) > _MAX_LOOKUP_IDS:
+        raise ValueError(f"ids cannot contain more than {_MAX_LOOKUP_IDS} products")
+    return unique_ids
+
+
+def _lookup_fragments(
+    session, product_ids: list[int], fields: ProductFields | None = None
+) -> tuple[list[bytes], list[int]]:
+    """Return encoded products in ``product_ids`` order plus the ids that do not exist."""
+
+    snapshot = get_product_snapshot(session) if fields is None else None
+    if snapshot is not None:
+        found = {
+            product_id: snapshot[product_id]
+            for product_id in product_ids
+            if product_id in snapshot
+        }
+    else:
+        fragments = get_product_fragments()
+        stmt = (
+            select(Product)
+            .options(*product_load_options(fields))
+            .where(Product.id.in_(product_ids))
+        )
+        found = {product.id: fragments.encode(product, fields) for product in session.scalars(stmt)}
+
+    items = [found[product_id] for product_id in product_ids if product_id in found]
+    missing_ids = [product_id for product_id in product_ids if product_id not in found]
+    return items, missing_ids
+
+
+def _lookup_response(session, product_ids: list[int], fields: ProductFields | None):
+    items, missing_ids = _lookup_fragments(session, product_ids, fields)
+    return fragment_response({"missing_ids": missing_ids}, {"items": items})
+
+
+def _sort_value_for_cursor(product: Product, sort_by: str) -> object:
+    if sort_by == "price":
+        return str(product.price)
+    return product.name
+
 
 @products_bp.get("/products")
 def list_products():  # type: ignore[override]
     session = get_session()
+    catalog = get_catalog_state()
+    etag = build_etag("products", catalog.version(session), request_args_fingerprint())
+    cached = not_modified(etag, CATALOG_LIST_POLICY)
+    if cached is not None:
+        return cached
+
+    try:
+        fields = parse_product_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+
+    ids_param = request.args.get("ids")
+    if ids_param is not None:
+        try:
+            product_ids = _parse_id_list(ids_param)
+        except ValueError as exc:
+            return {"error": str(exc)}, 400
+        response = _lookup_response(session, product_ids, fields)
+        return apply_cache_headers(response, etag, CATALOG_LIST_POLICY)
 
     try:
         page = _parse_positive_int(
@@ -40,69 +164,119 @@ def list_products():  # type: ignore[override]
         )
         category_filter = request.args.get("category")
         search_term = request.args.get("q")
-        sort_by = (request.args.get("sort_by") or "name").lower()
+        sort_by_param = request.args.get("sort_by")
         sort_dir = (request.args.get("sort_dir") or "asc").lower()
+        cursor_param = request.args.get("cursor")
+        cursor = _decode_cursor(cursor_param) if cursor_param else None
     except ValueError as exc:  # pragma: no cover - defensive branch
         return {"error": str(exc)}, 400
 
     filters = []
-    if category_filter and category_filter.strip():
-        filters.append(Product.category == category_filter.strip())
+    category_value = category_filter.strip() if category_filter and category_filter.strip() else None
+    if category_value:
+        filters.append(Product.category == category_value)
+
+    trimmed_search = search_term.strip() if search_term and search_term.strip() else None
+    search_match = build_search_match(session, trimmed_search) if trimmed_search else None
+    matching_filters = list(filters)
+    if trimmed_search and search_match is None:
+        # No searchable words (e.g. punctuation only) means nothing can match.
+        matching_filters.append(false())
+    elif search_match is not None:
+        matching_filters.append(search_match.condition)
 
+    sort_by = (sort_by_param or ("relevance" if search_match else "name")).lower()
     sort_columns = {
         "name": Product.name,
         "price": Product.price,
     }
     sort_column = sort_columns.get(sort_by)
-    if sort_column is None:
-        return {"error": "Invalid sort_by. Use 'name' or 'price'."}, 400
+    if sort_by == "relevance":
+        if search_match is None:
+            return {"error": "sort_by=relevance requires a search query (q)."}, 400
+        if cursor is not None:
+            return {"error": "Cursor pagination is not available for relevance ordering."}, 400
+    elif sort_column is None:
+        return {"error": "Invalid sort_by. Use 'name', 'price' or 'relevance'."}, 400
 
     if sort_dir not in {"asc", "desc"}:
         return {"error": "Invalid sort_dir. Use 'asc' or 'desc'."}, 400
 
-    trimmed_search = search_term.strip() if search_term and search_term.strip() else None
-    if trimmed_search:
-        like_term = f"%{trimmed_search.lower()}%"
-        filters.append(
-            or_(
-                func.lower(Product.name).like(like_term),
-                func.lower(func.coalesce(Product.description, "")).like(like_term),
-            )
-        )
+    signature = _filter_signature(category_value, trimmed_search)
+    if cursor is not None and (
+        cursor.get("sort_by") != sort_by
+        or cursor.get("sort_dir") != sort_dir
+        or cursor.get("filters") != signature
+    ):
+        return {"error": "Cursor does not match the requested filters or sort order."}, 400
 
-    count_stmt = select(func.count()).select_from(Product)
-    if filters:
-        count_stmt = count_stmt.where(*filters)
-    total_items = session.scalar(count_stmt) or 0
-    offset = (page - 1) * page_size
+    def _count_items() -> int:
+        count_stmt = select(func.count()).select_from(Product)
+        if matching_filters:
+            count_stmt = count_stmt.where(*matching_filters)
+        return session.scalar(count_stmt) or 0
 
-    stmt = select(Product)
-    if filters:
-        stmt = stmt.where(*filters)
-    stmt = stmt.order_by(sort_column.asc() if sort_dir == "asc" else sort_column.desc())
-    stmt = stmt.offset(offset).limit(page_size)
-    items = session.scalars(stmt).all()
+    total_items = catalog.memoize(
+        session, ("product_count", category_value, trimmed_search), _count_items
+    )
 
-    total_pages = math.ceil(total_items / page_size) if total_items else 0
+    # The cursor needs the sort column even when the fieldset leaves it out.
+    stmt = select(Product).options(*product_load_options(fields, sort_by))
+    if sort_column is None and search_match is not None:
+        # Joining the ranked matches restricts rows to hits and exposes the score.
+        ranked = search_match.ranked
+        stmt = stmt.join(ranked, ranked.c.product_id == Product.id).where(*filters)
+        stmt = stmt.order_by(search_match.relevance_order(), Product.id.asc())
+    elif sort_dir == "asc":
+        stmt = stmt.where(*matching_filters)
+        stmt = stmt.order_by(sort_column.asc(), Product.id.asc())
+    else:
+        stmt = stmt.where(*matching_filters)
+        stmt = stmt.order_by(sort_column.desc(), Product.id.desc())
 
-    categories_stmt = (
-        select(Product.category)
-        .where(Product.category.isnot(None))
-        .distinct()
-        .order_by(Product.category.asc())
-    )
-    categories = session.scalars(categories_stmt).all()
+    if cursor is not None:
+        # Keyset pagination: continue strictly after the last (sort value, id) seen.
+        last_value: object = cursor.get("value")
+        if sort_by == "price":
+            try:
+                last_value = Decimal(str(last_value))
+            except ArithmeticError:
+                return {"error": "Invalid cursor"}, 400
+        boundary = tuple_(sort_column, Product.id)
+        last_key = tuple_(literal(last_value, sort_column.type), literal(cursor["id"]))
+        stmt = stmt.where(boundary > last_key if sort_dir == "asc" else boundary < last_key)
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
+
+    rows = session.scalars(stmt.limit(page_size + 1)).all()
+    items = rows[:page_size]
+    has_next = len(rows) > page_size
+
+    next_cursor = None
+    if has_next and items and sort_column is not None:
+        next_cursor = _encode_cursor(
+            {
+                "sort_by": sort_by,
+                "sort_dir": sort_dir,
+                "filters": signature,
+                "value": _sort_value_for_cursor(items[-1], sort_by),
+                "id": items[-1].id,
+            }
+        )
 
-    return jsonify(
+    total_pages = math.ceil(total_items / page_size) if total_items else 0
+    categories = get_catalog_facets(session).category_names
+
+    response = fragment_response(
         {
-            "items": [serialize_product(product) for product in items],
             "pagination": {
-                "page": page,
+                "page": None if cursor is not None else page,
                 "page_size": page_size,
                 "total_items": total_items,
                 "total_pages": total_pages,
-                "has_next": page * page_size < total_items,
-                "has_prev": page > 1,
+                "has_next": has_next,
+                "has_prev": cursor is not None or page > 1,
+                "next_cursor": next_cursor,
                 "sort_by": sort_by,
                 "sort_dir": sort_dir,
                 "category": category_filter,
@@ -111,54 +285,121 @@ def list_products():  # type: ignore[override]
             "filters": {
                 "available_categories": categories,
             },
-        }
+        },
+        {"items": get_product_fragments().encode_many(items, fields)},
     )
+    return apply_cache_headers(response, etag, CATALOG_LIST_POLICY)
+
+
+@products_bp.post("/products/lookup")
+def lookup_products():  # type: ignore[override]
+    payload = request.get_json(silent=True) or {}
+    try:
+        product_ids = _parse_id_list(payload.get("ids"))
+        fields = parse_product_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+    return _lookup_response(get_session(), product_ids, fields)
+
+
+@products_bp.get("/products/facets")
+def get_product_facets():  # type: ignore[override]
+    category = (request.args.get("category") or "").strip() or None
+    session = get_session()
+    etag = build_etag("facets", get_catalog_state().version(session), category)
+    cached = not_modified(etag, CATALOG_METADATA_POLICY)
+    if cached is not None:
+        return cached
+
+    facets = get_catalog_facets(session, category=category)
+    payload = facets.as_payload()
+    payload["category"] = category
+    return apply_cache_headers(jsonify(payload), etag, CATALOG_METADATA_POLICY)
+
+
+@products_bp.get("/products/suggest")
+def suggest_products():  # type: ignore[override]
+    query = request.args.get("q") or ""
+    try:
+        limit = _parse_positive_int(
+            request.args.get("limit"), default=8, minimum=1, maximum=20
+        )
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+
+    index = get_suggest_index()
+    ensure_current(index, get_catalog_state(), get_session())
+    etag = build_etag("suggest", index.catalog_token, query, limit)
+    cached = not_modified(etag, CATALOG_LIST_POLICY)
+    if cached is not None:
+        return cached
+
+    response = jsonify({"query": query, "suggestions": index.suggest(query, limit=limit)})
+    return apply_cache_headers(response, etag, CATALOG_LIST_POLICY)
 
 
 @products_bp.get("/products/<int:product_id>")
 def get_product(product_id: int):  # type: ignore[override]
+    try:
+        fields = parse_product_fields(request.args.get("fields"))
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+
     session = get_session()
-    product = session.get(Product, product_id)
-    if product is None:
+    version = session.execute(
+        select(Product.revision, Product.updated_at).where(Product.id == product_id)
+    ).one_or_none()
+    if version is None:
+        return {"error": f"Product {product_id} not found"}, 404
+
+    etag = build_etag(
+        "product", product_id, version.revision, version.updated_at.isoformat(), fields
+    )
+    cached = not_modified(etag, PRODUCT_DETAIL_POLICY)
+    if cached is not None:
+        return cached
+
+    product = session.get(Product, product_id, options=product_load_options(fields))
+    if product is None:  # pragma: no cover - deleted between the two reads
         return {"error": f"Product {product_id} not found"}, 404
-    return jsonify(serialize_product(product))
+    response = current_app.response_class(
+        get_product_fragments().encode(product, fields) + b"\n", mimetype="application/json"
+    )
+    return apply_cache_headers(response, etag, PRODUCT_DETAIL_POLICY)
 
 
 @products_bp.get("/products/<int:product_id>/related")
 def get_related_products(product_id: int):  # type: ignore[override]
     session = get_session()
-    product = session.get(Product, product_id)
-    if product is None:
-        return {"error": f"Product {product_id} not found"}, 404
+    catalog_state = get_catalog_state()
+    etag = build_etag(
+        "related", catalog_state.version(session), product_id, request_args_fingerprint()
+    )
+    cached = not_modified(etag, RELATED_PRODUCTS_POLICY)
+    if cached is not None:
+        return cached
+
+    price_index = get_price_index(session)
+    if product_id not in price_index:
+        # Products committed by another worker reach this worker's index only
+        # after its next version check; rebuild now rather than 404 a real id.
+        if session.scalar(select(Product.id).where(Product.id == product_id)) is None:
+            return {"error": f"Product {product_id} not found"}, 404
+        catalog_state.invalidate()
+        price_index = get_price_index(session)
+        etag = build_etag(
+            "related", catalog_state.version(session), product_id, request_args_fingerprint()
+        )
 
     try:
         limit = _parse_positive_int(
             request.args.get("limit"), default=4, minimum=1, maximum=24
         )
+        fields = parse_product_fields(request.args.get("fields"))
     except ValueError as exc:
         return {"error": str(exc)}, 400
 
-    base_query = select(Product).where(Product.id != product_id)
-    price_diff = func.abs(Product.price - product.price)
-
-    related: list[Product] = []
-    excluded_ids: set[int] = set()
-
-    if product.category:
-        stmt_category = (
-            base_query.where(Product.category == product.category)
-            .order_by(price_diff, Product.id.asc())
-            .limit(limit)
-        )
-        related = session.scalars(stmt_category).all()
-        excluded_ids.update(item.id for item in related)
-
-    if len(related) < limit:
-        remaining = limit - len(related)
-        stmt_fallback = base_query
-        if excluded_ids:
-            stmt_fallback = stmt_fallback.where(~Product.id.in_(excluded_ids))
-        stmt_fallback = stmt_fallback.order_by(price_diff, Product.id.asc()).limit(remaining)
-        related.extend(session.scalars(stmt_fallback).all())
-
-    return jsonify({"items": [serialize_product(item) for item in related]})
+    related_ids = price_index.related(product_id, limit=limit)
+    items, _ = _lookup_fragments(session, related_ids, fields)
+    response = fragment_response({}, {"items": items})
+    return apply_cache_headers(response, etag, RELATED_PRODUCTS_POLICY)
@@ -2,13 +2,28 @@
 
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 
+from ..auth_helpers import route_reads_to_replica
 from ..db import get_session
-from ..serializers import serialize_product
-from ..services.recommendations import fetch_placeholder_recommendations
+from ..http_cache import (
+    RECOMMENDATIONS_POLICY,
+    apply_cache_headers,
+    build_etag,
+    not_modified,
+    request_args_fingerprint,
+)
+from ..json_provider import fragment_response
+from ..serializers import parse_product_fields, product_load_options
+from ..services.catalog import get_catalog_state
+from ..services.product_fragments import get_product_fragments
+from ..services.recommendations import (
+    fetch_placeholder_recommendations,
+    recommendation_model_version,
+)
 
 recommendations_bp = Blueprint("recommendations", __name__)
+recommendations_bp.before_request(route_reads_to_replica)
 
 
 def _parse_positive_int(value: str | None, *, default: int, minimum: int, maximum: int) -> int:
@@ -26,12 +41,23 @@ def _parse_positive_int(value: str | None, *, default: int, minimum: int, maximu
 @recommendations_bp.get("/recommendations")
 def get_recommendations():  # type: ignore[override]
     session = get_session()
+    etag = build_etag(
+        "recommendations",
+        recommendation_model_version(),
+        get_catalog_state().version(session),
+        request_args_fingerprint(),
+    )
+    cached = not_modified(etag, RECOMMENDATIONS_POLICY)
+    if cached is not None:
+        return cached
+
     context = (request.args.get("context") or "home").strip().lower()
 
     try:
         limit = _parse_positive_int(
             request.args.get("limit"), default=6, minimum=1, maximum=24
         )
+        fields = parse_product_fields(request.args.get("fields"))
     except ValueError as exc:
         return {"error": str(exc)}, 400
 
@@ -50,16 +76,18 @@ def get_recommendations():  # type: ignore[override]
         session,
         limit=limit,
         product_id=product_id,
+        load_options=product_load_options(fields),
     )
 
-    return jsonify(
+    response = fragment_response(
         {
-            "items": [serialize_product(product) for product in items],
             "metadata": {
                 "limit": limit,
                 "context": context,
                 "strategy": strategy,
                 "product_id": product_id,
             },
-        }
+        },
+        {"items": get_product_fragments().encode_many(items, fields)},
     )
+    return apply_cache_headers(response, etag, RECOMMENDATIONS_POLICY)
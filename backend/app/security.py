@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from werkzeug.security import check_password_hash, generate_password_hash
@@ -15,16 +16,23 @@ class TokenVerificationResult:
     """Represents the outcome of decoding a token."""
 
     user_id: int
+    expires_at: float | None = None  # Unix time after which the token is rejected
 
 
 class TokenError(Exception):
     """Raised when a token cannot be decoded."""
 
 
-def hash_password(plain_password: str) -> str:
-    """Hash a plaintext password using Werkzeug helpers."""
+def hash_password(plain_password: str, method: str | None = None) -> str:
+    """Hash a plaintext password using Werkzeug helpers.
 
-    return generate_password_hash(plain_password)
+    ``method`` sets the algorithm and work factor (e.g. ``scrypt:32768:8:1`` or
+    ``pbkdf2:sha256:600000``); Werkzeug's default is used when omitted.
+    """
+
+    if method is None:
+        return generate_password_hash(plain_password)
+    return generate_password_hash(plain_password, method=method)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -33,6 +41,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return check_password_hash(hashed_password, plain_password)
 
 
+@lru_cache(maxsize=8)
 def _build_serializer(secret_key: str) -> URLSafeTimedSerializer:
     return URLSafeTimedSerializer(secret_key, salt=_TOKEN_SALT)
 
@@ -49,7 +58,7 @@ def decode_access_token(token: str, secret_key: str, max_age_seconds: int) -> To
 
     serializer = _build_serializer(secret_key)
     try:
-        data = serializer.loads(token, max_age=max_age_seconds)
+        data, signed_at = serializer.loads(token, max_age=max_age_seconds, return_timestamp=True)
     except SignatureExpired as exc:  # pragma: no cover - straight-through error paths
         raise TokenError("Token has expired") from exc
     except BadSignature as exc:  # pragma: no cover - straight-through error paths
@@ -59,7 +68,9 @@ def decode_access_token(token: str, secret_key: str, max_age_seconds: int) -> To
     if not isinstance(user_id, int):  # pragma: no cover - defensive
         raise TokenError("Token payload is malformed")
 
-    return TokenVerificationResult(user_id=user_id)
+    return TokenVerificationResult(
+        user_id=user_id, expires_at=signed_at.timestamp() + max_age_seconds
+    )
 
 
 __all__ = [
@@ -2,23 +2,83 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
 from .models import Product
 
+ProductFields = tuple[str, ...]
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+_PRODUCT_FIELD_GETTERS: dict[str, Callable[[Product], object]] = {
+    "id": lambda product: product.id,
+    "name": lambda product: product.name,
+    "description": lambda product: product.description,
+    "category": lambda product: product.category,
+    "price": lambda product: float(product.price),
+    "currency": lambda product: product.currency,
+    "image_url": lambda product: product.image_url,
+    "created_at": lambda product: _isoformat(product.created_at),
+    "updated_at": lambda product: _isoformat(product.updated_at),
+}
+
+PRODUCT_FIELDS: ProductFields = tuple(_PRODUCT_FIELD_GETTERS)
+
+
+def parse_product_fields(value: str | None) -> ProductFields | None:
+    """Parse a ``fields=`` sparse fieldset; ``None`` selects every field.
+
+    ``id`` is always included. Raises ``ValueError`` for unknown field names.
+    """
+
+    if value is None or not value.strip():
+        return None
+    requested = {part.strip() for part in value.split(",") if part.strip()}
+    unknown = requested.difference(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Available fields: {', '.join(PRODUCT_FIELDS)}"
+        )
+    requested.add("id")
+    fields = tuple(name for name in PRODUCT_FIELDS if name in requested)
+    return None if fields == PRODUCT_FIELDS else fields
+
+
+def product_load_options(fields: ProductFields | None, *required: str) -> list[LoaderOption]:
+    """Loader options fetching only ``fields`` plus ``required`` columns.
+
+    ``revision`` and ``updated_at`` are always loaded because cached product
+    fragments are keyed on them.
+    """
+
+    if fields is None:
+        return []
+    names = {*fields, *required, "updated_at"}
+    columns = [getattr(Product, name) for name in PRODUCT_FIELDS if name in names]
+    return [load_only(*columns, Product.revision)]
+
+
+def serialize_product(product: Product, fields: ProductFields | None = None) -> dict[str, object]:
+    """Convert a Product ORM instance into a JSON-serializable dict.
 
-def serialize_product(product: Product) -> dict[str, object]:
-    """Convert a Product ORM instance into a JSON-serializable dict."""
+    Only ``fields`` are read when given, so deferred columns are never loaded.
+    """
 
-    return {
-        "id": product.id,
-        "name": product.name,
-        "description": product.description,
-        "category": product.category,
-        "price": float(product.price),
-        "currency": product.currency,
-        "image_url": product.image_url,
-        "created_at": product.created_at.isoformat() if product.created_at else None,
-        "updated_at": product.updated_at.isoformat() if product.updated_at else None,
-    }
+    return {name: _PRODUCT_FIELD_GETTERS[name](product) for name in (fields or PRODUCT_FIELDS)}
 
 
-__all__ = ["serialize_product"]
+__all__ = [
+    "PRODUCT_FIELDS",
+    "ProductFields",
+    "parse_product_fields",
+    "product_load_options",
+    "serialize_product",
+]
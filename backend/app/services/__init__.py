@@ -2,12 +2,16 @@
 
 from .interactions import (
     ALLOWED_INTERACTION_TYPES,
+    InteractionEvent,
     InteractionLoggingError,
     log_interaction,
+    log_interactions_bulk,
 )
 
 __all__ = [
     "ALLOWED_INTERACTION_TYPES",
+    "InteractionEvent",
     "InteractionLoggingError",
     "log_interaction",
+    "log_interactions_bulk",
 ]
@@ -0,0 +1,138 @@
+"""Per-process caches for bearer-token authentication.
+
+Verified tokens map to ``(user_id, expires_at)`` so the HMAC is checked once per
+token instead of once per request, and user rows are kept for a short TTL so
+authenticated requests skip ``session.get(User, ...)``. Commits that modify or
+delete a user evict it locally; other workers see the change within
+``AUTH_USER_CACHE_TTL_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from flask import Flask, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, sessionmaker
+
+from ..config import AppConfig
+from ..models import User
+
+_CHANGED_USERS_KEY = "auth_changed_users"
+# Secrets stay out of the process-wide cache; they are loaded on access if needed.
+_CACHED_USER_COLUMNS = tuple(
+    attr.key for attr in User.__mapper__.column_attrs if attr.key != "hashed_password"
+)
+
+
+class AuthCache:
+    """Size-bounded caches of verified tokens and of user columns (with a TTL)."""
+
+    def __init__(self, *, max_entries: int, user_ttl_seconds: float) -> None:
+        self._max_entries = max_entries
+        self._user_ttl_seconds = user_ttl_seconds
+        self._lock = threading.Lock()
+        self._tokens: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._users: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def _store(self, entries: OrderedDict, key: Any, value: Any) -> None:
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+
+    def token_user_id(self, token: str) -> int | None:
+        """Return the user id of a previously verified, unexpired token."""
+
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        with self._lock:
+            if entry[1] <= time.time():
+                self._tokens.pop(token, None)
+                return None
+            if token in self._tokens:
+                # Least recently used tokens are evicted first when the cache is full.
+                self._tokens.move_to_end(token)
+        return entry[0]
+
+    def remember_token(self, token: str, user_id: int, expires_at: float | None) -> None:
+        if self._max_entries > 0 and expires_at is not None:
+            self._store(self._tokens, token, (user_id, expires_at))
+
+    def get_user(self, session: Session, user_id: int) -> User | None:
+        """Return ``user_id`` attached to ``session``, from the cache when fresh."""
+
+        entry = self._users.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            cached = User(**entry[1])
+            make_transient_to_detached(cached)
+            # load=False attaches the cached state without querying.
+            return session.merge(cached, load=False)
+
+        user = session.get(User, user_id)
+        if user is not None and self._max_entries > 0 and self._user_ttl_seconds > 0:
+            columns = {key: getattr(user, key) for key in _CACHED_USER_COLUMNS}
+            self._store(self._users, user_id, (time.monotonic() + self._user_ttl_seconds, columns))
+        return user
+
+    def evict_users(self, user_ids: set[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+
+
+def _register_user_invalidation(factory: sessionmaker, cache: AuthCache) -> None:
+    @event.listens_for(factory, "after_flush")
+    def _collect_user_writes(session: Session, _flush_context) -> None:
+        changed = {
+            obj.id
+            for obj in (*session.dirty, *session.deleted)
+            if isinstance(obj, User) and obj.id is not None
+        }
+        if changed:
+            session.info.setdefault(_CHANGED_USERS_KEY, set()).update(changed)
+
+    @event.listens_for(factory, "after_commit")
+    def _evict_on_commit(session: Session) -> None:
+        changed = session.info.pop(_CHANGED_USERS_KEY, None)
+        if changed:
+            cache.evict_users(changed)
+
+    @event.listens_for(factory, "after_rollback")
+    def _discard_on_rollback(session: Session) -> None:
+        session.info.pop(_CHANGED_USERS_KEY, None)
+
+
+def init_auth_cache(app: Flask, config: AppConfig) -> AuthCache:
+    """Create the auth cache and evict users changed by the app's sessions."""
+
+    cache = AuthCache(
+        max_entries=config.auth_cache_max_entries,
+        user_ttl_seconds=config.auth_user_cache_ttl_seconds,
+    )
+    _register_user_invalidation(app.config["DB_SESSION"].session_factory, cache)
+    app.config["AUTH_CACHE"] = cache
+    return cache
+
+
+def get_auth_cache(flask_app: Flask | None = None) -> AuthCache:
+    """Return the auth cache registered on the current app."""
+
+    app_context = flask_app or current_app
+    cache: AuthCache | None = app_context.config.get("AUTH_CACHE")
+    if cache is None:
+        raise RuntimeError("Auth cache is not initialized")
+    return cache
+
+
+__all__ = ["AuthCache", "get_auth_cache", "init_auth_cache"]
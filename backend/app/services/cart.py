@@ -0,0 +1,397 @@
+"""Cart reads and mutations with incrementally maintained totals.
+
+Each request loads the user's open cart once (items and their products eagerly)
+and mutates it in place: line changes use a dialect-native upsert on
+``uq_cart_product`` with ``RETURNING``, and ``Cart.item_count`` /
+``Cart.subtotal`` are adjusted by the same deltas in a single ``UPDATE ...
+RETURNING``. The in-memory cart is left consistent with the database, so
+responses are serialized without reloading it.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import Cart, CartItem, Order, Product, User
+
+MAX_QUANTITY = 99
+
+_INSERT_BUILDERS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+OP_ADD = "add"
+OP_SET = "set"
+OP_REMOVE = "remove"
+CART_OPERATIONS = (OP_ADD, OP_SET, OP_REMOVE)
+
+
+class CartQuantityError(ValueError):
+    """Raised when a mutation would exceed the per-line quantity limit."""
+
+
+class CartProductsNotFoundError(LookupError):
+    """Raised when bulk operations reference products that do not exist."""
+
+    def __init__(self, missing_ids: list[int]) -> None:
+        super().__init__("Products not found.")
+        self.missing_ids = missing_ids
+
+
+class CartOperation(NamedTuple):
+    """One step of :func:`apply_operations`: add to, set or remove a product's line."""
+
+    op: str
+    product_id: int
+    quantity: int = 0
+
+
+def load_open_cart(session: Session, user: User) -> Cart:
+    """Return the user's open cart with items and products loaded, creating it if needed."""
+
+    stmt = (
+        select(Cart)
+        .where(Cart.user_id == user.id, Cart.status == "open")
+        .options(joinedload(Cart.items).joinedload(CartItem.product))
+        .order_by(Cart.id.desc())
+        .limit(1)
+    )
+    cart = session.scalars(stmt).unique().first()
+    if cart is not None:
+        return cart
+
+    cart = Cart(user_id=user.id, status="open", item_count=0, subtotal=Decimal("0"), currency="USD")
+    session.add(cart)
+    session.flush()
+    set_committed_value(cart, "items", [])
+    return cart
+
+
+def find_cart_item(cart: Cart, item_id: int) -> CartItem | None:
+    return next((item for item in cart.items if item.id == item_id), None)
+
+
+def _adjust_totals(
+    session: Session,
+    cart: Cart,
+    count_delta: int,
+    subtotal_delta: Decimal,
+    *,
+    currency: str | None = None,
+) -> None:
+    values = {
+        "item_count": Cart.item_count + count_delta,
+        "subtotal": Cart.subtotal + subtotal_delta,
+        "updated_at": func.now(),
+    }
+    if currency is not None:
+        values["currency"] = currency
+    row = session.execute(
+        update(Cart)
+        .where(Cart.id == cart.id)
+        .values(values)
+        .returning(Cart.item_count, Cart.subtotal, Cart.currency, Cart.updated_at)
+        .execution_options(synchronize_session=False)
+    ).one()
+    for name, value in row._mapping.items():
+        set_committed_value(cart, name, value)
+
+
+def _line_total(quantity: int, unit_price: Decimal | None) -> Decimal:
+    return Decimal(unit_price or 0) * quantity
+
+
+def _insert_builder(session: Session):
+    builder = _INSERT_BUILDERS.get(session.get_bind().dialect.name)
+    if builder is None:
+        raise RuntimeError("Cart upserts support SQLite and PostgreSQL only")
+    return builder
+
+
+def add_item(session: Session, cart: Cart, product: Product, quantity: int) -> CartItem:
+    """Add ``quantity`` of ``product`` to ``cart`` (merging with an existing line).
+
+    Raises ``CartQuantityError`` when the line would exceed ``MAX_QUANTITY``.
+    """
+
+    builder = _insert_builder(session)
+    existing = next((item for item in cart.items if item.product_id == product.id), None)
+
+    stmt = builder(CartItem).values(
+        cart_id=cart.id, product_id=product.id, quantity=quantity, unit_price=product.price
+    )
+    merged_quantity = CartItem.quantity + stmt.excluded.quantity
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["cart_id", "product_id"],
+        set_={
+            "quantity": merged_quantity,
+            "unit_price": stmt.excluded.unit_price,
+            "updated_at": func.now(),
+        },
+        where=merged_quantity <= MAX_QUANTITY,
+    ).returning(CartItem)
+    item = session.scalars(stmt, execution_options={"populate_existing": True}).first()
+    if item is None:
+        raise CartQuantityError(f"Quantity cannot exceed {MAX_QUANTITY}.")
+    set_committed_value(item, "product", product)
+
+    # RETURNING reports the merged quantity atomically; the previous unit price
+    # comes from the loaded line (or equals the new one for a concurrent insert).
+    previous_quantity = item.quantity - quantity
+    previous_price = existing.unit_price if existing is not None else item.unit_price
+    _adjust_totals(
+        session,
+        cart,
+        quantity,
+        _line_total(item.quantity, item.unit_price)
+        - _line_total(previous_quantity, previous_price),
+        # The first line added to an empty cart sets its currency.
+        currency=product.currency if not cart.items else None,
+    )
+    if existing is None:
+        set_committed_value(cart, "items", [*cart.items, item])
+    return item
+
+
+def set_item_quantity(session: Session, cart: Cart, item: CartItem, quantity: int) -> None:
+    """Set a line's quantity; zero removes the line."""
+
+    if quantity == 0:
+        remove_item(session, cart, item)
+        return
+    delta = quantity - item.quantity
+    item.quantity = quantity
+    _adjust_totals(session, cart, delta, _line_total(delta, item.unit_price))
+
+
+def remove_item(session: Session, cart: Cart, item: CartItem) -> None:
+    remaining = [line for line in cart.items if line is not item]
+    session.delete(item)
+    _adjust_totals(
+        session,
+        cart,
+        -item.quantity,
+        -_line_total(item.quantity, item.unit_price),
+        currency=None if remaining else "USD",
+    )
+    set_committed_value(cart, "items", remaining)
+
+
+def apply_operations(
+    session: Session, cart: Cart, operations: list[CartOperation]
+) -> dict[int, int]:
+    """Apply ``operations`` in order and write the net result in a fixed number of statements.
+
+    Unknown products are looked up with one query, changed lines are written
+    with one multi-row upsert (at the current product price) and emptied lines
+    with one ``DELETE``. Returns the final quantity of every product touched.
+    Raises ``CartProductsNotFoundError`` or ``CartQuantityError`` before writing.
+    """
+
+    lines = {item.product_id: item for item in cart.items}
+    quantities = {product_id: item.quantity for product_id, item in lines.items()}
+    touched: dict[int, int] = {}
+    for operation in operations:
+        current = touched.get(operation.product_id, quantities.get(operation.product_id, 0))
+        if operation.op == OP_ADD:
+            current += operation.quantity
+        elif operation.op == OP_SET:
+            current = operation.quantity
+        elif operation.op == OP_REMOVE:
+            current = 0
+        else:
+            raise ValueError(f"Unsupported cart operation: {operation.op}")
+        if current > MAX_QUANTITY:
+            raise CartQuantityError(
+                f"Quantity for product {operation.product_id} cannot exceed {MAX_QUANTITY}."
+            )
+        touched[operation.product_id] = current
+
+    unknown = [product_id for product_id in touched if product_id not in lines]
+    products = {item.product_id: item.product for item in cart.items}
+    if unknown:
+        products.update(
+            (product.id, product)
+            for product in session.scalars(select(Product).where(Product.id.in_(unknown)))
+        )
+        missing = sorted(set(unknown).difference(products))
+        if missing:
+            raise CartProductsNotFoundError(missing)
+
+    upserts = [
+        {
+            "cart_id": cart.id,
+            "product_id": product_id,
+            "quantity": quantity,
+            "unit_price": products[product_id].price,
+        }
+        for product_id, quantity in touched.items()
+        if quantity > 0
+        and (
+            product_id not in lines
+            or quantities[product_id] != quantity
+            or lines[product_id].unit_price != products[product_id].price
+        )
+    ]
+    removed = [
+        product_id
+        for product_id, quantity in touched.items()
+        if quantity == 0 and product_id in lines
+    ]
+    if not upserts and not removed:
+        return touched
+
+    old_count = cart.item_count
+    old_subtotal = Decimal(cart.subtotal)
+    items = [line for line in cart.items if line.product_id not in removed]
+    if upserts:
+        stmt = _insert_builder(session)(CartItem)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["cart_id", "product_id"],
+            set_={
+                "quantity": stmt.excluded.quantity,
+                "unit_price": stmt.excluded.unit_price,
+                "updated_at": func.now(),
+            },
+        ).returning(CartItem)
+        written = session.scalars(
+            stmt, upserts, execution_options={"populate_existing": True}
+        ).all()
+        for item in written:
+            # populate_existing resets loaded relationships; reattach the products.
+            set_committed_value(item, "product", products[item.product_id])
+            if item.product_id not in lines:
+                items.append(item)
+    if removed:
+        session.execute(
+            delete(CartItem)
+            .where(CartItem.cart_id == cart.id, CartItem.product_id.in_(removed))
+            .execution_options(synchronize_session=False)
+        )
+        for product_id in removed:
+            session.expunge(lines[product_id])
+
+    new_count = sum(item.quantity for item in items)
+    new_subtotal = sum(
+        (_line_total(item.quantity, item.unit_price) for item in items), Decimal("0")
+    )
+    if not items:
+        currency = "USD"
+    elif not cart.items:
+        currency = products[items[0].product_id].currency
+    else:
+        currency = None
+    _adjust_totals(
+        session, cart, new_count - old_count, new_subtotal - old_subtotal, currency=currency
+    )
+    set_committed_value(cart, "items", items)
+    return touched
+
+
+def checkout(session: Session, cart: Cart) -> tuple[Order, Cart]:
+    """Submit ``cart`` as a confirmed order and open a fresh cart for its user.
+
+    The total is computed in one pass over the loaded lines, and the flush
+    issues the same three statements whatever the cart size. A concurrent
+    checkout of the same cart fails the flush with ``IntegrityError`` (unique
+    ``orders.cart_id``).
+    """
+
+    total = sum((_line_total(item.quantity, item.unit_price) for item in cart.items), Decimal("0"))
+    cart.status = "submitted"
+    order = Order(user_id=cart.user_id, cart_id=cart.id, total_amount=total, status="confirmed")
+    new_cart = Cart(
+        user_id=cart.user_id,
+        status="open",
+        item_count=0,
+        subtotal=Decimal("0"),
+        currency="USD",
+    )
+    session.add_all([order, new_cart])
+    session.flush()
+    set_committed_value(new_cart, "items", [])
+    return order, new_cart
+
+
+def fetch_cart_summary(session: Session, user_id: int) -> dict[str, object]:
+    """Return the open cart's counters from one indexed row read (no items, no insert)."""
+
+    row = session.execute(
+        select(Cart.id, Cart.item_count, Cart.subtotal, Cart.currency, Cart.updated_at)
+        .where(Cart.user_id == user_id, Cart.status == "open")
+        .order_by(Cart.id.desc())
+        .limit(1)
+    ).first()
+    if row is None:
+        return {"id": None, "item_count": 0, "subtotal": 0.0, "currency": "USD", "updated_at": None}
+    return {
+        "id": row.id,
+        "item_count": row.item_count,
+        "subtotal": float(row.subtotal),
+        "currency": row.currency,
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+
+
+def _serialize_product_summary(product: Product) -> dict[str, object]:
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": float(product.price),
+        "currency": product.currency,
+        "image_url": product.image_url,
+    }
+
+
+def serialize_cart(cart: Cart) -> dict[str, object]:
+    items_payload: list[dict[str, object]] = []
+
+    for item in cart.items:
+        price = Decimal(item.unit_price or 0)
+        items_payload.append(
+            {
+                "id": item.id,
+                "quantity": item.quantity,
+                "unit_price": float(price),
+                "line_total": float(price * item.quantity),
+                "product": _serialize_product_summary(item.product),
+            }
+        )
+
+    return {
+        "id": cart.id,
+        "status": cart.status,
+        "currency": cart.currency,
+        "item_count": cart.item_count,
+        "subtotal": float(cart.subtotal),
+        "items": items_payload,
+        "created_at": cart.created_at.isoformat() if cart.created_at else None,
+        "updated_at": cart.updated_at.isoformat() if cart.updated_at else None,
+    }
+
+
+__all__ = [
+    "CART_OPERATIONS",
+    "MAX_QUANTITY",
+    "OP_ADD",
+    "OP_REMOVE",
+    "OP_SET",
+    "CartOperation",
+    "CartProductsNotFoundError",
+    "CartQuantityError",
+    "add_item",
+    "apply_operations",
+    "fetch_cart_summary",
+    "checkout",
+    "find_cart_item",
+    "load_open_cart",
+    "remove_item",
+    "serialize_cart",
+    "set_item_quantity",
+]
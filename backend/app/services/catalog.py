@@ -0,0 +1,294 @@
+"""Catalog versioning and memoized catalog reads.
+
+Every transaction that writes ``products`` bumps the single-row
+``catalog_revision`` counter (:func:`bump_catalog_revision`; the session hooks
+below do it for ORM writes, scripts call it for Core DML). The catalog version
+is a fingerprint of that revision plus the row count, highest id and latest
+``updated_at``, so every worker that looks at the same data derives the same
+token, and two writes within one second (``updated_at`` resolution on SQLite)
+still produce different tokens. Workers re-check the fingerprint at most once
+per ``CATALOG_CACHE_TTL_SECONDS`` and immediately after committing product
+writes themselves; anything memoized under an older token is recomputed on
+demand.
+
+Subscribers registered with :meth:`CatalogState.subscribe` receive the product
+rows changed by each local commit so in-memory indexes can update incrementally.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, TypeVar
+
+from flask import Flask, current_app
+from sqlalchemy import Connection, event, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import AppConfig
+from ..models import CatalogRevision, Product
+
+T = TypeVar("T")
+
+_CHANGES_KEY = "catalog_changes"
+_REVISION_ROW_ID = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ProductRecord:
+    """Snapshot of the product columns in-memory catalog indexes rely on."""
+
+    id: int
+    name: str
+    category: str | None
+    price: Decimal
+
+
+@dataclass(slots=True)
+class CatalogChanges:
+    """Product writes committed by one local transaction.
+
+    ``bulk`` is set when Core DML touched ``products``; the affected rows are
+    unknown then, so subscribers should rebuild from the database.
+    ``base_revision`` and ``revision`` are the catalog revisions just before and
+    after this transaction's writes; the counter's row lock makes them
+    contiguous, so nothing else was committed in between.
+    """
+
+    upserted: dict[int, ProductRecord] = field(default_factory=dict)
+    deleted: set[int] = field(default_factory=set)
+    bulk: bool = False
+    base_revision: int | None = None
+    revision: int | None = None
+
+    def record_upsert(self, product: Product) -> None:
+        self.deleted.discard(product.id)
+        self.upserted[product.id] = ProductRecord(
+            id=product.id,
+            name=product.name,
+            category=product.category,
+            price=Decimal(product.price),
+        )
+
+    def record_delete(self, product_id: int) -> None:
+        self.upserted.pop(product_id, None)
+        self.deleted.add(product_id)
+
+    def record_revision(self, revision: int) -> None:
+        if self.base_revision is None:
+            self.base_revision = revision - 1
+        self.revision = revision
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogVersion:
+    """A version token together with the catalog revision it was derived from."""
+
+    token: str
+    revision: int | None
+
+
+def bump_catalog_revision(connection: Connection) -> int:
+    """Advance the catalog revision in the caller's transaction; return the new value.
+
+    Call from every transaction that writes ``products`` outside the app's
+    session (ORM writes through it are bumped automatically).
+    """
+
+    row = CatalogRevision.__table__.c
+    connection.execute(
+        update(CatalogRevision.__table__)
+        .where(row.id == _REVISION_ROW_ID)
+        .values(revision=row.revision + 1)
+    )
+    return connection.scalar(select(row.revision).where(row.id == _REVISION_ROW_ID))
+
+
+class CatalogState:
+    """Process-local view of the catalog version plus values derived from it."""
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int = 1024) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._current: CatalogVersion | None = None
+        self._checked_at = 0.0
+        self._memo: OrderedDict[Hashable, tuple[str, Any]] = OrderedDict()
+        self._subscribers: list[Callable[[CatalogChanges], None]] = []
+
+    def invalidate(self) -> None:
+        """Drop memoized values and force a fingerprint check on the next read."""
+
+        with self._lock:
+            self._current = None
+            self._memo.clear()
+
+    def subscribe(self, callback: Callable[[CatalogChanges], None]) -> None:
+        """Call ``callback`` with the changes of every local catalog commit."""
+
+        self._subscribers.append(callback)
+
+    def publish(self, changes: CatalogChanges) -> None:
+        """Invalidate cached values and notify subscribers about ``changes``."""
+
+        self.invalidate()
+        for callback in list(self._subscribers):
+            callback(changes)
+
+    def version(self, session: Session) -> str:
+        """Return the current catalog version token."""
+
+        return self.current(session).token
+
+    def current(self, session: Session) -> CatalogVersion:
+        """Return the current version token and the revision it covers."""
+
+        now = time.monotonic()
+        current = self._current
+        if current is not None and now - self._checked_at < self._ttl_seconds:
+            return current
+
+        revision = (
+            select(CatalogRevision.revision)
+            .where(CatalogRevision.id == _REVISION_ROW_ID)
+            .scalar_subquery()
+        )
+        count, max_id, max_updated_at, revision = session.execute(
+            select(
+                func.count(Product.id),
+                func.max(Product.id),
+                func.max(Product.updated_at),
+                revision,
+            )
+        ).one()
+        fingerprint = f"{revision}:{count}:{max_id}:{max_updated_at}"
+        current = CatalogVersion(
+            hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16], revision
+        )
+
+        with self._lock:
+            if self._current is None or current.token != self._current.token:
+                self._memo.clear()
+            self._current = current
+            self._checked_at = now
+        return current
+
+    def memoize(self, session: Session, key: Hashable, compute: Callable[[], T]) -> T:
+        """Return the value cached for ``key`` under the current version."""
+
+        token = self.version(session)
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None and entry[0] == token:
+                self._memo.move_to_end(key)
+                return entry[1]
+
+        value = compute()
+        with self._lock:
+            self._memo[key] = (token, value)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self._max_entries:
+                self._memo.popitem(last=False)
+        return value
+
+
+def load_product_records(session: Session) -> list[ProductRecord]:
+    """Read the columns the in-memory catalog indexes need for every product."""
+
+    rows = session.execute(select(Product.id, Product.name, Product.category, Product.price))
+    return [
+        ProductRecord(id=row.id, name=row.name, category=row.category, price=row.price)
+        for row in rows
+    ]
+
+
+def _pending_changes(session: Session) -> CatalogChanges:
+    changes = session.info.get(_CHANGES_KEY)
+    if changes is None:
+        changes = session.info[_CHANGES_KEY] = CatalogChanges()
+    return changes
+
+
+def _register_write_tracking(factory: sessionmaker, state: CatalogState) -> None:
+    @event.listens_for(factory, "after_flush")
+    def _collect_orm_writes(session: Session, _flush_context) -> None:
+        wrote = False
+        for obj in session.new:
+            if isinstance(obj, Product):
+                _pending_changes(session).record_upsert(obj)
+                wrote = True
+        for obj in session.dirty:
+            if isinstance(obj, Product) and session.is_modified(obj):
+                _pending_changes(session).record_upsert(obj)
+                wrote = True
+        for obj in session.deleted:
+            if isinstance(obj, Product):
+                _pending_changes(session).record_delete(obj.id)
+                wrote = True
+        if wrote:
+            _pending_changes(session).record_revision(bump_catalog_revision(session.connection()))
+
+    @event.listens_for(factory, "do_orm_execute")
+    def _mark_bulk_writes(orm_execute_state) -> None:
+        if not (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            return
+        # ORM DML targets an annotated copy of the table, so compare rather than
+        # test identity; bind_mapper covers update(Product)/delete(Product).
+        table = getattr(orm_execute_state.statement, "table", None)
+        if orm_execute_state.bind_mapper is Product.__mapper__ or (
+            table is not None and table.compare(Product.__table__)
+        ):
+            session = orm_execute_state.session
+            changes = _pending_changes(session)
+            changes.bulk = True
+            changes.record_revision(bump_catalog_revision(session.connection()))
+
+    @event.listens_for(factory, "after_commit")
+    def _publish_on_commit(session: Session) -> None:
+        changes = session.info.pop(_CHANGES_KEY, None)
+        if changes is not None:
+            state.publish(changes)
+
+    @event.listens_for(factory, "after_rollback")
+    def _discard_on_rollback(session: Session) -> None:
+        session.info.pop(_CHANGES_KEY, None)
+
+
+def init_catalog_state(app: Flask, config: AppConfig) -> CatalogState:
+    """Create the catalog state and hook it into the app's session factory."""
+
+    state = CatalogState(ttl_seconds=config.catalog_cache_ttl_seconds)
+    _register_write_tracking(app.config["DB_SESSION"].session_factory, state)
+    app.config["CATALOG_STATE"] = state
+    return state
+
+
+def get_catalog_state(flask_app: Flask | None = None) -> CatalogState:
+    """Return the catalog state registered on the current app."""
+
+    app_context = flask_app or current_app
+    state: CatalogState | None = app_context.config.get("CATALOG_STATE")
+    if state is None:
+        raise RuntimeError("Catalog state is not initialized")
+    return state
+
+
+__all__ = [
+    "CatalogChanges",
+    "CatalogState",
+    "CatalogVersion",
+    "ProductRecord",
+    "bump_catalog_revision",
+    "get_catalog_state",
+    "init_catalog_state",
+    "load_product_records",
+]
@@ -0,0 +1,282 @@
+"""Bulk catalog import from CSV or JSONL with dialect-native upserts.
+
+Input is streamed and written in batches of ``INSERT ... ON CONFLICT (sku) DO
+UPDATE`` (SQLite and PostgreSQL) sent through the driver's ``executemany``
+(pipelined by psycopg), one transaction per batch, so memory stays flat and
+throughput scales linearly with catalog size. Rows whose values
+did not change are left untouched, which keeps ``updated_at`` and ``revision``
+(and therefore ETags and cached product payloads) stable for re-imports of the
+same feed.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO, Any, NamedTuple
+
+from sqlalchemy import Connection, Engine, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..models import Product
+from .catalog import bump_catalog_revision
+from .search import deferred_search_index
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+DEFAULT_BATCH_SIZE = 1_000
+
+PRODUCT_COLUMNS = ("sku", "name", "description", "category", "price", "currency", "image_url")
+_UPDATABLE_COLUMNS = PRODUCT_COLUMNS[1:]
+_MAX_LENGTHS = {"sku": 64, "name": 200, "category": 100, "currency": 3, "image_url": 500}
+_MAX_PRICE = Decimal(10) ** 8  # Numeric(10, 2)
+_MAX_REPORTED_ERRORS = 20
+
+_INSERT_BUILDERS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+_products = Product.__table__
+
+
+@dataclass(slots=True)
+class ImportStats:
+    """Summary of an import run."""
+
+    read: int = 0
+    written: int = 0
+    unchanged: int = 0
+    rejected: int = 0
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def reject(self, line: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+
+def _optional_text(value: Any) -> str | None:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def normalize_product_row(raw: dict[str, Any]) -> dict[str, Any]:
+    """Validate one input record and return the column values to write.
+
+    Raises ``ValueError`` with a readable message for invalid records.
+    """
+
+    sku = _optional_text(raw.get("sku"))
+    if sku is None:
+        raise ValueError("sku is required")
+    name = _optional_text(raw.get("name"))
+    if name is None:
+        raise ValueError("name is required")
+    try:
+        price = Decimal(str(raw.get("price")).strip())
+        if not price.is_finite():
+            raise ValueError
+        price = price.quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"invalid price {raw.get('price')!r}") from None
+    if not 0 <= price < _MAX_PRICE:
+        raise ValueError(f"price must be between 0 and {_MAX_PRICE - Decimal('0.01')}")
+
+    row = {
+        "sku": sku,
+        "name": name,
+        "description": _optional_text(raw.get("description")),
+        "category": _optional_text(raw.get("category")),
+        "price": price,
+        "currency": (_optional_text(raw.get("currency")) or "USD").upper(),
+        "image_url": _optional_text(raw.get("image_url")),
+    }
+    for column, limit in _MAX_LENGTHS.items():
+        if row[column] is not None and len(row[column]) > limit:
+            raise ValueError(f"{column} exceeds {limit} characters")
+    return row
+
+
+class InputRecord(NamedTuple):
+    """One parsed input record, or the reason it could not be parsed."""
+
+    line: int
+    values: dict[str, Any]
+    error: str | None = None
+
+
+def _parse_json_line(line_number: int, line: str) -> InputRecord:
+    try:
+        values = json.loads(line)
+    except json.JSONDecodeError as exc:
+        return InputRecord(line_number, {}, f"invalid JSON ({exc.msg})")
+    if not isinstance(values, dict):
+        return InputRecord(line_number, {}, "expected a JSON object")
+    return InputRecord(line_number, values)
+
+
+def iter_records(stream: IO[str], input_format: str) -> Iterator[InputRecord]:
+    """Yield records from a CSV (with header row) or JSONL text stream."""
+
+    if input_format == FORMAT_CSV:
+        reader = csv.DictReader(stream)
+        for values in reader:
+            yield InputRecord(reader.line_num, values)
+    elif input_format == FORMAT_JSONL:
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield _parse_json_line(line_number, line)
+    else:
+        raise ValueError(f"Unsupported input format: {input_format}")
+
+
+def _upsert_statement(connection: Connection):
+    builder = _INSERT_BUILDERS.get(connection.dialect.name)
+    if builder is None:
+        raise RuntimeError(
+            f"Bulk import supports SQLite and PostgreSQL, not {connection.dialect.name}"
+        )
+    # Core table rather than the ORM entity: the statement compiles once and
+    # is cached, and each batch goes to the driver's executemany.
+    stmt = builder(_products)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[_products.c.sku],
+        set_={
+            **{column: excluded[column] for column in _UPDATABLE_COLUMNS},
+            # ON CONFLICT bypasses the ORM's onupdate hooks.
+            "updated_at": func.now(),
+            "revision": _products.c.revision + 1,
+        },
+        where=or_(
+            *(
+                _products.c[column].is_distinct_from(excluded[column])
+                for column in _UPDATABLE_COLUMNS
+            )
+        ),
+    )
+
+
+def upsert_batch(connection: Connection, rows: list[dict[str, Any]]) -> int:
+    """Write one batch of rows in a single executemany upsert; return the rows changed.
+
+    Bumps the catalog revision in the same transaction when any row changed.
+    """
+
+    result = connection.execute(_upsert_statement(connection), rows)
+    written = max(result.rowcount or 0, 0)
+    if written:
+        bump_catalog_revision(connection)
+    return written
+
+
+def delete_all_products(engine: Engine, *, batch_size: int = 10_000) -> int:
+    """Delete every product in id-ordered batches, one transaction per batch.
+
+    Batching keeps each transaction short; it does not protect dependent rows.
+    Interactions and rollups of deleted products go with them (``ON DELETE
+    CASCADE``), and on PostgreSQL a product still referenced by a cart item
+    (``RESTRICT``) makes its batch fail, as ``TRUNCATE`` would.
+    """
+
+    deleted = 0
+    while True:
+        with engine.begin() as connection:
+            ids = connection.scalars(
+                select(Product.id).order_by(Product.id).limit(batch_size)
+            ).all()
+            if not ids:
+                return deleted
+            connection.execute(delete(Product).where(Product.id >= ids[0], Product.id <= ids[-1]))
+            bump_catalog_revision(connection)
+            deleted += len(ids)
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _normalize_chunk(chunk: list[InputRecord], stats: ImportStats) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for record in chunk:
+        stats.read += 1
+        if record.error is not None:
+            stats.reject(record.line, record.error)
+            continue
+        try:
+            rows.append(normalize_product_row(record.values))
+        except ValueError as exc:
+            stats.reject(record.line, str(exc))
+    return rows
+
+
+def import_products(
+    engine: Engine,
+    stream: IO[str],
+    *,
+    input_format: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    reset: bool = False,
+    progress: Callable[[ImportStats], None] | None = None,
+) -> ImportStats:
+    """Stream products from ``stream`` into the catalog.
+
+    When the catalog starts out empty (or ``reset`` is set) the SQLite search
+    index is rebuilt once after the load instead of being maintained per row.
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    stats = ImportStats()
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        initial_load = reset or connection.scalar(select(Product.id).limit(1)) is None
+    # Loading into an empty catalog: index search once at the end instead of per row.
+    with deferred_search_index(engine) if initial_load else nullcontext():
+        if reset:
+            stats.deleted = delete_all_products(engine)
+
+        for chunk in _batched(iter_records(stream, input_format), batch_size):
+            rows = _normalize_chunk(chunk, stats)
+            if rows:
+                with engine.begin() as connection:
+                    written = upsert_batch(connection, rows)
+                stats.written += written
+                stats.unchanged += len(rows) - written
+            stats.batches += 1
+            stats.seconds = time.perf_counter() - started
+            if progress is not None:
+                progress(stats)
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+__all__ = [
+    "DEFAULT_BATCH_SIZE",
+    "FORMAT_CSV",
+    "FORMAT_JSONL",
+    "PRODUCT_COLUMNS",
+    "ImportStats",
+    "InputRecord",
+    "delete_all_products",
+    "import_products",
+    "iter_records",
+    "normalize_product_row",
+    "upsert_batch",
+]
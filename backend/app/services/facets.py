@@ -0,0 +1,234 @@
+"""Catalog facet metadata (categories, currencies, price distribution).
+
+Facets are computed with a few aggregate queries (one histogram per currency)
+and memoized per catalog version, so repeated catalog page loads are served
+from memory. Price ranges and histograms are always per currency.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from decimal import ROUND_FLOOR, Decimal
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..models import Product
+from .catalog import get_catalog_state
+
+DEFAULT_BUCKET_TARGET = 10
+
+
+@dataclass(frozen=True, slots=True)
+class PriceRange:
+    """Lowest and highest price within one currency."""
+
+    currency: str
+    price_min: Decimal
+    price_max: Decimal
+
+    def as_payload(self) -> dict[str, object]:
+        return {
+            "currency": self.currency,
+            "min": float(self.price_min),
+            "max": float(self.price_max),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class FacetValue:
+    """Product count and per-currency price ranges for one category."""
+
+    name: str
+    product_count: int
+    price_ranges: tuple[PriceRange, ...] = ()
+
+    def as_payload(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "product_count": self.product_count,
+            "price_ranges": [item.as_payload() for item in self.price_ranges],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class PriceBucket:
+    lower: Decimal
+    upper: Decimal
+    count: int
+
+    def as_payload(self) -> dict[str, object]:
+        return {"min": float(self.lower), "max": float(self.upper), "count": self.count}
+
+
+@dataclass(frozen=True, slots=True)
+class CurrencyFacet:
+    """Product count, price range and price histogram for one currency.
+
+    Prices are never compared across currencies, so each currency gets its own
+    range and bucket width.
+    """
+
+    name: str
+    product_count: int
+    price_min: Decimal
+    price_max: Decimal
+    bucket_width: Decimal
+    histogram: tuple[PriceBucket, ...] = ()
+
+    def as_payload(self) -> dict[str, object]:
+        return {
+            "name": self.name,
+            "product_count": self.product_count,
+            "price_min": float(self.price_min),
+            "price_max": float(self.price_max),
+            "bucket_width": float(self.bucket_width),
+            "histogram": [bucket.as_payload() for bucket in self.histogram],
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogFacets:
+    """Facet snapshot for the whole catalog or a single category."""
+
+    total_products: int
+    categories: tuple[FacetValue, ...] = ()
+    currencies: tuple[CurrencyFacet, ...] = ()
+
+    @property
+    def category_names(self) -> list[str]:
+        return [item.name for item in self.categories]
+
+    def as_payload(self) -> dict[str, object]:
+        return {
+            "total_products": self.total_products,
+            "categories": [item.as_payload() for item in self.categories],
+            "currencies": [item.as_payload() for item in self.currencies],
+        }
+
+
+def _nice_bucket_width(span: Decimal, target: int) -> Decimal:
+    """Round ``span / target`` up to 1, 2 or 5 times a power of ten."""
+
+    raw = float(span) / target if span > 0 else 1.0
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next((step for step in (1, 2, 5) if raw <= step * magnitude), 10)
+    return Decimal(str(step * magnitude)).normalize()
+
+
+def _category_facets(session: Session, filters: list) -> tuple[FacetValue, ...]:
+    stmt = (
+        select(
+            Product.category,
+            Product.currency,
+            func.count(Product.id),
+            func.min(Product.price),
+            func.max(Product.price),
+        )
+        .where(Product.category.isnot(None), *filters)
+        .group_by(Product.category, Product.currency)
+        .order_by(Product.category.asc(), Product.currency.asc())
+    )
+    grouped: dict[str, tuple[int, list[PriceRange]]] = {}
+    for name, currency, count, price_min, price_max in session.execute(stmt):
+        total, ranges = grouped.get(name, (0, []))
+        ranges.append(PriceRange(currency, Decimal(price_min), Decimal(price_max)))
+        grouped[name] = (total + count, ranges)
+    return tuple(
+        FacetValue(name=name, product_count=count, price_ranges=tuple(ranges))
+        for name, (count, ranges) in grouped.items()
+    )
+
+
+def _histogram(
+    session: Session, filters: list, price_min: Decimal, price_max: Decimal, bucket_target: int
+) -> tuple[Decimal, tuple[PriceBucket, ...]]:
+    width = _nice_bucket_width(price_max - price_min, bucket_target)
+    start = (price_min / width).to_integral_value(rounding=ROUND_FLOOR) * width
+    bucket_count = int(((price_max - start) / width).to_integral_value(rounding=ROUND_FLOOR)) + 1
+
+    bucket_index = case(
+        *((Product.price < start + width * (index + 1), index) for index in range(bucket_count)),
+        else_=bucket_count - 1,
+    )
+    counts = dict(
+        session.execute(
+            select(bucket_index, func.count(Product.id)).where(*filters).group_by(bucket_index)
+        ).all()
+    )
+    return width, tuple(
+        PriceBucket(
+            lower=start + width * index,
+            upper=start + width * (index + 1),
+            count=counts.get(index, 0),
+        )
+        for index in range(bucket_count)
+    )
+
+
+def compute_facets(
+    session: Session,
+    *,
+    category: str | None = None,
+    bucket_target: int = DEFAULT_BUCKET_TARGET,
+) -> CatalogFacets:
+    """Aggregate facet metadata straight from the database."""
+
+    filters = [Product.category == category] if category else []
+    categories = _category_facets(session, filters)
+
+    currencies: list[CurrencyFacet] = []
+    stmt = (
+        select(
+            Product.currency,
+            func.count(Product.id),
+            func.min(Product.price),
+            func.max(Product.price),
+        )
+        .where(*filters)
+        .group_by(Product.currency)
+        .order_by(Product.currency.asc())
+    )
+    for name, count, price_min, price_max in session.execute(stmt).all():
+        price_min, price_max = Decimal(price_min), Decimal(price_max)
+        width, histogram = _histogram(
+            session, [*filters, Product.currency == name], price_min, price_max, bucket_target
+        )
+        currencies.append(
+            CurrencyFacet(
+                name=name,
+                product_count=count,
+                price_min=price_min,
+                price_max=price_max,
+                bucket_width=width,
+                histogram=histogram,
+            )
+        )
+
+    return CatalogFacets(
+        total_products=sum(item.product_count for item in currencies),
+        categories=categories,
+        currencies=tuple(currencies),
+    )
+
+
+def get_catalog_facets(session: Session, *, category: str | None = None) -> CatalogFacets:
+    """Return facets for the current catalog version, computing them at most once."""
+
+    return get_catalog_state().memoize(
+        session,
+        ("facets", category),
+        lambda: compute_facets(session, category=category),
+    )
+
+
+__all__ = [
+    "CatalogFacets",
+    "CurrencyFacet",
+    "FacetValue",
+    "PriceBucket",
+    "PriceRange",
+    "compute_facets",
+    "get_catalog_facets",
+]
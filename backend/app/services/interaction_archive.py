@@ -0,0 +1,275 @@
+"""Retention helpers that move old interactions into compressed archive files.
+
+Archived rows are written as gzip-compressed, column-oriented JSON files laid
+out in date partitions (``<archive_dir>/interactions/date=YYYY-MM-DD/``). Before
+rows are deleted from the live table their counts are folded into
+``interaction_rollups`` so popularity signals stay unchanged.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..models import Interaction, InteractionRollup
+
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_COLUMNS = (
+    "id",
+    "user_id",
+    "product_id",
+    "interaction_type",
+    "interaction_metadata",
+    "occurred_at",
+)
+DEFAULT_BATCH_SIZE = 5_000
+
+_SELECT_COLUMNS = (
+    Interaction.id,
+    Interaction.user_id,
+    Interaction.product_id,
+    Interaction.interaction_type,
+    Interaction.interaction_metadata,
+    Interaction.occurred_at,
+)
+
+
+@dataclass(slots=True)
+class ArchiveStats:
+    """Summary of a retention run."""
+
+    archived: int = 0
+    batches: int = 0
+    files: list[Path] = field(default_factory=list)
+
+
+def retention_cutoff(retention_days: int, *, now: datetime | None = None) -> datetime:
+    """Return the timestamp before which interactions are eligible for archiving."""
+
+    if retention_days < 1:
+        raise ValueError("retention_days must be at least 1")
+    return (now or datetime.now(tz=UTC)) - timedelta(days=retention_days)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _partition_dir(archive_dir: Path, day: date) -> Path:
+    return archive_dir / "interactions" / f"date={day.isoformat()}"
+
+
+def _write_partition(archive_dir: Path, day: date, rows: list[dict[str, Any]]) -> Path:
+    partition = _partition_dir(archive_dir, day)
+    partition.mkdir(parents=True, exist_ok=True)
+    # Deterministic names make a re-run after a crash overwrite, not duplicate.
+    path = partition / f"part-{rows[0]['id']:012d}-{rows[-1]['id']:012d}.json.gz"
+    columns: dict[str, list[Any]] = {name: [] for name in ARCHIVE_COLUMNS}
+    for row in rows:
+        for name in ARCHIVE_COLUMNS:
+            value = row[name]
+            if name == "occurred_at":
+                value = _as_utc(value).isoformat()
+            columns[name].append(value)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+        json.dump(
+            {
+                "format_version": ARCHIVE_FORMAT_VERSION,
+                "row_count": len(rows),
+                "columns": columns,
+            },
+            handle,
+            separators=(",", ":"),
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+def _merge_rollups(session: Session, rows: list[dict[str, Any]]) -> None:
+    counts = Counter(
+        (_as_utc(row["occurred_at"]).date(), row["product_id"], row["interaction_type"])
+        for row in rows
+    )
+    days = {key[0] for key in counts}
+    product_ids = {key[1] for key in counts}
+    existing = session.scalars(
+        select(InteractionRollup).where(
+            InteractionRollup.day.in_(days),
+            InteractionRollup.product_id.in_(product_ids),
+        )
+    ).all()
+    by_key = {(item.day, item.product_id, item.interaction_type): item for item in existing}
+
+    for (day, product_id, interaction_type), count in counts.items():
+        rollup = by_key.get((day, product_id, interaction_type))
+        if rollup is None:
+            session.add(
+                InteractionRollup(
+                    day=day,
+                    product_id=product_id,
+                    interaction_type=interaction_type,
+                    interaction_count=count,
+                )
+            )
+        else:
+            rollup.interaction_count += count
+
+
+def archive_interactions(
+    session: Session,
+    *,
+    archive_dir: str | Path,
+    cutoff: datetime,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> ArchiveStats:
+    """Archive interactions older than ``cutoff`` in bounded batches.
+
+    Each batch is written to its partition files first, then the rollups are
+    updated and the rows deleted in one short transaction.
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+
+    root = Path(archive_dir)
+    stats = ArchiveStats()
+    last_id = 0
+
+    while True:
+        stmt = (
+            select(*_SELECT_COLUMNS)
+            .where(Interaction.occurred_at < cutoff, Interaction.id > last_id)
+            .order_by(Interaction.id.asc())
+            .limit(batch_size)
+        )
+        rows = [dict(row) for row in session.execute(stmt).mappings()]
+        if not rows:
+            break
+
+        last_id = rows[-1]["id"]
+        stats.archived += len(rows)
+        stats.batches += 1
+        if dry_run:
+            continue
+
+        by_day: dict[date, list[dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_day[_as_utc(row["occurred_at"]).date()].append(row)
+        for day in sorted(by_day):
+            stats.files.append(_write_partition(root, day, by_day[day]))
+
+        _merge_rollups(session, rows)
+        session.execute(
+            delete(Interaction)
+            .where(Interaction.id.in_([row["id"] for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+
+    if dry_run:
+        session.rollback()
+    return stats
+
+
+def _in_window(value: datetime, since: datetime | None, until: datetime | None) -> bool:
+    if since is not None and value < since:
+        return False
+    if until is not None and value >= until:
+        return False
+    return True
+
+
+def iter_archived_interactions(
+    archive_dir: str | Path,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield archived interaction rows in partition order."""
+
+    root = Path(archive_dir) / "interactions"
+    if not root.is_dir():
+        return
+
+    since = _as_utc(since) if since else None
+    until = _as_utc(until) if until else None
+
+    for partition in sorted(root.glob("date=*")):
+        day = date.fromisoformat(partition.name.split("=", 1)[1])
+        if since is not None and day < since.date():
+            continue
+        if until is not None and day > until.date():
+            continue
+
+        for path in sorted(partition.glob("part-*.json.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            columns = payload["columns"]
+            for values in zip(*(columns[name] for name in ARCHIVE_COLUMNS), strict=True):
+                row = dict(zip(ARCHIVE_COLUMNS, values, strict=True))
+                row["occurred_at"] = datetime.fromisoformat(row["occurred_at"])
+                if _in_window(row["occurred_at"], since, until):
+                    yield row
+
+
+def iter_live_interactions(
+    session: Session,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    chunk_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Stream interaction rows that are still in the live table."""
+
+    stmt = select(*_SELECT_COLUMNS).order_by(Interaction.id.asc())
+    if since is not None:
+        stmt = stmt.where(Interaction.occurred_at >= since)
+    if until is not None:
+        stmt = stmt.where(Interaction.occurred_at < until)
+
+    result = session.execute(stmt.execution_options(yield_per=chunk_size))
+    for row in result.mappings():
+        payload = dict(row)
+        payload["occurred_at"] = _as_utc(payload["occurred_at"])
+        yield payload
+
+
+def iter_interactions(
+    session: Session,
+    *,
+    archive_dir: str | Path,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    chunk_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Yield archived rows followed by live rows as one chronological stream."""
+
+    yield from iter_archived_interactions(archive_dir, since=since, until=until)
+    yield from iter_live_interactions(session, since=since, until=until, chunk_size=chunk_size)
+
+
+__all__ = [
+    "ARCHIVE_COLUMNS",
+    "ArchiveStats",
+    "archive_interactions",
+    "iter_archived_interactions",
+    "iter_interactions",
+    "iter_live_interactions",
+    "retention_cutoff",
+]
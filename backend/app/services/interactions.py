@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Iterable
+from typing import Any, NamedTuple
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from ..db import get_session
@@ -18,10 +20,33 @@ ALLOWED_INTERACTION_TYPES = {
 }
 
 
+# Rows per multi-row INSERT; keeps bound parameters well under SQLite's limit.
+_BULK_INSERT_ROWS = 1_000
+
+
 class InteractionLoggingError(RuntimeError):
     """Raised when an interaction cannot be persisted."""
 
 
+class InteractionEvent(NamedTuple):
+    """One interaction to record with :func:`log_interactions_bulk`."""
+
+    product_id: int
+    interaction_type: str
+    metadata: dict[str, Any] | None = None
+
+
+def _normalize_type(interaction_type: str | None) -> str:
+    normalized_type = (interaction_type or "").strip().lower()
+    if not normalized_type:
+        raise InteractionLoggingError("interaction_type must be provided")
+    if normalized_type not in ALLOWED_INTERACTION_TYPES:
+        raise InteractionLoggingError(
+            f"interaction_type '{normalized_type}' is not supported."
+        )
+    return normalized_type
+
+
 def log_interaction(
     *,
     product_id: int,
@@ -33,14 +58,7 @@ def log_interaction(
 ) -> Interaction:
     """Persist an interaction row and optionally commit the transaction."""
 
-    normalized_type = (interaction_type or "").strip().lower()
-    if not normalized_type:
-        raise InteractionLoggingError("interaction_type must be provided")
-    if normalized_type not in ALLOWED_INTERACTION_TYPES:
-        raise InteractionLoggingError(
-            f"interaction_type '{normalized_type}' is not supported."
-        )
-
+    normalized_type = _normalize_type(interaction_type)
     session = session or get_session()
     product = session.get(Product, product_id)
     if product is None:
@@ -64,8 +82,44 @@ def log_interaction(
     return interaction
 
 
+def log_interactions_bulk(
+    events: Iterable[InteractionEvent],
+    *,
+    user: User | None = None,
+    session: Session | None = None,
+    commit: bool = True,
+) -> int:
+    """Insert many interactions with multi-row INSERTs; return the number written.
+
+    Unlike :func:`log_interaction`, products are not looked up: callers pass ids
+    they have already loaded (for example the lines of a cart).
+    """
+
+    user_id = user.id if user else None
+    rows = [
+        {
+            "user_id": user_id,
+            "product_id": event.product_id,
+            "interaction_type": _normalize_type(event.interaction_type),
+            "interaction_metadata": event.metadata if isinstance(event.metadata, dict) else None,
+        }
+        for event in events
+    ]
+
+    session = session or get_session()
+    for start in range(0, len(rows), _BULK_INSERT_ROWS):
+        session.execute(
+            insert(Interaction.__table__).values(rows[start : start + _BULK_INSERT_ROWS])
+        )
+    if commit:
+        session.commit()
+    return len(rows)
+
+
 __all__ = [
     "ALLOWED_INTERACTION_TYPES",
+    "InteractionEvent",
     "InteractionLoggingError",
     "log_interaction",
+    "log_interactions_bulk",
 ]
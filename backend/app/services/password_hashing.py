@@ -0,0 +1,142 @@
+"""Bounded worker pool for password hashing and verification.
+
+scrypt and PBKDF2 are deliberately slow, but ``hashlib`` releases the GIL while
+computing them, so a small thread pool runs them in parallel without holding up
+other request threads. At most ``PASSWORD_HASH_WORKERS`` hashes run at once and
+``PASSWORD_HASH_QUEUE_SIZE`` more may wait; beyond that callers get
+:class:`PasswordHashingBusyError` immediately (served as ``503`` with
+``Retry-After``) instead of piling up behind a login storm.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from flask import Flask, current_app
+
+from ..config import AppConfig
+from ..security import hash_password, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when the hashing pool and its queue are full."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Too many sign-in attempts in progress. Please retry shortly.")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class PasswordHasher:
+    """Run password hashing on a bounded thread pool and record queue metrics."""
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        method: str,
+        retry_after_seconds: int,
+    ) -> None:
+        self._method = method
+        self._retry_after_seconds = retry_after_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max(1, workers) + max(0, queue_size))
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._run_seconds_total = 0.0
+
+    def hash(self, plain_password: str) -> str:
+        return self._submit(hash_password, plain_password, self._method)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(verify_password, plain_password, hashed_password)
+
+    def _submit(self, func: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHashingBusyError(self._retry_after_seconds)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(self._timed, func, time.perf_counter(), args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _timed(self, func: Callable[..., T], submitted_at: float, args: tuple) -> T:
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            waited = started - submitted_at
+            with self._lock:
+                self._completed += 1
+                self._wait_seconds_total += waited
+                self._wait_seconds_max = max(self._wait_seconds_max, waited)
+                self._run_seconds_total += finished - started
+
+    def stats(self) -> dict[str, float | int]:
+        """Counters since startup: in-flight/queued jobs, rejections and queue wait."""
+
+        with self._lock:
+            completed = self._completed
+            return {
+                "in_flight": self._in_flight,
+                "completed": completed,
+                "rejected": self._rejected,
+                "queue_wait_seconds_total": self._wait_seconds_total,
+                "queue_wait_seconds_max": self._wait_seconds_max,
+                "queue_wait_seconds_avg": (
+                    self._wait_seconds_total / completed if completed else 0.0
+                ),
+                "hash_seconds_total": self._run_seconds_total,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def init_password_hasher(app: Flask, config: AppConfig) -> PasswordHasher:
+    """Create the password hashing pool for the app."""
+
+    hasher = PasswordHasher(
+        workers=config.password_hash_workers,
+        queue_size=config.password_hash_queue_size,
+        method=config.password_hash_method,
+        retry_after_seconds=config.password_hash_retry_after_seconds,
+    )
+    app.config["PASSWORD_HASHER"] = hasher
+    return hasher
+
+
+def get_password_hasher(flask_app: Flask | None = None) -> PasswordHasher:
+    """Return the password hashing pool registered on the current app."""
+
+    app_context = flask_app or current_app
+    hasher: PasswordHasher | None = app_context.config.get("PASSWORD_HASHER")
+    if hasher is None:
+        raise RuntimeError("Password hasher is not initialized")
+    return hasher
+
+
+__all__ = [
+    "PasswordHasher",
+    "PasswordHashingBusyError",
+    "get_password_hasher",
+    "init_password_hasher",
+]
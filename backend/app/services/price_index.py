@@ -0,0 +1,133 @@
+"""Sorted in-memory price index for nearest-price ("related") product lookups.
+
+Every category keeps two parallel arrays, prices in cents and product ids,
+sorted by ``(price, id)``, plus one array pair spanning the whole catalog for the
+fallback. A lookup bisects to the reference price and steps outward one distinct
+price at a time, bisecting each block of equal prices to its ends, so finding the
+``k`` closest prices costs about ``O(k log n)`` even when many products share a
+price, instead of a full scan ordered by ``abs(price - x)`` in the database.
+
+The index is rebuilt once per catalog version through the catalog memo cache,
+which local product commits and the version check already invalidate.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+
+from sqlalchemy.orm import Session
+
+from .catalog import ProductRecord, get_catalog_state, load_product_records
+
+
+def _to_cents(price: Decimal) -> int:
+    return int((Decimal(price) * 100).to_integral_value())
+
+
+@dataclass(frozen=True, slots=True)
+class _SortedPrices:
+    prices: array
+    ids: array
+
+    @classmethod
+    def build(cls, pairs: list[tuple[int, int]]) -> _SortedPrices:
+        pairs.sort()
+        return cls(array("q", (price for price, _ in pairs)), array("q", (id_ for _, id_ in pairs)))
+
+    def nearest(self, target: int, limit: int, exclude: set[int]) -> list[int]:
+        """Return up to ``limit`` ids ordered by ``(abs(price - target), id)``."""
+
+        prices, ids = self.prices, self.ids
+        # prices[:low] lie below the target and prices[high:] at or above it;
+        # both bounds move outward one distinct price (a block of ties) at a time.
+        low = high = bisect_left(prices, target)
+        found: list[int] = []
+        while len(found) < limit and (low > 0 or high < len(prices)):
+            low_distance = target - prices[low - 1] if low > 0 else None
+            high_distance = prices[high] - target if high < len(prices) else None
+            if high_distance is None or (
+                low_distance is not None and low_distance <= high_distance
+            ):
+                distance = low_distance
+            else:
+                distance = high_distance
+            needed = limit - len(found)
+            candidates: list[int] = []
+            if low_distance == distance:
+                start = bisect_left(prices, prices[low - 1], 0, low)
+                candidates.extend(_first_ids(ids, start, low, needed, exclude))
+                low = start
+            if high_distance == distance:
+                end = bisect_right(prices, prices[high], high)
+                candidates.extend(_first_ids(ids, high, end, needed, exclude))
+                high = end
+            # Ids within a block are ascending, so each block's first ids suffice.
+            candidates.sort()
+            found.extend(candidates[:needed])
+        return found
+
+
+def _first_ids(ids: array, start: int, end: int, count: int, exclude: set[int]) -> list[int]:
+    """The first ``count`` ids in ``ids[start:end]`` that are not excluded."""
+
+    return list(islice((ids[i] for i in range(start, end) if ids[i] not in exclude), count))
+
+
+class PriceIndex:
+    """Per-category sorted price arrays for one catalog version."""
+
+    def __init__(self, records: Iterable[ProductRecord]) -> None:
+        self._products: dict[int, tuple[int, str | None]] = {}
+        grouped: dict[str, list[tuple[int, int]]] = {}
+        everything: list[tuple[int, int]] = []
+        for record in records:
+            cents = _to_cents(record.price)
+            self._products[record.id] = (cents, record.category)
+            everything.append((cents, record.id))
+            if record.category:
+                grouped.setdefault(record.category, []).append((cents, record.id))
+        self._all = _SortedPrices.build(everything)
+        self._categories = {name: _SortedPrices.build(pairs) for name, pairs in grouped.items()}
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._products
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def related(self, product_id: int, *, limit: int) -> list[int]:
+        """Return ids of the closest-priced products, same category first.
+
+        Mirrors the original query semantics: products from the same category
+        ordered by price distance then id, topped up from the whole catalog.
+        Unknown ids yield an empty list.
+        """
+
+        entry = self._products.get(product_id)
+        if entry is None:
+            return []
+        cents, category = entry
+        exclude = {product_id}
+        related: list[int] = []
+        if category:
+            related = self._categories[category].nearest(cents, limit, exclude)
+            exclude.update(related)
+        if len(related) < limit:
+            related.extend(self._all.nearest(cents, limit - len(related), exclude))
+        return related
+
+
+def get_price_index(session: Session) -> PriceIndex:
+    """Return the price index for the current catalog version, building it at most once."""
+
+    return get_catalog_state().memoize(
+        session, ("price_index",), lambda: PriceIndex(load_product_records(session))
+    )
+
+
+__all__ = ["PriceIndex", "get_price_index"]
@@ -0,0 +1,99 @@
+"""Cache of pre-encoded product JSON fragments.
+
+Each product's API payload is encoded once and kept as bytes keyed by
+``(id, revision, updated_at)``, one variant per requested sparse fieldset; list
+responses splice the cached fragments together (see
+:func:`app.json_provider.fragment_response`). ``Product.revision`` changes on
+every update, including ones from other processes within the same second, and
+local catalog commits additionally evict the affected products right away.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime
+
+from flask import Flask, current_app
+
+from ..json_provider import dumps_bytes
+from ..models import Product
+from ..serializers import ProductFields, serialize_product
+from .catalog import CatalogChanges, CatalogState
+
+
+class ProductFragmentCache:
+    """Thread-safe LRU of encoded product payloads."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._fragments: OrderedDict[
+            int, tuple[tuple[int, datetime | None], dict[ProductFields | None, bytes]]
+        ] = OrderedDict()
+
+    def encode(self, product: Product, fields: ProductFields | None = None) -> bytes:
+        """Return the JSON bytes for ``product`` (limited to ``fields``), encoding on a miss."""
+
+        version = (product.revision, product.updated_at)
+        with self._lock:
+            entry = self._fragments.get(product.id)
+            if entry is not None and entry[0] == version and fields in entry[1]:
+                self._fragments.move_to_end(product.id)
+                return entry[1][fields]
+
+        fragment = dumps_bytes(serialize_product(product, fields))
+        if self._max_entries > 0:
+            with self._lock:
+                entry = self._fragments.get(product.id)
+                if entry is None or entry[0] != version:
+                    entry = (version, {})
+                    self._fragments[product.id] = entry
+                entry[1][fields] = fragment
+                self._fragments.move_to_end(product.id)
+                while len(self._fragments) > self._max_entries:
+                    self._fragments.popitem(last=False)
+        return fragment
+
+    def encode_many(
+        self, products: Iterable[Product], fields: ProductFields | None = None
+    ) -> list[bytes]:
+        return [self.encode(product, fields) for product in products]
+
+    def evict(self, product_ids: Iterable[int]) -> None:
+        with self._lock:
+            for product_id in product_ids:
+                self._fragments.pop(product_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+    def on_catalog_change(self, changes: CatalogChanges) -> None:
+        if changes.bulk:
+            self.clear()
+        else:
+            self.evict([*changes.upserted, *changes.deleted])
+
+
+def init_product_fragments(app: Flask, catalog: CatalogState) -> ProductFragmentCache:
+    """Create the fragment cache and subscribe it to local catalog changes."""
+
+    cache = ProductFragmentCache(app.config["APP_CONFIG"].product_json_cache_size)
+    catalog.subscribe(cache.on_catalog_change)
+    app.config["PRODUCT_FRAGMENTS"] = cache
+    return cache
+
+
+def get_product_fragments(flask_app: Flask | None = None) -> ProductFragmentCache:
+    """Return the fragment cache registered on the current app."""
+
+    app_context = flask_app or current_app
+    cache: ProductFragmentCache | None = app_context.config.get("PRODUCT_FRAGMENTS")
+    if cache is None:
+        raise RuntimeError("Product fragment cache is not initialized")
+    return cache
+
+
+__all__ = ["ProductFragmentCache", "get_product_fragments", "init_product_fragments"]
@@ -2,12 +2,29 @@
 
 from __future__ import annotations
 
+import time
+from collections.abc import Sequence
 from typing import Iterable
 
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.interfaces import LoaderOption
 
-from ..models import Interaction, Product
+from ..models import Interaction, InteractionRollup, Product
+
+RECOMMENDER_VERSION = "placeholder-popularity-v1"
+POPULARITY_REFRESH_SECONDS = 60
+
+
+def recommendation_model_version() -> str:
+    """Identify the scoring logic plus the popularity window it currently reflects.
+
+    Popularity moves with every logged interaction, so the placeholder ranking
+    is treated as re-published every ``POPULARITY_REFRESH_SECONDS``.
+    """
+
+    epoch = int(time.time() // POPULARITY_REFRESH_SECONDS)
+    return f"{RECOMMENDER_VERSION}:{epoch}"
 
 
 def _popular_products_query(
@@ -15,13 +32,32 @@ def _popular_products_query(
     category: str | None = None,
     exclude_ids: set[int] | None = None,
 ):
-    """Return a base query that ranks products by interaction volume."""
+    """Return a base query that ranks products by interaction volume.
 
-    interaction_count = func.count(Interaction.id)
+    Volume combines live interactions with the rolled-up counts of rows that
+    the retention job has already moved to the archive.
+    """
+
+    live_counts = (
+        select(Interaction.product_id, func.count(Interaction.id).label("volume"))
+        .group_by(Interaction.product_id)
+        .subquery()
+    )
+    archived_counts = (
+        select(
+            InteractionRollup.product_id,
+            func.sum(InteractionRollup.interaction_count).label("volume"),
+        )
+        .group_by(InteractionRollup.product_id)
+        .subquery()
+    )
+    interaction_count = func.coalesce(live_counts.c.volume, 0) + func.coalesce(
+        archived_counts.c.volume, 0
+    )
     stmt = (
         select(Product)
-        .outerjoin(Interaction, Interaction.product_id == Product.id)
-        .group_by(Product.id)
+        .outerjoin(live_counts, live_counts.c.product_id == Product.id)
+        .outerjoin(archived_counts, archived_counts.c.product_id == Product.id)
         .order_by(interaction_count.desc(), Product.created_at.desc(), Product.id.asc())
     )
     if category:
@@ -54,20 +90,24 @@ def fetch_placeholder_recommendations(
     *,
     limit: int = 6,
     product_id: int | None = None,
+    load_options: Sequence[LoaderOption] = (),
 ) -> tuple[list[Product], str]:
-    """Return placeholder recommendations and the strategy label used."""
+    """Return placeholder recommendations and the strategy label used.
+
+    ``load_options`` (e.g. ``load_only``) are applied to the product queries.
+    """
 
     focus_category: str | None = None
     exclude_ids: set[int] = set()
 
     if product_id:
-        product = session.get(Product, product_id)
+        product = session.get(Product, product_id, options=[load_only(Product.category)])
         if product is not None:
             focus_category = product.category
             exclude_ids.add(product.id)
 
     primary_query = _popular_products_query(category=focus_category, exclude_ids=exclude_ids).limit(limit)
-    primary_products = session.scalars(primary_query).all()
+    primary_products = session.scalars(primary_query.options(*load_options)).all()
     strategy = "popular_in_category" if focus_category and primary_products else "popular_overall"
     exclude_ids.update(product.id for product in primary_products)
 
@@ -76,17 +116,22 @@ def fetch_placeholder_recommendations(
 
     remaining = limit - len(primary_products)
     fallback_query = _popular_products_query(exclude_ids=exclude_ids).limit(remaining * 2)
-    fallback_products = session.scalars(fallback_query).all()
+    fallback_products = session.scalars(fallback_query.options(*load_options)).all()
     exclude_ids.update(product.id for product in fallback_products)
 
     combined = _unique_products([*primary_products, *fallback_products])
 
     if len(combined) < limit:
         recent_query = _recent_products_query(exclude_ids=exclude_ids).limit(limit * 2)
-        recent_products = session.scalars(recent_query).all()
+        recent_products = session.scalars(recent_query.options(*load_options)).all()
         combined = _unique_products([*combined, *recent_products])
 
     return combined[:limit], strategy
 
 
-__all__ = ["fetch_placeholder_recommendations"]
+__all__ = [
+    "POPULARITY_REFRESH_SECONDS",
+    "RECOMMENDER_VERSION",
+    "fetch_placeholder_recommendations",
+    "recommendation_model_version",
+]
@@ -0,0 +1,262 @@
+"""Full-text product search backed by SQLite FTS5 or PostgreSQL ``tsvector``.
+
+The search index lives in the database and is maintained there: SQLite uses an
+external-content FTS5 table kept in sync by triggers, PostgreSQL a generated
+``search_vector`` column with a GIN index. Any write path (ORM, bulk Core
+statements, ``scripts/seed_products.py``) therefore updates it automatically.
+When neither index exists the helpers fall back to ``LIKE`` matching.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Connection, case, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import Subquery
+
+from ..models import Product
+
+BACKEND_SQLITE_FTS5 = "sqlite_fts5"
+BACKEND_POSTGRES_TSVECTOR = "postgres_tsvector"
+BACKEND_LIKE = "like"
+
+MAX_QUERY_TOKENS = 8
+
+SQLITE_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, category,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+        INSERT INTO products_fts(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END
+    """,
+)
+
+POSTGRES_TSVECTOR_DDL = (
+    """
+    ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(category, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+)
+
+SQLITE_FTS_TRIGGERS = ("products_fts_ai", "products_fts_ad", "products_fts_au")
+_SQLITE_FTS_REBUILD = text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_BACKENDS: WeakKeyDictionary[Engine, str] = WeakKeyDictionary()
+
+_products_fts = table("products_fts", column("rowid"))
+_search_vector = literal_column("products.search_vector")
+
+
+@dataclass(frozen=True, slots=True)
+class SearchMatch:
+    """Filter and ranking helpers for one search term.
+
+    ``condition`` restricts a ``Product`` query to matches (usable in count
+    queries). ``ranked`` is a subquery of ``(product_id, score)`` rows to join
+    against when results should be ordered by relevance.
+    """
+
+    backend: str
+    condition: ColumnElement[bool]
+    ranked: Subquery
+    score_ascending: bool
+
+    def relevance_order(self):
+        score = self.ranked.c.score
+        return score.asc() if self.score_ascending else score.desc()
+
+
+def tokenize(term: str) -> list[str]:
+    """Split a user query into lower-cased word tokens."""
+
+    return _TOKEN_PATTERN.findall(term.lower())[:MAX_QUERY_TOKENS]
+
+
+def ensure_search_index(connection: Connection) -> str:
+    """Create the dialect's search index when missing and return the backend name."""
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        existed = _sqlite_index_exists(connection)
+        for statement in SQLITE_FTS_DDL:
+            connection.execute(text(statement))
+        if not existed:
+            connection.execute(_SQLITE_FTS_REBUILD)
+        return BACKEND_SQLITE_FTS5
+    if dialect == "postgresql":
+        for statement in POSTGRES_TSVECTOR_DDL:
+            connection.execute(text(statement))
+        return BACKEND_POSTGRES_TSVECTOR
+    return BACKEND_LIKE
+
+
+@contextmanager
+def deferred_search_index(engine: Engine) -> Iterator[None]:
+    """Suspend per-row search index maintenance during a bulk load.
+
+    The SQLite FTS5 triggers are dropped for the duration and the index is
+    rebuilt from ``products`` in one pass afterwards, which is much cheaper than
+    row-by-row maintenance for large loads. Writes by other processes meanwhile
+    are covered by the rebuild. PostgreSQL's generated column needs no special
+    handling, so this is a no-op there.
+    """
+
+    with engine.begin() as connection:
+        suspended = connection.dialect.name == "sqlite" and _sqlite_index_exists(connection)
+        if suspended:
+            for trigger in SQLITE_FTS_TRIGGERS:
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    try:
+        yield
+    finally:
+        if suspended:
+            with engine.begin() as connection:
+                for statement in SQLITE_FTS_DDL:
+                    connection.execute(text(statement))
+                connection.execute(_SQLITE_FTS_REBUILD)
+
+
+def _sqlite_index_exists(connection: Connection) -> bool:
+    return (
+        connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        ).first()
+        is not None
+    )
+
+
+def _postgres_index_exists(connection: Connection) -> bool:
+    return (
+        connection.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'products' AND column_name = 'search_vector'"
+            )
+        ).first()
+        is not None
+    )
+
+
+def detect_backend(session: Session) -> str:
+    """Return the search backend available for the session's engine (cached)."""
+
+    engine = session.get_bind()
+    if isinstance(engine, Connection):
+        engine = engine.engine
+    backend = _BACKENDS.get(engine)
+    if backend is not None:
+        return backend
+
+    connection = session.connection()
+    dialect = connection.dialect.name
+    if dialect == "sqlite" and _sqlite_index_exists(connection):
+        backend = BACKEND_SQLITE_FTS5
+    elif dialect == "postgresql" and _postgres_index_exists(connection):
+        backend = BACKEND_POSTGRES_TSVECTOR
+    else:
+        backend = BACKEND_LIKE
+    _BACKENDS[engine] = backend
+    return backend
+
+
+def _like_match(tokens: list[str]) -> SearchMatch:
+    name = func.lower(Product.name)
+    description = func.lower(func.coalesce(Product.description, ""))
+    conditions = [(name.like(f"%{token}%")) | (description.like(f"%{token}%")) for token in tokens]
+    condition = conditions[0]
+    for extra in conditions[1:]:
+        condition = condition & extra
+    # Name hits rank ahead of description-only hits.
+    score = case((name.like(f"%{tokens[0]}%"), 0), else_=1)
+    ranked = (
+        select(Product.id.label("product_id"), score.label("score")).where(condition).subquery()
+    )
+    return SearchMatch(BACKEND_LIKE, condition, ranked, score_ascending=True)
+
+
+def _sqlite_match(tokens: list[str]) -> SearchMatch:
+    expression = " ".join(f'"{token}"*' for token in tokens)
+    matches = literal_column("products_fts").op("MATCH")(expression)
+    condition = Product.id.in_(select(_products_fts.c.rowid).where(matches))
+    # bm25 weights follow the FTS column order: name, description, category.
+    score = func.bm25(literal_column("products_fts"), 10.0, 1.0, 4.0)
+    ranked = (
+        select(_products_fts.c.rowid.label("product_id"), score.label("score"))
+        .where(matches)
+        .subquery()
+    )
+    return SearchMatch(BACKEND_SQLITE_FTS5, condition, ranked, score_ascending=True)
+
+
+def _postgres_match(tokens: list[str]) -> SearchMatch:
+    query = func.to_tsquery("english", " & ".join(f"{token}:*" for token in tokens))
+    condition = _search_vector.op("@@")(query)
+    score = func.ts_rank_cd(_search_vector, query)
+    ranked = (
+        select(Product.id.label("product_id"), score.label("score")).where(condition).subquery()
+    )
+    return SearchMatch(BACKEND_POSTGRES_TSVECTOR, condition, ranked, score_ascending=False)
+
+
+def build_search_match(
+    session: Session, term: str, *, backend: str | None = None
+) -> SearchMatch | None:
+    """Build a prefix-matching search clause for ``term`` or ``None`` if it has no words."""
+
+    tokens = tokenize(term)
+    if not tokens:
+        return None
+
+    backend = backend or detect_backend(session)
+    if backend == BACKEND_SQLITE_FTS5:
+        return _sqlite_match(tokens)
+    if backend == BACKEND_POSTGRES_TSVECTOR:
+        return _postgres_match(tokens)
+    return _like_match(tokens)
+
+
+__all__ = [
+    "BACKEND_LIKE",
+    "BACKEND_POSTGRES_TSVECTOR",
+    "BACKEND_SQLITE_FTS5",
+    "SearchMatch",
+    "build_search_match",
+    "deferred_search_index",
+    "detect_backend",
+    "ensure_search_index",
+    "tokenize",
+]
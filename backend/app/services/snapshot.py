@@ -0,0 +1,158 @@
+"""In-memory snapshot of encoded products for small and medium catalogs.
+
+When the catalog holds at most ``CATALOG_SNAPSHOT_MAX_PRODUCTS`` rows, every
+product's JSON fragment is kept in memory so lookups by id need no database
+round trip. Larger catalogs skip the snapshot and callers fall back to querying.
+
+Like the suggest index, the snapshot is patched from the catalog change feed:
+a local commit that directly follows the snapshot's revision only re-encodes
+the products it touched. Anything else (bulk writes, commits from other
+processes) triggers a full rebuild. Only one request rebuilds at a time while
+the others keep serving the previous snapshot.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+
+from flask import Flask, current_app
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Product
+from .catalog import CatalogChanges, CatalogState, CatalogVersion, get_catalog_state
+from .facets import get_catalog_facets
+from .product_fragments import get_product_fragments
+
+ProductSnapshot = Mapping[int, bytes]
+
+
+class ProductSnapshotStore:
+    """Copy-on-write ``{product_id: json_bytes}`` map kept current per catalog version."""
+
+    def __init__(self, max_products: int) -> None:
+        self._max_products = max_products
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._fragments: dict[int, bytes] | None = None
+        self._catalog_token: str | None = None
+        self._catalog_revision: int | None = None
+        self._dirty: set[int] = set()
+        self._generation = 0
+
+    def on_catalog_change(self, changes: CatalogChanges) -> None:
+        with self._lock:
+            self._generation += 1
+            if (
+                changes.bulk
+                or changes.base_revision is None
+                or self._catalog_revision is None
+                or changes.base_revision != self._catalog_revision
+            ):
+                self._catalog_token = None
+                self._catalog_revision = None
+                self._dirty.clear()
+                return
+            self._dirty.update(changes.upserted, changes.deleted)
+            self._catalog_revision = changes.revision
+
+    def get(self, catalog: CatalogState, session: Session) -> ProductSnapshot | None:
+        """Return the snapshot for the current catalog version, or ``None`` if too large."""
+
+        if self._max_products <= 0:
+            return None
+        version = catalog.current(session)
+        with self._lock:
+            fragments = self._fragments
+            if version.token == self._catalog_token and not self._dirty:
+                return fragments
+            has_snapshot = fragments is not None or self._catalog_token is not None
+
+        # Single flight: wait for the first build, otherwise serve the previous
+        # snapshot while another request brings it up to date.
+        if not self._build_lock.acquire(blocking=not has_snapshot):
+            return fragments
+        try:
+            return self._refresh(session, version)
+        finally:
+            self._build_lock.release()
+
+    def _refresh(self, session: Session, version: CatalogVersion) -> ProductSnapshot | None:
+        with self._lock:
+            fragments = self._fragments
+            if version.token == self._catalog_token and not self._dirty:
+                return fragments
+            generation = self._generation
+            dirty = set(self._dirty)
+            patchable = (
+                fragments is not None
+                and version.revision is not None
+                and version.revision == self._catalog_revision
+            )
+
+        if patchable:
+            fragments = self._patch(session, fragments, dirty)
+        else:
+            fragments = self._build(session)
+
+        with self._lock:
+            self._fragments = fragments
+            if generation == self._generation:
+                self._catalog_token = version.token
+                self._catalog_revision = version.revision
+                self._dirty.clear()
+            else:
+                # Commits landed while we were loading; rebuild on the next call.
+                self._catalog_token = None
+                self._catalog_revision = None
+                self._dirty.clear()
+        return fragments
+
+    def _build(self, session: Session) -> dict[int, bytes] | None:
+        if get_catalog_facets(session).total_products > self._max_products:
+            return None
+        encode = get_product_fragments().encode
+        products = session.scalars(select(Product).execution_options(yield_per=1_000))
+        return {product.id: encode(product) for product in products}
+
+    def _patch(
+        self, session: Session, fragments: dict[int, bytes], dirty: set[int]
+    ) -> dict[int, bytes] | None:
+        patched = dict(fragments)
+        for product_id in dirty:
+            patched.pop(product_id, None)
+        if dirty:
+            encode = get_product_fragments().encode
+            for product in session.scalars(select(Product).where(Product.id.in_(dirty))):
+                patched[product.id] = encode(product)
+        return patched if len(patched) <= self._max_products else None
+
+
+def init_product_snapshot(app: Flask, catalog: CatalogState) -> ProductSnapshotStore:
+    """Create the product snapshot store and subscribe it to catalog changes."""
+
+    store = ProductSnapshotStore(app.config["APP_CONFIG"].catalog_snapshot_max_products)
+    catalog.subscribe(store.on_catalog_change)
+    app.config["PRODUCT_SNAPSHOT"] = store
+    return store
+
+
+def get_product_snapshot(
+    session: Session, flask_app: Flask | None = None
+) -> ProductSnapshot | None:
+    """Return ``{product_id: json_bytes}`` for the current catalog, or ``None`` if too large."""
+
+    app_context = flask_app or current_app
+    store: ProductSnapshotStore | None = app_context.config.get("PRODUCT_SNAPSHOT")
+    if store is None:
+        raise RuntimeError("Product snapshot is not initialized")
+    return store.get(get_catalog_state(app_context), session)
+
+
+__all__ = [
+    "ProductSnapshot",
+    "ProductSnapshotStore",
+    "get_product_snapshot",
+    "init_product_snapshot",
+]
@@ -0,0 +1,372 @@
+"""In-memory typeahead index over product names and categories.
+
+Words from every product name and category feed an inverted index (word ->
+suggestions, kept in rank order) and a character trie over the vocabulary whose
+nodes cache the most frequent words beneath them. A query resolves its last,
+partially typed word through the trie, lazily merges the matching posting lists
+and keeps only suggestions that also contain the fully typed words, so lookups
+stay well under a millisecond and never touch the database.
+
+The index is built from the catalog on startup, patched incrementally from the
+catalog change feed, and rebuilt when another process changes the catalog. It
+tracks the catalog revision it reflects, so a local commit is only patched in
+when it directly follows that revision, and a new version token is only adopted
+when its revision is the one local commits brought the index to.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import threading
+from bisect import insort
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .catalog import (
+    CatalogChanges,
+    CatalogState,
+    CatalogVersion,
+    ProductRecord,
+    load_product_records,
+)
+
+KIND_CATEGORY = "category"
+KIND_PRODUCT = "product"
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_WORDS_PER_NODE = 16
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass(slots=True)
+class _Entry:
+    kind: str
+    text: str
+    product_id: int | None = None
+    category: str | None = None
+    score: int = 0
+    tokens: frozenset[str] = field(default_factory=frozenset)
+
+    @property
+    def key(self) -> tuple[str, object]:
+        return (self.kind, self.product_id if self.kind == KIND_PRODUCT else self.text)
+
+    def rank(self) -> tuple[int, int, int, str]:
+        # Categories first, then higher score, shorter and alphabetical text.
+        return (
+            0 if self.kind == KIND_CATEGORY else 1,
+            -self.score,
+            len(self.text),
+            self.text.lower(),
+        )
+
+    def as_payload(self) -> dict[str, object]:
+        if self.kind == KIND_CATEGORY:
+            return {"type": KIND_CATEGORY, "text": self.text, "product_count": self.score}
+        return {
+            "type": KIND_PRODUCT,
+            "text": self.text,
+            "product_id": self.product_id,
+            "category": self.category,
+        }
+
+
+class _TrieNode:
+    __slots__ = ("children", "is_word", "top")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.is_word = False
+        self.top: list[str] = []
+
+
+class SuggestIndex:
+    """Thread-safe prefix index producing ranked typeahead suggestions."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._postings: dict[str, list[_Entry]] = {}
+        self._root = _TrieNode()
+        self._products: dict[int, _Entry] = {}
+        self._categories: dict[str, _Entry] = {}
+        self.catalog_token: str | None = None
+        self.catalog_revision: int | None = None
+        self._local_changes = False
+
+    # -- building -----------------------------------------------------------
+
+    def rebuild(
+        self,
+        records: Iterable[ProductRecord],
+        *,
+        catalog_token: str | None,
+        catalog_revision: int | None = None,
+    ) -> None:
+        """Replace the index contents with ``records`` read at ``catalog_revision`` or later."""
+
+        products: dict[int, _Entry] = {}
+        category_counts: dict[str, int] = {}
+        for record in records:
+            products[record.id] = self._product_entry(record)
+            if record.category:
+                category_counts[record.category] = category_counts.get(record.category, 0) + 1
+
+        categories = {
+            name: _Entry(KIND_CATEGORY, name, score=count, tokens=frozenset(_tokenize(name)))
+            for name, count in category_counts.items()
+        }
+
+        postings: dict[str, list[_Entry]] = {}
+        for entry in (*products.values(), *categories.values()):
+            for token in entry.tokens:
+                postings.setdefault(token, []).append(entry)
+        for entries in postings.values():
+            entries.sort(key=_Entry.rank)
+
+        root = _TrieNode()
+        for word in postings:
+            node = root
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+            node.is_word = True
+        self._fill_tops(root, "", postings)
+
+        with self._lock:
+            self._postings = postings
+            self._root = root
+            self._products = products
+            self._categories = categories
+            self.catalog_token = catalog_token
+            self.catalog_revision = catalog_revision
+            self._local_changes = False
+
+    def _fill_tops(self, node: _TrieNode, prefix: str, postings: dict[str, list[_Entry]]) -> None:
+        for char, child in node.children.items():
+            self._fill_tops(child, prefix + char, postings)
+        node.top = self._merge_tops(node, prefix, postings)
+
+    @staticmethod
+    def _merge_tops(node: _TrieNode, prefix: str, postings: dict[str, list[_Entry]]) -> list[str]:
+        candidates = [word for child in node.children.values() for word in child.top]
+        if node.is_word:
+            candidates.append(prefix)
+        candidates.sort(key=lambda word: (-len(postings[word]), word))
+        return candidates[:_WORDS_PER_NODE]
+
+    @staticmethod
+    def _product_entry(record: ProductRecord) -> _Entry:
+        return _Entry(
+            KIND_PRODUCT,
+            record.name,
+            product_id=record.id,
+            category=record.category,
+            tokens=frozenset(_tokenize(record.name)),
+        )
+
+    # -- incremental updates ------------------------------------------------
+
+    def apply_changes(self, changes: CatalogChanges) -> bool:
+        """Patch the index with a local commit; return ``False`` if a rebuild is needed."""
+
+        if changes.bulk or changes.base_revision is None:
+            return False
+        with self._lock:
+            if self.catalog_revision is None or changes.base_revision != self.catalog_revision:
+                # Another process committed in between; only a rebuild sees its rows.
+                return False
+            for product_id in changes.deleted:
+                self._remove_product(product_id)
+            for record in changes.upserted.values():
+                self._remove_product(record.id)
+                entry = self._product_entry(record)
+                self._products[record.id] = entry
+                self._add_entry(entry)
+                if record.category:
+                    self._adjust_category(record.category, 1)
+            self.catalog_revision = changes.revision
+            self._local_changes = True
+        return True
+
+    def mark_stale(self) -> None:
+        """Force a rebuild on the next :func:`ensure_current` call."""
+
+        with self._lock:
+            self.catalog_token = None
+            self.catalog_revision = None
+            self._local_changes = False
+
+    def adopt_version(self, version: CatalogVersion) -> bool:
+        """Accept ``version`` if it is exactly the revision local commits brought us to."""
+
+        with self._lock:
+            if (
+                not self._local_changes
+                or version.revision is None
+                or version.revision != self.catalog_revision
+            ):
+                return False
+            self.catalog_token = version.token
+            self._local_changes = False
+            return True
+
+    def _remove_product(self, product_id: int) -> None:
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        self._remove_entry(entry)
+        if entry.category:
+            self._adjust_category(entry.category, -1)
+
+    def _adjust_category(self, name: str, delta: int) -> None:
+        entry = self._categories.get(name)
+        if entry is not None:
+            self._remove_entry(entry)
+            entry.score += delta
+        else:
+            entry = _Entry(KIND_CATEGORY, name, score=delta, tokens=frozenset(_tokenize(name)))
+            self._categories[name] = entry
+        if entry.score > 0:
+            self._add_entry(entry)
+        else:
+            self._categories.pop(name, None)
+
+    def _add_entry(self, entry: _Entry) -> None:
+        for token in entry.tokens:
+            posting = self._postings.setdefault(token, [])
+            insort(posting, entry, key=_Entry.rank)
+            self._refresh_path(token)
+
+    def _remove_entry(self, entry: _Entry) -> None:
+        for token in entry.tokens:
+            posting = self._postings.get(token)
+            if not posting:
+                continue
+            posting[:] = [item for item in posting if item is not entry]
+            if not posting:
+                del self._postings[token]
+            self._refresh_path(token)
+
+    def _refresh_path(self, word: str) -> None:
+        path = [self._root]
+        for char in word:
+            path.append(path[-1].children.setdefault(char, _TrieNode()))
+        path[-1].is_word = word in self._postings
+        for depth in range(len(word), -1, -1):
+            node = path[depth]
+            if depth and not node.children and not node.is_word:
+                del path[depth - 1].children[word[depth - 1]]
+                continue
+            node.top = self._merge_tops(node, word[:depth], self._postings)
+
+    # -- querying -----------------------------------------------------------
+
+    def _find_node(self, prefix: str) -> _TrieNode | None:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _candidates(self, words: list[str]) -> Iterator[_Entry]:
+        lists = [self._postings[word] for word in words if word in self._postings]
+        if len(lists) == 1:
+            return iter(lists[0])
+        return heapq.merge(*lists, key=_Entry.rank)
+
+    def suggest(self, query: str, *, limit: int = 8) -> list[dict[str, object]]:
+        """Return up to ``limit`` ranked suggestions for a partially typed query."""
+
+        tokens = _tokenize(query)
+        if not tokens:
+            return []
+        typing_word = not query[-1:].isspace()
+        complete = tokens[:-1] if typing_word else tokens
+
+        with self._lock:
+            if typing_word:
+                node = self._find_node(tokens[-1])
+                if node is None:
+                    return []
+                words = list(node.top)
+                if node.is_word and tokens[-1] not in words:
+                    words.insert(0, tokens[-1])
+            else:
+                words = [min(complete, key=lambda word: len(self._postings.get(word, ())))]
+
+            results: list[dict[str, object]] = []
+            seen: set[tuple[str, object]] = set()
+            for entry in self._candidates(words):
+                key = entry.key
+                if key in seen or not all(word in entry.tokens for word in complete):
+                    continue
+                seen.add(key)
+                results.append(entry.as_payload())
+                if len(results) >= limit:
+                    break
+            return results
+
+
+def ensure_current(index: SuggestIndex, catalog: CatalogState, session: Session) -> None:
+    """Rebuild the index when the catalog changed outside this process."""
+
+    # The version is read before the records, so the index is never older than
+    # the revision it records; at worst the next local commit forces a rebuild.
+    version = catalog.current(session)
+    if version.token == index.catalog_token or index.adopt_version(version):
+        return
+    index.rebuild(
+        load_product_records(session),
+        catalog_token=version.token,
+        catalog_revision=version.revision,
+    )
+
+
+def init_suggest_index(app: Flask, catalog: CatalogState) -> SuggestIndex:
+    """Create the suggest index, subscribe it to catalog changes and warm it."""
+
+    index = SuggestIndex()
+    app.config["SUGGEST_INDEX"] = index
+
+    def _on_change(changes: CatalogChanges) -> None:
+        if not index.apply_changes(changes):
+            index.mark_stale()
+
+    catalog.subscribe(_on_change)
+
+    session = app.config["DB_SESSION"]()
+    try:
+        ensure_current(index, catalog, session)
+    except SQLAlchemyError:  # pragma: no cover - schema may not exist yet
+        app.logger.warning("Suggest index not warmed; it will build on first use.")
+    finally:
+        app.config["DB_SESSION"].remove()
+    return index
+
+
+def get_suggest_index(flask_app: Flask | None = None) -> SuggestIndex:
+    """Return the suggest index registered on the current app."""
+
+    app_context = flask_app or current_app
+    index: SuggestIndex | None = app_context.config.get("SUGGEST_INDEX")
+    if index is None:
+        raise RuntimeError("Suggest index is not initialized")
+    return index
+
+
+__all__ = [
+    "KIND_CATEGORY",
+    "KIND_PRODUCT",
+    "SuggestIndex",
+    "ensure_current",
+    "get_suggest_index",
+    "init_suggest_index",
+]
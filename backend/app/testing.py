@@ -0,0 +1,74 @@
+"""Query-budget assertions for tests (pytest or plain ``assert`` style).
+
+Example, with the ``app``, ``client`` and ``auth_headers`` fixtures from
+``tests/conftest.py``::
+
+    from app.testing import assert_query_budget
+
+    def test_cart_summary_is_one_query(app, client, auth_headers):
+        assert_query_budget(app, client.get, "/api/cart/summary", 1, headers=auth_headers)
+
+Failures list every statement with its duration and originating line, and call
+out repeated statement shapes, so an accidental N+1 is obvious from CI output.
+``tests/test_cart_query_budgets.py`` budgets every cart endpoint this way, and
+CI runs it through ``test-backend.yml``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from flask import Flask
+
+from .query_inspector import QueryLog, capture_queries
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block executes more statements than its budget allows."""
+
+    def __init__(self, label: str, budget: int, log: QueryLog, repeat_threshold: int) -> None:
+        lines = [f"{label} executed {log.count} queries (budget {budget}):", log.describe()]
+        for repeated in log.repeated(repeat_threshold):
+            lines.append(
+                f"repeated {repeated.count}x from {', '.join(repeated.origins)}: {repeated.shape}"
+            )
+        super().__init__("\n".join(lines))
+        self.log = log
+
+
+@contextmanager
+def query_budget(
+    app: Flask,
+    max_queries: int,
+    *,
+    label: str = "block",
+    repeat_threshold: int = 3,
+) -> Iterator[QueryLog]:
+    """Fail with :class:`QueryBudgetExceeded` if the block runs over ``max_queries``."""
+
+    with capture_queries(app) as log:
+        yield log
+    if log.count > max_queries:
+        raise QueryBudgetExceeded(label, max_queries, log, repeat_threshold)
+
+
+def assert_query_budget(
+    app: Flask,
+    request: Callable[..., Any],
+    path: str,
+    max_queries: int,
+    **request_kwargs: Any,
+) -> Any:
+    """Issue ``request(path, **request_kwargs)`` (e.g. ``client.post``) within a budget.
+
+    Returns the response so callers can keep asserting on it.
+    """
+
+    label = f"{getattr(request, '__name__', 'request').upper()} {path}"
+    with query_budget(app, max_queries, label=label):
+        return request(path, **request_kwargs)
+
+
+__all__ = ["QueryBudgetExceeded", "assert_query_budget", "query_budget"]
@@ -0,0 +1,140 @@
+"""Gunicorn settings for the backend container, driven by environment variables.
+
+``startup.sh`` runs ``gunicorn --config gunicorn.conf.py "app:create_app()"``.
+Workers and threads are sized from the CPUs available to the container (cgroup
+quota included) unless ``GUNICORN_WORKERS``/``GUNICORN_THREADS`` are set:
+
+* ``sync``: ``2 * cpus + 1`` single-threaded workers.
+* ``gthread`` (default): ``cpus + 1`` workers with ``GUNICORN_THREADS`` (4) threads each.
+* ``gevent``: ``cpus`` workers with ``GUNICORN_WORKER_CONNECTIONS`` greenlets each
+  (requires ``pip install gevent``).
+
+With ``GUNICORN_PRELOAD`` (default on) the app, including the catalog snapshot and
+suggest index, is built once in the master and shared copy-on-write; each worker
+drops the inherited database connections right after the fork. Preloading is
+always off for ``gevent``, whose workers must monkey-patch before the app loads. Workers restart
+after ``GUNICORN_MAX_REQUESTS`` requests (plus jitter) to bound memory growth.
+
+``/api/metrics`` aggregates every worker through ``PROMETHEUS_MULTIPROC_DIR``
+(default: a ``mlshop-prometheus`` directory on ``/dev/shm`` or the temp dir), which
+is emptied here when the master starts.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_WORKER_CLASSES = {"sync", "gthread", "gevent"}
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _cpu_count() -> int:
+    """CPUs usable by this process, honouring a cgroup v2 CPU quota."""
+
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        count = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, count)
+
+
+_cpus = _cpu_count()
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread").strip().lower()
+if worker_class not in _WORKER_CLASSES:
+    raise RuntimeError(
+        f"GUNICORN_WORKER_CLASS must be one of {sorted(_WORKER_CLASSES)}, got {worker_class!r}"
+    )
+
+if worker_class == "sync":
+    workers = _env_int("GUNICORN_WORKERS", 2 * _cpus + 1)
+    threads = 1
+elif worker_class == "gthread":
+    workers = _env_int("GUNICORN_WORKERS", _cpus + 1)
+    threads = _env_int("GUNICORN_THREADS", 4)
+else:
+    workers = _env_int("GUNICORN_WORKERS", _cpus)
+    threads = 1
+    worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 100)
+
+# Give every sync/gthread request thread its own pooled connection unless sized
+# explicitly. AppConfig reads this when the app is imported (in the master when
+# preloading, otherwise in each worker).
+if worker_class != "gevent":
+    os.environ.setdefault("DB_POOL_SIZE", str(threads))
+
+# Must be set before the app (and prometheus_client) is imported.
+_metrics_root = "/dev/shm" if Path("/dev/shm").is_dir() else tempfile.gettempdir()
+_metrics_dir = Path(
+    os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", str(Path(_metrics_root) / "mlshop-prometheus")
+    )
+)
+shutil.rmtree(_metrics_dir, ignore_errors=True)
+_metrics_dir.mkdir(parents=True, exist_ok=True)
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+# The gevent worker monkey-patches only after the fork, so a preloaded app would
+# keep the unpatched locks, threads and sockets it created in the master.
+preload_app = worker_class != "gevent" and _env_bool("GUNICORN_PRELOAD", True)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+# Heartbeat files on tmpfs so a slow container disk can't stall workers.
+if Path("/dev/shm").is_dir():
+    worker_tmp_dir = "/dev/shm"
+
+
+def post_fork(server, worker) -> None:
+    """Abandon database connections inherited from the preloaded master."""
+
+    if not preload_app:
+        return
+    from app.db import dispose_engines
+
+    dispose_engines(worker.app.wsgi(), close=False)
+
+
+def child_exit(server, worker) -> None:
+    """Drop a dead worker's live gauges (pool in use, hashing in flight)."""
+
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server) -> None:
+    server.log.info(
+        "Serving with %s worker(s) x %s thread(s) [%s], preload=%s, max_requests=%s",
+        workers,
+        threads if worker_class != "gevent" else worker_connections,
+        worker_class,
+        preload_app,
+        max_requests,
+    )
@@ -0,0 +1,15 @@
+"""Latency statistics shared by the benchmark and load-test scripts."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``fraction`` in ``[0, 1]``)."""
+
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+__all__ = ["percentile"]
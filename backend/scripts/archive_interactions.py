@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Move interactions older than the retention horizon into compressed archive files."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.config import load_config  # noqa: E402  (import after sys.path tweak)
+from app.services.interaction_archive import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    archive_interactions,
+    retention_cutoff,
+)
+
+
+def main() -> None:
+    config = load_config()
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=config.interaction_retention_days,
+        help="Keep interactions newer than this many days in the live table",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default=config.interaction_archive_dir,
+        help="Root directory for the date-partitioned archive files",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Rows archived and deleted per transaction",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report how many rows would be archived without writing or deleting",
+    )
+    args = parser.parse_args()
+
+    cutoff = retention_cutoff(args.retention_days)
+    engine = create_engine(config.database_url, future=True)
+
+    with Session(engine, future=True) as session:
+        stats = archive_interactions(
+            session,
+            archive_dir=args.archive_dir,
+            cutoff=cutoff,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(
+        f"{verb} {stats.archived} interactions older than {cutoff.isoformat()} "
+        f"in {stats.batches} batches ({len(stats.files)} files written to {args.archive_dir})."
+    )
+
+
+if __name__ == "__main__":
+    main()
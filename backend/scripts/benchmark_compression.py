@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Measure bytes on the wire and compression CPU cost for the main JSON endpoints."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import insert
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app import create_app  # noqa: E402  (import after sys.path tweak)
+from app.compression import available_encodings, compress  # noqa: E402
+from app.config import AppConfig  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.models import Product  # noqa: E402
+from app.services.search import ensure_search_index  # noqa: E402
+
+_WORDS = (
+    "aurora nordic ceramic atlas harbor linen walnut copper velvet marble oak cedar "
+    "lamp chair desk kettle rug shelf vase blanket speaker lantern mirror stool "
+    "minimal modern rustic compact wireless handmade adjustable portable woven matte"
+).split()
+_CATEGORIES = ("Lighting", "Furniture", "Kitchen", "Decor", "Electronics", "Outdoors", "Home")
+_ENDPOINTS = (
+    "/api/products?page_size=100",
+    "/api/products?page_size=12",
+    "/api/products?q=lamp&page_size=24",
+    "/api/products/1/related?limit=24",
+    "/api/recommendations?limit=24",
+    "/api/products/facets",
+)
+
+
+def _populate(app, size: int, rng: random.Random) -> None:
+    engine = app.config["DB_ENGINE"]
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        ensure_search_index(connection)
+        rows = [
+            {
+                "name": " ".join(rng.choices(_WORDS, k=3)).title() + f" {index}",
+                "description": " ".join(rng.choices(_WORDS, k=40)).capitalize() + ".",
+                "category": rng.choice(_CATEGORIES),
+                "price": Decimal(rng.randint(500, 200_000)) / 100,
+                "currency": "USD",
+                "image_url": f"https://placehold.co/600x400?text=Item+{index}",
+            }
+            for index in range(size)
+        ]
+        connection.execute(insert(Product), rows)
+
+
+def _cpu_ms(data: bytes, encoding: str, config: AppConfig, repeats: int) -> float:
+    samples: list[float] = []
+    for _ in range(repeats):
+        started = time.process_time()
+        compress(
+            data,
+            encoding,
+            gzip_level=config.compression_gzip_level,
+            brotli_quality=config.compression_brotli_quality,
+        )
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=2_000, help="Catalog size to generate")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed compressions per payload")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for generated data")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config = AppConfig(database_url=f"sqlite:///{workdir}/bench.db")
+        app = create_app(config)
+        _populate(app, args.products, random.Random(args.seed))
+        client = app.test_client()
+
+        print(
+            f"{'endpoint':<38} {'encoding':>8} {'raw B':>8} {'wire B':>8} "
+            f"{'saved':>6} {'cpu ms':>7} {'req ms':>7}"
+        )
+        for endpoint in _ENDPOINTS:
+            raw = client.get(endpoint, headers={"Accept-Encoding": "identity"}).get_data()
+            for encoding in available_encodings():
+                headers = {"Accept-Encoding": encoding}
+                response = client.get(endpoint, headers=headers)
+                wire = len(response.get_data())
+                if response.headers.get("Content-Encoding") != encoding:
+                    wire = len(raw)
+                started = time.perf_counter()
+                for _ in range(args.repeats):
+                    client.get(endpoint, headers=headers)
+                request_ms = (time.perf_counter() - started) * 1000 / args.repeats
+                print(
+                    f"{endpoint:<38} {encoding:>8} {len(raw):>8} {wire:>8} "
+                    f"{1 - wire / len(raw):>6.0%} "
+                    f"{_cpu_ms(raw, encoding, config, args.repeats):>7.2f} {request_ms:>7.2f}"
+                )
+        app.config["DB_ENGINE"].dispose()
+
+
+if __name__ == "__main__":
+    main()
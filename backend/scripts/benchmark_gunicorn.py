@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Compare gunicorn throughput and latency across worker classes (sync, gthread, gevent)."""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import importlib.util
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import insert
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from _stats import percentile  # noqa: E402  (scripts/ is on sys.path when run directly)
+
+from app import create_app  # noqa: E402  (import after sys.path tweak)
+from app.config import AppConfig  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.models import Product  # noqa: E402
+from app.services.search import ensure_search_index  # noqa: E402
+
+_WORDS = (
+    "aurora nordic ceramic atlas harbor linen walnut copper velvet marble oak cedar "
+    "lamp chair desk kettle rug shelf vase blanket speaker lantern mirror stool "
+    "minimal modern rustic compact wireless handmade adjustable portable woven matte"
+).split()
+_CATEGORIES = ("Lighting", "Furniture", "Kitchen", "Decor", "Electronics", "Outdoors", "Home")
+_ENDPOINTS = (
+    "/api/products?page_size=24",
+    "/api/products?q=lamp&page_size=24",
+    "/api/products/1/related?limit=12",
+    "/api/recommendations?limit=12",
+    "/api/products/facets",
+)
+
+
+def _populate(database_url: str, size: int, rng: random.Random) -> None:
+    app = create_app(AppConfig(database_url=database_url))
+    engine = app.config["DB_ENGINE"]
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        ensure_search_index(connection)
+        rows = [
+            {
+                "name": " ".join(rng.choices(_WORDS, k=3)).title() + f" {index}",
+                "description": " ".join(rng.choices(_WORDS, k=30)).capitalize() + ".",
+                "category": rng.choice(_CATEGORIES),
+                "price": Decimal(rng.randint(500, 200_000)) / 100,
+                "currency": "USD",
+            }
+            for index in range(size)
+        ]
+        connection.execute(insert(Product), rows)
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not become ready in time")
+
+
+def _run_load(
+    port: int, concurrency: int, duration: float, seed: int
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(index: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed + index)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        samples: list[float] = []
+        failed = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                connection.request("GET", rng.choice(_ENDPOINTS))
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            samples.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(samples)
+            errors += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--modes",
+        default="sync,gthread,gevent",
+        help="Comma-separated worker classes to compare (gevent is skipped if not installed)",
+    )
+    parser.add_argument("--workers", type=int, help="Override GUNICORN_WORKERS for every mode")
+    parser.add_argument("--threads", type=int, help="Override GUNICORN_THREADS for gthread")
+    parser.add_argument("--no-preload", action="store_true", help="Run with GUNICORN_PRELOAD=0")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per mode")
+    parser.add_argument("--products", type=int, default=5_000, help="Catalog size to generate")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for generated data")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    print(
+        f"{'mode':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'requests':>9} {'errors':>7}"
+    )
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = f"sqlite:///{workdir}/bench.db"
+        _populate(database_url, args.products, random.Random(args.seed))
+
+        for mode in modes:
+            if mode == "gevent" and importlib.util.find_spec("gevent") is None:
+                print(f"{mode:>8} skipped (pip install gevent)")
+                continue
+            port = _free_port()
+            env = {
+                **os.environ,
+                "DATABASE_URL": database_url,
+                "GUNICORN_WORKER_CLASS": mode,
+                "GUNICORN_BIND": f"127.0.0.1:{port}",
+                "GUNICORN_ACCESS_LOG": "",
+                "GUNICORN_LOG_LEVEL": "warning",
+                "GUNICORN_PRELOAD": "0" if args.no_preload else "1",
+            }
+            if args.workers:
+                env["GUNICORN_WORKERS"] = str(args.workers)
+            if args.threads:
+                env["GUNICORN_THREADS"] = str(args.threads)
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "gunicorn",
+                    "--config",
+                    "gunicorn.conf.py",
+                    "app:create_app()",
+                ],
+                cwd=PROJECT_ROOT,
+                env=env,
+            )
+            try:
+                _wait_until_up(port, process)
+                _run_load(port, args.concurrency, 1.0, args.seed)  # warm-up
+                latencies, errors, elapsed = _run_load(
+                    port, args.concurrency, args.duration, args.seed
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            if not latencies:
+                print(f"{mode:>8} no successful requests ({errors} errors)")
+                continue
+            print(
+                f"{mode:>8} {len(latencies) / elapsed:>9.1f} "
+                f"{statistics.median(latencies):>8.2f} {percentile(latencies, 0.95):>8.2f} "
+                f"{percentile(latencies, 0.99):>8.2f} {len(latencies):>9} {errors:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
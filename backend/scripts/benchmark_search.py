@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark product search latency (LIKE vs. full-text index) against catalog size."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.db import Base  # noqa: E402  (import after sys.path tweak)
+from app.models import Product  # noqa: E402
+from app.services import search  # noqa: E402
+
+_WORDS = (
+    "aurora nordic ceramic atlas harbor linen walnut copper velvet marble oak cedar "
+    "lamp chair desk kettle rug shelf vase blanket speaker lantern mirror stool "
+    "minimal modern rustic compact wireless handmade adjustable portable woven matte"
+).split()
+_CATEGORIES = ("Lighting", "Furniture", "Kitchen", "Decor", "Electronics", "Outdoors", "Home")
+_QUERIES = ("lamp", "oak desk", "wire", "copper kettle", "por", "handmade velvet chair")
+
+
+def _populate(session: Session, size: int, rng: random.Random) -> None:
+    batch: list[dict[str, object]] = []
+    for index in range(size):
+        batch.append(
+            {
+                "name": " ".join(rng.choices(_WORDS, k=3)).title() + f" {index}",
+                "description": " ".join(rng.choices(_WORDS, k=18)),
+                "category": rng.choice(_CATEGORIES),
+                "price": Decimal(rng.randint(500, 200_000)) / 100,
+                "currency": "USD",
+            }
+        )
+        if len(batch) == 5_000:
+            session.execute(insert(Product), batch)
+            batch.clear()
+    if batch:
+        session.execute(insert(Product), batch)
+    session.commit()
+
+
+def _time_query(session: Session, match: search.SearchMatch, repeats: int) -> list[float]:
+    ranked = match.ranked
+    stmt = (
+        select(Product.id)
+        .join(ranked, ranked.c.product_id == Product.id)
+        .order_by(match.relevance_order(), Product.id.asc())
+        .limit(12)
+    )
+    count_stmt = select(func.count()).select_from(Product).where(match.condition)
+    samples: list[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        session.execute(stmt).all()
+        session.scalar(count_stmt)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="Comma-separated catalog sizes to benchmark",
+    )
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for generated data")
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    print(f"{'size':>8} {'backend':>12} {'p50 ms':>9} {'p95 ms':>9}")
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            engine = create_engine(f"sqlite:///{workdir}/bench.db", future=True)
+            Base.metadata.create_all(engine)
+            with engine.begin() as connection:
+                search.ensure_search_index(connection)
+
+            with Session(engine, future=True) as session:
+                _populate(session, size, random.Random(args.seed))
+                for backend in (search.BACKEND_LIKE, search.BACKEND_SQLITE_FTS5):
+                    samples: list[float] = []
+                    for query in _QUERIES:
+                        match = search.build_search_match(session, query, backend=backend)
+                        samples.extend(_time_query(session, match, args.repeats))
+                    print(
+                        f"{size:>8} {backend:>12} {statistics.median(samples):>9.2f} "
+                        f"{_percentile(samples, 0.95):>9.2f}"
+                    )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
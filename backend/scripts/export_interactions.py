@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Export archived and live interactions as JSON Lines for model training."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.config import load_config  # noqa: E402  (import after sys.path tweak)
+from app.services.interaction_archive import iter_interactions  # noqa: E402
+
+
+def main() -> None:
+    config = load_config()
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="Destination file (defaults to stdout)")
+    parser.add_argument(
+        "--archive-dir",
+        default=config.interaction_archive_dir,
+        help="Root directory of the interaction archive",
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Inclusive ISO timestamp")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Exclusive ISO timestamp")
+    args = parser.parse_args()
+
+    engine = create_engine(config.database_url, future=True)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    exported = 0
+
+    try:
+        with Session(engine, future=True) as session:
+            for row in iter_interactions(
+                session, archive_dir=args.archive_dir, since=args.since, until=args.until
+            ):
+                row["occurred_at"] = row["occurred_at"].isoformat()
+                output.write(json.dumps(row, separators=(",", ":")) + "\n")
+                exported += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Exported {exported} interactions.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
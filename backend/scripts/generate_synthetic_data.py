@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""Generate a large synthetic workload for load and scale testing.
+
+Creates products, users, interactions, carts and orders with realistic skew:
+product popularity follows a Zipf distribution (per catalog and within each
+category), users differ in activity, interactions arrive in per-session bursts
+around a diurnal traffic curve and walk a view -> click -> add_to_cart ->
+pseudo_purchase funnel. Purchasing sessions of signed-in users become submitted
+carts with confirmed orders, and a share of users is left with an open cart.
+
+Everything is generated with vectorized NumPy operations and written with Core
+bulk inserts in chunks, appending after the highest existing ids. Large columns
+stay NumPy arrays (or are derived from them per chunk), so Python objects only
+exist for one ``--chunk-size`` chunk at a time. Every user shares the password
+given by ``--password``. Intended for local databases only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import Engine, Table, create_engine, func, insert, select, text
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.config import load_config  # noqa: E402  (import after sys.path tweak)
+from app.db import Base  # noqa: E402
+from app.models import Cart, CartItem, Interaction, Order, Product, User  # noqa: E402
+from app.security import hash_password  # noqa: E402
+from app.services.catalog import bump_catalog_revision  # noqa: E402
+from app.services.search import deferred_search_index, ensure_search_index  # noqa: E402
+
+_CATEGORIES = (
+    ("Home", 45.0),
+    ("Kitchen", 35.0),
+    ("Electronics", 180.0),
+    ("Furniture", 320.0),
+    ("Lighting", 70.0),
+    ("Decor", 30.0),
+    ("Outdoors", 90.0),
+    ("Office", 60.0),
+    ("Fitness", 75.0),
+    ("Travel", 110.0),
+    ("Toys", 25.0),
+    ("Beauty", 20.0),
+)
+_ADJECTIVES = (
+    "Aurora Nordic Ceramic Atlas Harbor Linen Walnut Copper Velvet Marble Cedar Summit "
+    "Minimal Modern Rustic Compact Wireless Handmade Portable Woven Matte Glacier Orbit"
+).split()
+_NOUNS = (
+    "Lamp Chair Desk Kettle Rug Shelf Vase Blanket Speaker Lantern Mirror Stool Bottle "
+    "Backpack Headphones Planter Clock Tray Mug Cushion Tent Mat Organizer Diffuser"
+).split()
+_WORDS = (
+    "crafted durable soft premium lightweight sustainable recycled adjustable elegant "
+    "everyday versatile warm bright quiet smart compact sturdy textured classic natural "
+    "finish design comfort storage travel living space gift quality detail"
+).split()
+# Share of sessions starting in each hour of the day (UTC), peaking in the evening.
+_HOURLY_TRAFFIC = np.array(
+    [2, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 6, 7, 6, 6, 6, 7, 8, 9, 10, 10, 8, 5, 3], dtype=np.float64
+)
+
+_VIEW, _CLICK, _ADD_TO_CART, _PURCHASE = range(4)
+_INTERACTION_TYPES = ("view", "click", "add_to_cart", "pseudo_purchase")
+
+
+def _zipf_weights(count: int, exponent: float) -> np.ndarray:
+    weights = np.arange(1, count + 1, dtype=np.float64) ** -exponent
+    return weights / weights.sum()
+
+
+def _next_id(engine: Engine, table: Table) -> int:
+    with engine.connect() as connection:
+        return (connection.scalar(select(func.max(table.c.id))) or 0) + 1
+
+
+def _as_datetimes(seconds: np.ndarray, origin: datetime) -> list[datetime]:
+    stamps = np.datetime64(origin.replace(tzinfo=None), "us") + seconds.astype("timedelta64[s]")
+    return [value.replace(tzinfo=UTC) for value in stamps.tolist()]
+
+
+class _Derived(NamedTuple):
+    """Column built chunk by chunk from NumPy arrays by ``convert``."""
+
+    convert: Callable[..., list]
+    arrays: tuple[np.ndarray, ...]
+
+    def __len__(self) -> int:
+        return len(self.arrays[0])
+
+    def __getitem__(self, window: slice) -> list:
+        return self.convert(*(array[window] for array in self.arrays))
+
+
+Column = Sequence | np.ndarray | _Derived
+
+
+def _column_chunk(column: Column, window: slice) -> list:
+    values = column[window]
+    return values.tolist() if isinstance(values, np.ndarray) else values
+
+
+def _optional_ids(ids: np.ndarray) -> list[int | None]:
+    return [None if value < 0 else value for value in ids.tolist()]
+
+
+def _interaction_types(kinds: np.ndarray) -> list[str]:
+    return [_INTERACTION_TYPES[kind] for kind in kinds.tolist()]
+
+
+def _purchase_metadata(
+    kinds: np.ndarray, quantities: np.ndarray, line_totals: np.ndarray
+) -> list[dict[str, object] | None]:
+    return [
+        (
+            {"quantity": quantity, "line_total": round(total, 2), "synthetic": True}
+            if kind == _PURCHASE
+            else None
+        )
+        for kind, quantity, total in zip(
+            kinds.tolist(), quantities.tolist(), line_totals.tolist(), strict=True
+        )
+    ]
+
+
+def _bulk_insert(engine: Engine, table: Table, columns: dict[str, Column], chunk_size: int) -> None:
+    names = list(columns)
+    total = len(columns[names[0]])
+    started = time.perf_counter()
+    for start in range(0, total, chunk_size):
+        window = slice(start, start + chunk_size)
+        chunk = [_column_chunk(columns[name], window) for name in names]
+        rows = [dict(zip(names, values, strict=True)) for values in zip(*chunk, strict=True)]
+        with engine.begin() as connection:
+            connection.execute(insert(table), rows)
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else 0.0
+    print(f"  {table.name:<14} {total:>12,} rows in {elapsed:>7.1f}s ({rate:>9,.0f} rows/s)")
+
+
+class WorkloadGenerator:
+    """Builds column arrays for each table from one random generator."""
+
+    def __init__(self, args: argparse.Namespace, engine: Engine) -> None:
+        self.args = args
+        self.rng = np.random.default_rng(args.seed)
+        self.window_end = datetime.now(tz=UTC).replace(microsecond=0)
+        self.window_start = self.window_end - timedelta(days=args.days)
+        self.first_user_id = _next_id(engine, User.__table__)
+        self.first_product_id = _next_id(engine, Product.__table__)
+        self.first_cart_id = _next_id(engine, Cart.__table__)
+
+    # -- catalog and users --------------------------------------------------
+
+    def products(self) -> dict[str, Column]:
+        rng, count = self.rng, self.args.products
+        ids = np.arange(self.first_product_id, self.first_product_id + count)
+        category_weights = _zipf_weights(len(_CATEGORIES), 0.7)
+        self.product_category = rng.choice(len(_CATEGORIES), size=count, p=category_weights)
+        base_price = np.array([price for _, price in _CATEGORIES])[self.product_category]
+        prices = np.clip(np.round(base_price * rng.lognormal(0.0, 0.55, count), 2), 1, 99_999)
+        self.product_price = prices
+
+        adjectives = rng.integers(len(_ADJECTIVES), size=count)
+        nouns = rng.integers(len(_NOUNS), size=count)
+        words = rng.integers(len(_WORDS), size=(count, 14))
+        names = [
+            f"{_ADJECTIVES[adj]} {_NOUNS[noun]} {product_id}"
+            for adj, noun, product_id in zip(
+                adjectives.tolist(), nouns.tolist(), ids.tolist(), strict=True
+            )
+        ]
+        descriptions = [
+            " ".join(_WORDS[index] for index in row).capitalize() + "." for row in words.tolist()
+        ]
+        created = _as_datetimes(
+            rng.integers(0, self.args.days * 86_400, size=count) - 30 * 86_400, self.window_start
+        )
+
+        # Popularity ranks are shuffled so they do not correlate with ids.
+        self.popularity_order = rng.permutation(count)
+        self.global_weights = _zipf_weights(count, self.args.zipf_exponent)
+        self.category_members = []
+        for category in range(len(_CATEGORIES)):
+            members = self.popularity_order[
+                self.product_category[self.popularity_order] == category
+            ]
+            self.category_members.append(
+                (members, _zipf_weights(len(members), self.args.zipf_exponent))
+            )
+
+        return {
+            "id": ids,
+            "sku": [f"SYN-{product_id}" for product_id in ids.tolist()],
+            "name": names,
+            "description": descriptions,
+            "category": [_CATEGORIES[index][0] for index in self.product_category.tolist()],
+            "price": prices,
+            "currency": ["USD"] * count,
+            "image_url": [f"https://placehold.co/600x400?text={_NOUNS[n]}" for n in nouns.tolist()],
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def users(self) -> dict[str, Column]:
+        count = self.args.users
+        ids = np.arange(self.first_user_id, self.first_user_id + count).tolist()
+        created = _as_datetimes(-self.rng.integers(0, 365 * 86_400, size=count), self.window_start)
+        hashed = hash_password(self.args.password)
+        return {
+            "id": ids,
+            "email": [f"synthetic{user_id}@example.test" for user_id in ids],
+            "hashed_password": [hashed] * count,
+            "full_name": [f"Synthetic User {user_id}" for user_id in ids],
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    # -- sessions and funnel -----------------------------------------------
+
+    def _popular_products(self, size: int) -> np.ndarray:
+        ranks = self.rng.choice(len(self.global_weights), size=size, p=self.global_weights)
+        return self.popularity_order[ranks]
+
+    def _products_in_categories(self, categories: np.ndarray) -> np.ndarray:
+        picked = np.empty(len(categories), dtype=np.int64)
+        for category, (members, weights) in enumerate(self.category_members):
+            mask = categories == category
+            if mask.any():
+                picked[mask] = members[self.rng.choice(len(members), size=mask.sum(), p=weights)]
+        return picked
+
+    def interactions(self) -> dict[str, Column]:
+        args, rng = self.args, self.rng
+        # Expected interactions per view, given the funnel rates below.
+        per_view = (
+            1
+            + args.click_rate
+            + args.cart_rate * (1 - args.anonymous_rate) * (1 + args.purchase_rate)
+        )
+        target_views = max(1, int(args.interactions / per_view))
+        session_count = max(1, int(target_views / args.session_views))
+        lengths = rng.geometric(1 / args.session_views, size=session_count)
+        session_of_view = np.repeat(np.arange(session_count), lengths)
+        view_count = len(session_of_view)
+        first_view = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        # Who: a share of anonymous sessions, otherwise Zipf-skewed user activity.
+        user_index = rng.choice(args.users, size=session_count, p=_zipf_weights(args.users, 0.6))
+        session_user = np.where(
+            rng.random(session_count) < args.anonymous_rate, -1, user_index + self.first_user_id
+        )
+
+        # When: a random day, an hour from the diurnal curve, then exponential gaps.
+        day = rng.integers(0, args.days, size=session_count)
+        hour = rng.choice(24, size=session_count, p=_HOURLY_TRAFFIC / _HOURLY_TRAFFIC.sum())
+        session_start = day * 86_400 + hour * 3_600 + rng.integers(0, 3_600, size=session_count)
+        gaps = rng.exponential(args.event_gap_seconds, size=view_count)
+        elapsed = np.cumsum(gaps)
+        elapsed -= np.repeat(elapsed[first_view] - gaps[first_view], lengths)
+        view_time = session_start[session_of_view] + elapsed.astype(np.int64)
+
+        # What: each session opens on a popular product and mostly browses its category.
+        view_product = self._popular_products(view_count)
+        focus_category = self.product_category[view_product[first_view]]
+        same_category = rng.random(view_count) < args.same_category_rate
+        same_category[first_view] = False
+        view_product[same_category] = self._products_in_categories(
+            focus_category[session_of_view[same_category]]
+        )
+
+        signed_in = session_user[session_of_view] >= 0
+        clicked = rng.random(view_count) < args.click_rate
+        carted = signed_in & (rng.random(view_count) < args.cart_rate)
+        purchased = carted & (rng.random(view_count) < args.purchase_rate)
+        session_end = view_time[first_view + lengths - 1]
+        checkout_time = session_end[session_of_view] + 60
+
+        kinds = np.concatenate(
+            [
+                np.full(view_count, _VIEW),
+                np.full(clicked.sum(), _CLICK),
+                np.full(carted.sum(), _ADD_TO_CART),
+                np.full(purchased.sum(), _PURCHASE),
+            ]
+        )
+        sessions = np.concatenate(
+            [
+                session_of_view,
+                session_of_view[clicked],
+                session_of_view[carted],
+                session_of_view[purchased],
+            ]
+        )
+        products = np.concatenate(
+            [view_product, view_product[clicked], view_product[carted], view_product[purchased]]
+        )
+        times = np.concatenate(
+            [view_time, view_time[clicked] + 2, view_time[carted] + 20, checkout_time[purchased]]
+        )
+        times = np.minimum(times, args.days * 86_400)  # nothing after "now"
+        order = np.argsort(times, kind="stable")
+        kinds, sessions, products, times = (
+            kinds[order],
+            sessions[order],
+            products[order],
+            times[order],
+        )
+
+        quantities = rng.integers(1, 4, size=len(kinds))
+        self.purchases = (
+            sessions[kinds == _PURCHASE],
+            products[kinds == _PURCHASE],
+            quantities[kinds == _PURCHASE],
+            times[kinds == _PURCHASE],
+        )
+        self.session_user = session_user
+        self.session_start = session_start
+
+        line_totals = self.product_price[products] * quantities
+        window_start = self.window_start
+        return {
+            "user_id": _Derived(_optional_ids, (session_user[sessions],)),
+            "product_id": products + self.first_product_id,
+            "interaction_type": _Derived(_interaction_types, (kinds,)),
+            "interaction_metadata": _Derived(_purchase_metadata, (kinds, quantities, line_totals)),
+            "occurred_at": _Derived(lambda chunk: _as_datetimes(chunk, window_start), (times,)),
+        }
+
+    # -- carts and orders ---------------------------------------------------
+
+    def checkouts(self) -> tuple[dict[str, Column], dict[str, Column], dict[str, Column]]:
+        sessions, products, quantities, times = self.purchases
+        # One cart line per (session, product), keeping the first quantity seen.
+        _, first = np.unique(sessions * (self.args.products + 1) + products, return_index=True)
+        sessions, products, quantities, times = (
+            sessions[first],
+            products[first],
+            quantities[first],
+            times[first],
+        )
+        checkout_sessions, cart_of_line = np.unique(sessions, return_inverse=True)
+        cart_count = len(checkout_sessions)
+        open_users = self.rng.choice(
+            self.args.users, size=int(self.args.users * self.args.open_cart_rate), replace=False
+        )
+        open_lines = self.rng.integers(1, 5, size=len(open_users))
+        open_products = self._popular_products(int(open_lines.sum()))
+        open_cart_of_line = np.repeat(np.arange(len(open_users)), open_lines) + cart_count
+        _, open_first = np.unique(
+            open_cart_of_line * (self.args.products + 1) + open_products, return_index=True
+        )
+
+        cart_ids = np.arange(self.first_cart_id, self.first_cart_id + cart_count + len(open_users))
+        checkout_at = np.zeros(cart_count, dtype=np.int64)
+        np.maximum.at(checkout_at, cart_of_line, times)
+        started_at = self.session_start[checkout_sessions]
+        cart_created = np.concatenate(
+            [started_at, np.full(len(open_users), self.args.days * 86_400 - 3_600)]
+        )
+
+        line_carts = np.concatenate([cart_of_line, open_cart_of_line[open_first]])
+        line_products = np.concatenate([products, open_products[open_first]])
+        line_quantities = np.concatenate(
+            [quantities, self.rng.integers(1, 3, size=len(open_first))]
+        )
+        items = {
+            "cart_id": cart_ids[line_carts],
+            "product_id": line_products + self.first_product_id,
+            "quantity": line_quantities,
+            "unit_price": self.product_price[line_products],
+        }
+
+        subtotals = np.bincount(
+            line_carts,
+            weights=self.product_price[line_products] * line_quantities,
+            minlength=len(cart_ids),
+        )
+        carts = {
+            "id": cart_ids,
+            "user_id": np.concatenate(
+                [self.session_user[checkout_sessions], open_users + self.first_user_id]
+            ),
+            "status": ["submitted"] * cart_count + ["open"] * len(open_users),
+            "item_count": np.bincount(
+                line_carts, weights=line_quantities, minlength=len(cart_ids)
+            ).astype(np.int64),
+            "subtotal": np.round(subtotals, 2),
+            "created_at": _as_datetimes(cart_created, self.window_start),
+            "updated_at": _as_datetimes(
+                np.concatenate([checkout_at, cart_created[cart_count:]]), self.window_start
+            ),
+        }
+
+        orders = {
+            "user_id": self.session_user[checkout_sessions],
+            "cart_id": cart_ids[:cart_count],
+            "status": ["confirmed"] * cart_count,
+            "total_amount": np.round(subtotals[:cart_count], 2),
+            "created_at": _as_datetimes(checkout_at, self.window_start),
+            "updated_at": _as_datetimes(checkout_at, self.window_start),
+        }
+        return carts, items, orders
+
+
+def _sync_sequences(engine: Engine, tables: Sequence[Table]) -> None:
+    # Explicit ids do not advance PostgreSQL sequences.
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for table in tables:
+            connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                )
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--products", type=int, default=50_000, help="Products to create")
+    parser.add_argument("--users", type=int, default=100_000, help="Users to create")
+    parser.add_argument(
+        "--interactions", type=int, default=1_000_000, help="Approximate interactions to create"
+    )
+    parser.add_argument("--days", type=int, default=90, help="Days of history to spread over")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--zipf-exponent", type=float, default=1.05, help="Popularity skew")
+    parser.add_argument("--session-views", type=float, default=6.0, help="Mean views/session")
+    parser.add_argument("--event-gap-seconds", type=float, default=45.0, help="Mean event gap")
+    parser.add_argument("--same-category-rate", type=float, default=0.6)
+    parser.add_argument("--anonymous-rate", type=float, default=0.35)
+    parser.add_argument("--click-rate", type=float, default=0.3, help="Views followed by a click")
+    parser.add_argument("--cart-rate", type=float, default=0.06, help="Signed-in views carted")
+    parser.add_argument("--purchase-rate", type=float, default=0.35, help="Carted lines bought")
+    parser.add_argument("--open-cart-rate", type=float, default=0.1, help="Users with open carts")
+    parser.add_argument("--password", default="password123", help="Password for every user")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per insert chunk")
+    parser.add_argument("--database-url", help="Target database (default: DATABASE_URL)")
+    args = parser.parse_args()
+    if min(args.products, args.users, args.interactions, args.days) < 1:
+        raise SystemExit("--products, --users, --interactions and --days must be positive")
+
+    engine = create_engine(args.database_url or load_config().database_url, future=True)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        ensure_search_index(connection)
+
+    started = time.perf_counter()
+    generator = WorkloadGenerator(args, engine)
+    print(f"Generating into {engine.url.render_as_string(hide_password=True)}")
+    _bulk_insert(engine, User.__table__, generator.users(), args.chunk_size)
+    with deferred_search_index(engine):
+        _bulk_insert(engine, Product.__table__, generator.products(), args.chunk_size)
+    with engine.begin() as connection:
+        bump_catalog_revision(connection)
+    _bulk_insert(engine, Interaction.__table__, generator.interactions(), args.chunk_size)
+    carts, items, orders = generator.checkouts()
+    _bulk_insert(engine, Cart.__table__, carts, args.chunk_size)
+    _bulk_insert(engine, CartItem.__table__, items, args.chunk_size)
+    _bulk_insert(engine, Order.__table__, orders, args.chunk_size)
+    _sync_sequences(
+        engine,
+        [table.__table__ for table in (User, Product, Interaction, Cart, CartItem, Order)],
+    )
+    print(f"Done in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Bulk-import products from a CSV or JSONL file using native upserts.
+
+Products are matched on their external key ``sku``. Existing rows are updated
+only when a value changed, new rows are inserted, and progress plus throughput
+is reported per batch. CSV input needs a header row with ``sku``, ``name`` and
+``price`` plus any of ``description, category, currency, image_url``; JSONL
+input has one object per line with the same keys.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.config import load_config  # noqa: E402  (import after sys.path tweak)
+from app.db import Base  # noqa: E402
+from app.services.catalog_import import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    FORMAT_CSV,
+    FORMAT_JSONL,
+    ImportStats,
+    import_products,
+)
+from app.services.search import ensure_search_index  # noqa: E402
+
+
+def _detect_format(path: str, explicit: str | None) -> str:
+    if explicit:
+        return explicit
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return FORMAT_CSV
+    if suffix in {".jsonl", ".ndjson"}:
+        return FORMAT_JSONL
+    raise SystemExit("Cannot infer the input format; pass --format csv|jsonl")
+
+
+def _report_progress(every: int):
+    def _report(stats: ImportStats) -> None:
+        if stats.batches % every == 0:
+            print(
+                f"  {stats.read:>10,} rows read, {stats.written:>10,} written, "
+                f"{stats.rejected:>6,} rejected  ({stats.rows_per_second:,.0f} rows/s)",
+                flush=True,
+            )
+
+    return _report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("path", help="Input file, or '-' to read from stdin")
+    parser.add_argument(
+        "--format",
+        choices=(FORMAT_CSV, FORMAT_JSONL),
+        help="Input format (default: inferred from the file extension)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=(
+            "Rows per batch; each batch is one executemany upsert in its own "
+            f"transaction (default: {DEFAULT_BATCH_SIZE})"
+        ),
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help=(
+            "Delete all existing products (in batches) before importing. Their interactions "
+            "are deleted too (ON DELETE CASCADE); on PostgreSQL, products still in a cart "
+            "block the reset (RESTRICT)"
+        ),
+    )
+    parser.add_argument(
+        "--progress-every",
+        type=int,
+        default=50,
+        help="Print progress every N batches (default: 50)",
+    )
+    args = parser.parse_args()
+
+    input_format = _detect_format(args.path, args.format) if args.path != "-" else args.format
+    if input_format is None:
+        raise SystemExit("--format is required when reading from stdin")
+
+    config = load_config()
+    engine = create_engine(config.database_url, future=True)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # Index triggers/generated columns keep search in sync with the upserts.
+        ensure_search_index(connection)
+
+    stream = (
+        sys.stdin
+        if args.path == "-"
+        else open(args.path, encoding="utf-8", newline="")  # noqa: SIM115
+    )
+    try:
+        stats = import_products(
+            engine,
+            stream,
+            input_format=input_format,
+            batch_size=args.batch_size,
+            reset=args.reset,
+            progress=_report_progress(max(args.progress_every, 1)),
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    for error in stats.errors:
+        print(f"  rejected {error}", file=sys.stderr)
+    print(
+        f"Import complete in {stats.seconds:.1f}s ({stats.rows_per_second:,.0f} rows/s). "
+        f"Read {stats.read:,} rows: {stats.written:,} inserted or updated, "
+        f"{stats.unchanged:,} unchanged, {stats.rejected:,} rejected; "
+        f"deleted {stats.deleted:,} (reset={args.reset})."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""End-to-end HTTP load test with per-endpoint latency and JSON baselines.
+
+Virtual shoppers, each signed in with its own account, repeatedly pick a
+weighted action: browse catalog pages, search, view a product (plus a ``view``
+interaction), open related items and recommendations, add to cart and
+occasionally check out. Popular products are picked more often (Zipf weights).
+
+By default a fresh SQLite database is seeded with ``generate_synthetic_data.py``
+and the app is driven in-process through ``create_app()`` test clients. Point
+``--database-url`` at an existing database (e.g. the compose PostgreSQL) to skip
+seeding, and ``--base-url`` at a running server (e.g. gunicorn) to go through
+real HTTP.
+
+Each run reports throughput and p50/p95/p99 latency per endpoint. ``--output``
+stores the results as JSON; ``--baseline`` compares against an earlier file and,
+with ``--max-regression``, exits non-zero when p95 latency or throughput of any
+endpoint regress by more than that fraction.
+
+    python scripts/load_test.py --duration 30 --output scripts/baselines/sqlite.json
+    python scripts/load_test.py --baseline scripts/baselines/sqlite.json --max-regression 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from itertools import accumulate
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from _stats import percentile  # noqa: E402  (scripts/ is on sys.path when run directly)
+
+_PASSWORD = "load-test-password"
+_PAGE_SIZE = 24
+_SAMPLED_PAGES = 20
+
+# action -> relative weight in the shopper mix
+_ACTIONS = {
+    "browse": 28,
+    "search": 12,
+    "product": 18,
+    "interaction": 14,
+    "related": 10,
+    "recommendations": 8,
+    "add_to_cart": 7,
+    "checkout": 3,
+}
+_ACTION_NAMES = list(_ACTIONS)
+_ACTION_CUM_WEIGHTS = list(accumulate(_ACTIONS.values()))
+
+
+class _Transport(ABC):
+    """Issues one request and returns ``(status, parsed JSON body or None)``."""
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        parse: bool = False,
+    ) -> tuple[int, Any]: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+
+class _InProcessTransport(_Transport):
+    def __init__(self, app) -> None:
+        self._client = app.test_client()
+
+    def request(self, method, path, *, json_body=None, headers=None, parse=False):
+        request_headers = dict(headers or {})
+        if not parse:
+            request_headers["Accept-Encoding"] = "gzip, br"
+        response = self._client.open(path, method=method, json=json_body, headers=request_headers)
+        if parse:
+            return response.status_code, response.get_json(silent=True)
+        response.get_data()
+        return response.status_code, None
+
+    def close(self) -> None:
+        # The test client holds no connection.
+        pass
+
+
+class _HttpTransport(_Transport):
+    def __init__(self, base_url: str) -> None:
+        parts = urlsplit(base_url)
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._https = parts.scheme == "https"
+        self._prefix = parts.path.rstrip("/")
+        self._connection = self._connect()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        factory = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return factory(self._host, self._port, timeout=30)
+
+    def request(self, method, path, *, json_body=None, headers=None, parse=False):
+        request_headers = dict(headers or {})
+        if not parse:
+            request_headers["Accept-Encoding"] = "gzip, br"
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            request_headers["Content-Type"] = "application/json"
+        try:
+            self._connection.request(method, self._prefix + path, body, request_headers)
+            response = self._connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self._connection.close()
+            self._connection = self._connect()
+            raise
+        return response.status, json.loads(data) if parse and data else None
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+@dataclass(slots=True)
+class _Catalog:
+    """Product ids (most popular first) and search terms sampled from the API."""
+
+    product_ids: list[int]
+    cum_weights: list[float]
+    terms: list[str]
+    pages: int
+
+
+@dataclass(slots=True)
+class _Shopper:
+    headers: dict[str, str]
+    cart_items: int = 0
+    samples: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+
+def _json_request(transport: _Transport, method: str, path: str, **kwargs) -> Any:
+    status, body = transport.request(method, path, parse=True, **kwargs)
+    if status >= 400:
+        raise RuntimeError(f"{method} {path} failed during setup with status {status}")
+    return body
+
+
+def _sample_catalog(transport: _Transport, rng: random.Random, zipf_exponent: float) -> _Catalog:
+    first = _json_request(transport, "GET", f"/api/products?page_size={_PAGE_SIZE}")
+    pages = max(1, first["pagination"]["total_pages"])
+    listings = [first]
+    for page in rng.sample(range(2, pages + 1), min(_SAMPLED_PAGES, pages - 1)):
+        listings.append(
+            _json_request(transport, "GET", f"/api/products?page={page}&page_size={_PAGE_SIZE}")
+        )
+    products = [item for listing in listings for item in listing["items"]]
+    if not products:
+        raise RuntimeError("The catalog is empty; seed it before running the load test")
+    rng.shuffle(products)
+    terms = sorted({word.lower() for item in products for word in item["name"].split()[:2]})
+    return _Catalog(
+        product_ids=[item["id"] for item in products],
+        cum_weights=list(
+            accumulate(1 / (rank**zipf_exponent) for rank in range(1, len(products) + 1))
+        ),
+        terms=[term for term in terms if term.isalpha() and len(term) > 2] or ["a"],
+        pages=pages,
+    )
+
+
+def _sign_up(transport: _Transport, run_id: str, index: int) -> dict[str, str]:
+    body = _json_request(
+        transport,
+        "POST",
+        "/api/auth/register",
+        json_body={"email": f"load-{run_id}-{index}@example.test", "password": _PASSWORD},
+    )
+    return {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def _step(
+    transport: _Transport, shopper: _Shopper, catalog: _Catalog, rng: random.Random
+) -> tuple[str, int]:
+    action = rng.choices(_ACTION_NAMES, cum_weights=_ACTION_CUM_WEIGHTS)[0]
+    product_id = rng.choices(catalog.product_ids, cum_weights=catalog.cum_weights)[0]
+    headers = shopper.headers
+    if action == "checkout" and not shopper.cart_items:
+        action = "add_to_cart"
+
+    if action == "browse":
+        page = min(catalog.pages, int(rng.paretovariate(1.2)))
+        status, _ = transport.request(
+            "GET", f"/api/products?page={page}&page_size={_PAGE_SIZE}", headers=headers
+        )
+    elif action == "search":
+        term = rng.choice(catalog.terms)
+        status, _ = transport.request(
+            "GET", f"/api/products?q={term}&page_size={_PAGE_SIZE}", headers=headers
+        )
+    elif action == "product":
+        status, _ = transport.request("GET", f"/api/products/{product_id}", headers=headers)
+    elif action == "interaction":
+        status, _ = transport.request(
+            "POST",
+            "/api/interactions",
+            json_body={"product_id": product_id, "interaction_type": "view"},
+            headers=headers,
+        )
+    elif action == "related":
+        status, _ = transport.request(
+            "GET", f"/api/products/{product_id}/related?limit=12", headers=headers
+        )
+    elif action == "recommendations":
+        status, _ = transport.request("GET", "/api/recommendations?limit=12", headers=headers)
+    elif action == "add_to_cart":
+        status, _ = transport.request(
+            "POST",
+            "/api/cart/items",
+            json_body={"product_id": product_id, "quantity": 1},
+            headers=headers,
+        )
+        if status < 400:
+            shopper.cart_items += 1
+    else:
+        status, _ = transport.request("POST", "/api/cart/checkout", headers=headers)
+        if status < 400:
+            shopper.cart_items = 0
+    return action, status
+
+
+def _run(
+    make_transport: Callable[[], _Transport],
+    shoppers: list[_Shopper],
+    catalog: _Catalog,
+    *,
+    duration: float,
+    seed: int,
+    record: bool,
+) -> float:
+    deadline = time.perf_counter() + duration
+
+    def drive(index: int, shopper: _Shopper) -> None:
+        rng = random.Random(seed * 1_000 + index)
+        transport = make_transport()
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    action, status = _step(transport, shopper, catalog, rng)
+                except (OSError, http.client.HTTPException):
+                    action, status = "connection", 599
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if not record:
+                    continue
+                shopper.samples.setdefault(action, []).append(elapsed_ms)
+                if status >= 400:
+                    shopper.errors[action] = shopper.errors.get(action, 0) + 1
+        finally:
+            transport.close()
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=drive, args=(index, shopper))
+        for index, shopper in enumerate(shoppers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def _summarize(samples: list[float], errors: int, elapsed: float) -> dict[str, float | int]:
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(percentile(samples, 0.95), 2),
+        "p99_ms": round(percentile(samples, 0.99), 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def _results(shoppers: list[_Shopper], elapsed: float) -> dict[str, dict[str, float | int]]:
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for shopper in shoppers:
+        for action, values in shopper.samples.items():
+            samples.setdefault(action, []).extend(values)
+        for action, count in shopper.errors.items():
+            errors[action] = errors.get(action, 0) + count
+    endpoints = {
+        action: _summarize(values, errors.get(action, 0), elapsed)
+        for action, values in sorted(samples.items())
+    }
+    everything = [value for values in samples.values() for value in values]
+    if everything:
+        endpoints["total"] = _summarize(everything, sum(errors.values()), elapsed)
+    return endpoints
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(endpoints: dict[str, dict[str, float | int]]) -> None:
+    print(
+        f"{'endpoint':<16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'requests':>9} {'errors':>7}"
+    )
+    for name, stats in endpoints.items():
+        print(
+            f"{name:<16} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['requests']:>9} "
+            f"{stats['errors']:>7}"
+        )
+
+
+# Results recorded under different settings measure different workloads.
+_COMPARABLE_KEYS = ("target", "database", "seeded", "concurrency", "mix")
+
+
+def _mismatches(results: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    return [
+        f"{key}: baseline {baseline.get(key)!r}, now {results.get(key)!r}"
+        for key in _COMPARABLE_KEYS
+        if baseline.get(key) != results.get(key)
+    ]
+
+
+def _compare(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    max_regression: float | None,
+) -> list[str]:
+    """Print deltas against ``baseline`` and return the endpoints that regressed.
+
+    Refuses (exits with status 2) to gate on ``max_regression`` when the runs
+    differ in target, database, dataset, concurrency or action mix; without a
+    threshold the differences are only printed as warnings.
+    """
+
+    mismatches = _mismatches(results, baseline)
+    for mismatch in mismatches:
+        print(f"warning: run not comparable with baseline ({mismatch})", file=sys.stderr)
+    if baseline.get("environment") != results.get("environment"):
+        print(
+            "warning: baseline was recorded on a different machine or Python "
+            f"({baseline.get('environment')!r})",
+            file=sys.stderr,
+        )
+    if mismatches and max_regression is not None:
+        print("Refusing to apply --max-regression to runs that are not comparable.")
+        raise SystemExit(2)
+
+    endpoints = results["endpoints"]
+    regressions = []
+    print(f"\n{'endpoint':<16} {'p95 ms (base -> now)':>24} {'req/s (base -> now)':>24}")
+    for name, stats in endpoints.items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            print(f"{name:<16} {'(not in baseline)':>24}")
+            continue
+        p95_delta = stats["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        rps_delta = (
+            stats["throughput_rps"] / base["throughput_rps"] - 1 if base["throughput_rps"] else 0.0
+        )
+        regressed = max_regression is not None and (
+            p95_delta > max_regression or rps_delta < -max_regression
+        )
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<16} {base['p95_ms']:>8.2f} -> {stats['p95_ms']:>7.2f} ({p95_delta:+5.0%})"
+            f" {base['throughput_rps']:>8.1f} -> {stats['throughput_rps']:>7.1f}"
+            f" ({rps_delta:+5.0%}){'  REGRESSED' if regressed else ''}"
+        )
+    return regressions
+
+
+def _seed(database_url: str, args: argparse.Namespace) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            str(PROJECT_ROOT / "scripts" / "generate_synthetic_data.py"),
+            "--database-url",
+            database_url,
+            "--products",
+            str(args.products),
+            "--users",
+            str(args.users),
+            "--interactions",
+            str(args.interactions),
+            "--seed",
+            str(args.seed),
+        ],
+        cwd=PROJECT_ROOT,
+        check=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Existing, seeded database (default: a fresh SQLite file seeded for this run)",
+    )
+    parser.add_argument(
+        "--base-url", help="Load a running server over HTTP, e.g. http://127.0.0.1:8000"
+    )
+    parser.add_argument("--products", type=int, default=5_000, help="Products to seed")
+    parser.add_argument("--users", type=int, default=2_000, help="Users to seed")
+    parser.add_argument("--interactions", type=int, default=100_000, help="Interactions to seed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent virtual shoppers")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds of load")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds first")
+    parser.add_argument("--zipf-exponent", type=float, default=1.05, help="Product popularity skew")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="Compare against this results file")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="Exit 1 if any p95 rises or throughput falls by more than this fraction",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = args.database_url
+        seeded = None
+        if database_url is None and args.base_url is None:
+            database_url = f"sqlite:///{workdir}/loadtest.db"
+            _seed(database_url, args)
+            seeded = {
+                "products": args.products,
+                "users": args.users,
+                "interactions": args.interactions,
+            }
+
+        if args.base_url:
+            target = args.base_url
+
+            def make_transport() -> _Transport:
+                return _HttpTransport(args.base_url)
+
+        else:
+            from app import create_app
+            from app.config import load_config
+
+            config = load_config()
+            config.database_url = database_url
+            config.query_inspector_enabled = False
+            app = create_app(config)
+            target = "in-process"
+
+            def make_transport() -> _Transport:
+                return _InProcessTransport(app)
+
+        rng = random.Random(args.seed)
+        setup = make_transport()
+        catalog = _sample_catalog(setup, rng, args.zipf_exponent)
+        run_id = uuid.uuid4().hex[:8]
+        shoppers = [_Shopper(_sign_up(setup, run_id, index)) for index in range(args.concurrency)]
+        setup.close()
+
+        print(f"Load testing {target} with {args.concurrency} shoppers for {args.duration:.0f}s")
+        if args.warmup > 0:
+            _run(
+                make_transport,
+                shoppers,
+                catalog,
+                duration=args.warmup,
+                seed=args.seed,
+                record=False,
+            )
+        elapsed = _run(
+            make_transport,
+            shoppers,
+            catalog,
+            duration=args.duration,
+            seed=args.seed + 1,
+            record=True,
+        )
+
+    endpoints = _results(shoppers, elapsed)
+    _print_results(endpoints)
+    results = {
+        "recorded_at": datetime.now(tz=UTC).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "target": target,
+        "database": (database_url.split(":", 1)[0] if database_url else "unknown (remote server)"),
+        "seeded": seeded,
+        "concurrency": args.concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "mix": _ACTIONS,
+        "endpoints": endpoints,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    if args.baseline:
+        regressions = _compare(results, json.loads(args.baseline.read_text()), args.max_regression)
+        if regressions:
+            raise SystemExit(
+                f"Regressed beyond {args.max_regression:.0%}: {', '.join(regressions)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,8 @@ from app.config import load_config  # noqa: E402  (import after sys.path tweak)
 from app.data.sample_products import SAMPLE_PRODUCTS  # noqa: E402
 from app.db import Base  # noqa: E402
 from app.models import Product  # noqa: E402
+from app.services.catalog import bump_catalog_revision  # noqa: E402
+from app.services.search import ensure_search_index  # noqa: E402
 
 
 class SeedStats(NamedTuple):
@@ -62,6 +64,8 @@ def upsert_products(session: Session, *, reset: bool) -> SeedStats:
         existing.image_url = sample.image_url
         updated += 1
 
+    # This session has no app hooks, so tell running workers the catalog moved.
+    bump_catalog_revision(session.connection())
     session.commit()
     return SeedStats(inserted=inserted, updated=updated, deleted=deleted)
 
@@ -78,6 +82,9 @@ def main() -> None:
     config = load_config()
     engine = create_engine(config.database_url, future=True)
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # Index triggers/generated columns keep search in sync with the upsert below.
+        ensure_search_index(connection)
 
     with Session(engine, future=True) as session:
         stats = upsert_products(session, reset=args.reset)
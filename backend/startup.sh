@@ -7,4 +7,4 @@ echo "Starting SSH daemon..."
 
 # Start the application
 echo "Starting Gunicorn server..."
-exec gunicorn --bind 0.0.0.0:8000 "app:create_app()"
+exec gunicorn --config gunicorn.conf.py "app:create_app()"
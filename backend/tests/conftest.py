@@ -0,0 +1,69 @@
+"""Shared fixtures: an app on a throwaway SQLite database seeded with the sample catalog."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import select
+
+from app import create_app
+from app.config import AppConfig
+from app.data.sample_products import SAMPLE_PRODUCTS
+from app.db import Base, get_session
+from app.models import Product
+
+
+@pytest.fixture
+def app(tmp_path: Path) -> Iterator[Flask]:
+    config = AppConfig(
+        environment="testing",
+        database_url=f"sqlite:///{tmp_path / 'test.db'}",
+        # Registration hashes a password per test; keep it cheap.
+        password_hash_method="pbkdf2:sha256:1000",
+        query_inspector_enabled=False,
+    )
+    flask_app = create_app(config)
+    flask_app.config["TESTING"] = True
+    engine = flask_app.config["DB_ENGINE"]
+    Base.metadata.create_all(engine)
+    with flask_app.app_context():
+        session = get_session()
+        session.add_all(
+            Product(
+                name=product.name,
+                description=product.description,
+                category=product.category,
+                price=product.price,
+                currency=product.currency,
+                image_url=product.image_url,
+            )
+            for product in SAMPLE_PRODUCTS
+        )
+        session.commit()
+    yield flask_app
+    engine.dispose()
+
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client: FlaskClient) -> dict[str, str]:
+    response = client.post(
+        "/api/auth/register",
+        json={"email": "shopper@example.com", "password": "correct-horse-battery"},
+    )
+    assert response.status_code == 201, response.get_json()
+    return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def product_ids(app: Flask) -> list[int]:
+    with app.app_context():
+        return list(get_session().scalars(select(Product.id).order_by(Product.id)))
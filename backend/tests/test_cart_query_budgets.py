@@ -0,0 +1,135 @@
+"""Query budgets for the cart endpoints.
+
+Budgets are the statement counts each endpoint needs today with a warm auth
+cache (registering in ``auth_headers`` caches the user). A failure lists every
+statement with its origin; raise a budget only together with the reason.
+"""
+
+from __future__ import annotations
+
+import pytest
+from flask import Flask
+from flask.testing import FlaskClient
+
+from app.testing import assert_query_budget
+
+
+@pytest.fixture
+def cart_item_id(client: FlaskClient, auth_headers: dict[str, str], product_ids: list[int]) -> int:
+    response = client.post(
+        "/api/cart/items", json={"product_id": product_ids[0], "quantity": 2}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()["cart"]["items"][0]["id"]
+
+
+def test_get_cart_creates_open_cart(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str]
+) -> None:
+    response = assert_query_budget(app, client.get, "/api/cart", 3, headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_get_existing_cart(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str], cart_item_id: int
+) -> None:
+    response = assert_query_budget(app, client.get, "/api/cart", 1, headers=auth_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.get_json()["cart"]["items"]] == [cart_item_id]
+
+
+def test_get_cart_summary(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str], cart_item_id: int
+) -> None:
+    response = assert_query_budget(app, client.get, "/api/cart/summary", 1, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()["cart"]["item_count"] == 2
+
+
+def test_add_first_item(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str], product_ids: list[int]
+) -> None:
+    response = assert_query_budget(
+        app,
+        client.post,
+        "/api/cart/items",
+        7,
+        json={"product_id": product_ids[0]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+
+
+def test_add_item_to_existing_cart(
+    app: Flask,
+    client: FlaskClient,
+    auth_headers: dict[str, str],
+    product_ids: list[int],
+    cart_item_id: int,
+) -> None:
+    response = assert_query_budget(
+        app,
+        client.post,
+        "/api/cart/items",
+        5,
+        json={"product_id": product_ids[1], "quantity": 3},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.get_json()["cart"]["item_count"] == 5
+
+
+def test_update_item_quantity(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str], cart_item_id: int
+) -> None:
+    response = assert_query_budget(
+        app,
+        client.patch,
+        f"/api/cart/items/{cart_item_id}",
+        4,
+        json={"quantity": 4},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.get_json()["cart"]["item_count"] == 4
+
+
+def test_delete_item(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str], cart_item_id: int
+) -> None:
+    response = assert_query_budget(
+        app, client.delete, f"/api/cart/items/{cart_item_id}", 4, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.get_json()["cart"]["items"] == []
+
+
+def test_bulk_update(
+    app: Flask,
+    client: FlaskClient,
+    auth_headers: dict[str, str],
+    product_ids: list[int],
+    cart_item_id: int,
+) -> None:
+    operations = [
+        {"op": "add", "product_id": product_ids[1], "quantity": 1},
+        {"op": "add", "product_id": product_ids[2], "quantity": 2},
+        {"op": "set", "product_id": product_ids[0], "quantity": 5},
+    ]
+    response = assert_query_budget(
+        app,
+        client.post,
+        "/api/cart/items/bulk",
+        5,
+        json={"operations": operations},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.get_json()["cart"]["item_count"] == 8
+
+
+def test_checkout(
+    app: Flask, client: FlaskClient, auth_headers: dict[str, str], cart_item_id: int
+) -> None:
+    response = assert_query_budget(app, client.post, "/api/cart/checkout", 5, headers=auth_headers)
+    assert response.status_code in {200, 201}